@@ -1,8 +1,22 @@
+import os
+import sys
+
+from esphomerelease import daemon
 from esphomerelease.commands import cli
+from esphomerelease.config import CONFIG
 
 
 # pylint: disable=unused-argument
 def main(*args):
+    # A running `esphomerelease daemon` answers from warm caches.
+    exit_code = daemon.forward(
+        daemon.socket_path(CONFIG.get("daemon_socket")),
+        sys.argv[1:],
+        cwd=os.getcwd(),
+        color=sys.stdout.isatty(),
+    )
+    if exit_code is not None:
+        sys.exit(exit_code)
     # pylint: disable=no-value-for-parameter
     cli()
 
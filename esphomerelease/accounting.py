@@ -0,0 +1,265 @@
+"""Where the GitHub rate limit goes.
+
+``get_session`` reports the remaining quota once, at startup; nothing said how
+much of it a command then used, or on what. Every request made through
+:class:`~esphomerelease.transport.ReleaseSession` is recorded by the shared
+:data:`ACCOUNTANT`: bytes received, latency, whether a conditional request was
+answered with a 304, grouped by endpoint template
+(``/repos/{o}/{r}/pulls/{n}``) and by the esphomerelease function that
+caused it; a request made by a job on the shared worker pool is charged to
+the function that started the job list. The CLI prints :meth:`RequestAccountant.report` when a command
+finishes, and ``--request-budget`` aborts a command before it goes past the
+given number of requests.
+
+Import-clean (stdlib only); responses are duck-typed (``status_code``,
+``headers``, ``content``).
+"""
+
+import contextlib
+import re
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from .exceptions import EsphomeReleaseError
+
+# Modules between a caller and the network; the caller is the first frame
+# outside of them.
+_PLUMBING_MODULES = frozenset(
+    {
+        "esphomerelease.accounting",
+        "esphomerelease.governor",
+        "esphomerelease.graphql",
+        "esphomerelease.jobs",
+        "esphomerelease.mutations",
+        "esphomerelease.pagination",
+        "esphomerelease.retry",
+        "esphomerelease.singleflight",
+        "esphomerelease.transport",
+        "esphomerelease.util",
+        "esphomerelease.writes",
+    }
+)
+
+# The caller a worker thread's requests are charged to while it runs a job,
+# when its own stack holds nothing but plumbing.
+_CHARGED_TO = threading.local()
+
+# Path segments replaced by placeholders, in order.
+_SEGMENT_PATTERNS = (
+    (re.compile(r"^\d+$"), "{n}"),
+    (re.compile(r"^[0-9a-f]{40}$"), "{sha}"),
+)
+
+# Rows shown per grouping in the report.
+REPORT_ROWS = 10
+
+
+class RequestBudgetExceeded(EsphomeReleaseError):
+    """A command tried to make more GitHub requests than its budget allows."""
+
+
+def endpoint_template(url: str) -> str:
+    """Collapse a request URL to the endpoint it calls.
+
+    Owner, repository, user and organisation names as well as numbers and
+    commit SHAs become placeholders, so every PR fetch counts towards
+    ``/repos/{o}/{r}/pulls/{n}``.
+    """
+    parts = urlparse(url).path.strip("/").split("/")
+    template = []
+    for index, part in enumerate(parts):
+        previous = parts[index - 1] if index else None
+        if previous == "repos" and index == 1:
+            part = "{o}"
+        elif index == 2 and parts[0] == "repos":
+            part = "{r}"
+        elif previous in ("users", "orgs") and index == 1:
+            part = "{u}" if previous == "users" else "{org}"
+        elif previous == "labels" and index > 3:
+            part = "{name}"
+        else:
+            for pattern, placeholder in _SEGMENT_PATTERNS:
+                if pattern.match(part):
+                    part = placeholder
+                    break
+        template.append(part)
+    return "/" + "/".join(template)
+
+
+def calling_function() -> str:
+    """``module.function`` of the innermost esphomerelease frame that is not
+    plumbing, else the caller the current job is charged to (see
+    :func:`charged_to`), or ``"?"`` when a request came from elsewhere."""
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("esphomerelease.") and module not in _PLUMBING_MODULES:
+            return f"{module.split('.', 1)[1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return getattr(_CHARGED_TO, "caller", "?")
+
+
+@contextlib.contextmanager
+def charged_to(caller: str):
+    """Charge requests made by this thread meanwhile to ``caller``, unless
+    its stack names a caller of its own."""
+    previous = getattr(_CHARGED_TO, "caller", "?")
+    _CHARGED_TO.caller = caller
+    try:
+        yield
+    finally:
+        _CHARGED_TO.caller = previous
+
+
+class _Record(NamedTuple):
+    endpoint: str
+    caller: str
+    received: int
+    latency: float
+    not_modified: bool
+
+
+class Usage(NamedTuple):
+    """Totals over a group of requests."""
+
+    requests: int
+    received: int
+    not_modified: int
+    p50: float
+    p95: float
+
+    @classmethod
+    def of(cls, records: List[_Record]) -> "Usage":
+        latencies = sorted(record.latency for record in records)
+        return cls(
+            requests=len(records),
+            received=sum(record.received for record in records),
+            not_modified=sum(record.not_modified for record in records),
+            p50=_percentile(latencies, 0.50),
+            p95=_percentile(latencies, 0.95),
+        )
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _size(count: int) -> str:
+    if count < 1024:
+        return f"{count} B"
+    if count < 1024 * 1024:
+        return f"{count / 1024:.1f} KB"
+    return f"{count / (1024 * 1024):.1f} MB"
+
+
+def _usage(records: List[_Record], key: str) -> Dict[str, Usage]:
+    groups: Dict[str, List[_Record]] = defaultdict(list)
+    for record in records:
+        groups[getattr(record, key)].append(record)
+    usage = {name: Usage.of(group) for name, group in groups.items()}
+    return dict(sorted(usage.items(), key=lambda item: -item[1].requests))
+
+
+class RequestAccountant:
+    """Thread-safe record of the GitHub requests made during one command."""
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.rate_limit_remaining: Optional[int] = None
+        self._lock = threading.Lock()
+        self._records: List[_Record] = []
+        self._started = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self._records)
+
+    def reset(self, budget: Optional[int] = None):
+        """Start accounting a new command."""
+        with self._lock:
+            self.budget = budget
+            self.rate_limit_remaining = None
+            self._records = []
+            self._started = 0
+
+    def start(self):
+        """Claim one request of the budget; raise if it is used up.
+
+        Called before every request is sent, so concurrent workers cannot
+        overshoot the budget between them.
+        """
+        with self._lock:
+            if self.budget is not None and self._started >= self.budget:
+                raise RequestBudgetExceeded(
+                    f"GitHub request budget of {self.budget} exhausted; "
+                    "aborting before making another request.\n" + self._report()
+                )
+            self._started += 1
+
+    def record(self, url: str, response, latency: float, *, stream: bool = False):
+        """Account for a response that came back after ``latency`` seconds."""
+        not_modified = bool(getattr(response, "from_cache", False))
+        if not_modified or stream:
+            # A replayed 304 carried no body; a streamed one is not read yet.
+            received = 0
+        else:
+            received = len(response.content or b"")
+        record = _Record(
+            endpoint_template(url),
+            calling_function(),
+            received,
+            latency,
+            not_modified,
+        )
+        remaining = response.headers.get("X-RateLimit-Remaining", "")
+        with self._lock:
+            self._records.append(record)
+            if remaining.isdigit():
+                self.rate_limit_remaining = int(remaining)
+
+    def usage(self, key: str) -> Dict[str, Usage]:
+        """Usage per ``"endpoint"`` or per ``"caller"``, busiest first."""
+        with self._lock:
+            records = list(self._records)
+        return _usage(records, key)
+
+    def report(self) -> str:
+        """A table of the requests made so far, by endpoint and by caller."""
+        with self._lock:
+            return self._report()
+
+    def _report(self) -> str:
+        records = list(self._records)
+        total = Usage.of(records)
+        lines = [
+            f"GitHub API: {total.requests} request(s), {_size(total.received)} "
+            f"received, {total.not_modified} not modified (304), "
+            f"p50 {total.p50 * 1000:.0f} ms, p95 {total.p95 * 1000:.0f} ms"
+        ]
+        if self.rate_limit_remaining is not None:
+            lines[0] += f", {self.rate_limit_remaining} remaining"
+        for title, key in (("Endpoint", "endpoint"), ("Caller", "caller")):
+            rows = list(_usage(records, key).items())[:REPORT_ROWS]
+            if not rows:
+                continue
+            width = max(len(title), *(len(name) for name, _ in rows))
+            lines.append("")
+            lines.append(
+                f"{title:<{width}}  {'reqs':>5}  {'304':>4}  {'bytes':>9}  "
+                f"{'p50 ms':>6}  {'p95 ms':>6}"
+            )
+            for name, usage in rows:
+                lines.append(
+                    f"{name:<{width}}  {usage.requests:>5}  {usage.not_modified:>4}  "
+                    f"{_size(usage.received):>9}  {usage.p50 * 1000:>6.0f}  "
+                    f"{usage.p95 * 1000:>6.0f}"
+                )
+        return "\n".join(lines)
+
+
+ACCOUNTANT = RequestAccountant()
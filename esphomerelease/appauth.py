@@ -0,0 +1,134 @@
+"""Authenticate as a GitHub App installation.
+
+A personal OAuth token caps every command at 5,000 requests an hour, and a
+full supporters refresh or label sync eats most of that before a cut on the
+same day. An installation of a GitHub App on the ``esphome`` organization gets
+a budget of its own, which grows with the organization (up to 12,500 an
+hour).
+
+With ``github_app_id`` and ``github_app_private_key`` (the path of the App's
+PEM key) set in ``config.json``, the org-wide bulk commands (``supporters``,
+``labels``) authenticate with installation tokens instead of the ``gh``
+token. :class:`InstallationTokens` signs a short-lived JWT with the private
+key, exchanges it for an installation token and mints a new one shortly before
+the current one expires (they last an hour); :class:`InstallationTokenAuth`
+puts the current token on every request.
+The installation is looked up from the organization unless
+``github_app_installation_id`` is set.
+
+Label writes made this way are authored by the App; cuts and publishing keep
+the release manager's own token, so their PRs and releases are not.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import jwt
+from requests.auth import AuthBase
+
+from .exceptions import EsphomeReleaseError
+from .transport import pooled_session
+
+GITHUB_API = "https://api.github.com"
+
+# Mint a new installation token when the current one expires within this many
+# seconds, so no request is sent with a token that runs out in flight.
+REFRESH_MARGIN = 300
+
+# Lifetime of the JWT that is exchanged for an installation token; GitHub
+# accepts at most ten minutes. It is dated back a minute against clock drift.
+JWT_EXPIRE_IN = 540
+JWT_BACKDATE = 60
+
+
+class InstallationTokens:
+    """Mints and refreshes the installation tokens of one GitHub App."""
+
+    def __init__(
+        self,
+        app_id: int,
+        private_key_pem: bytes,
+        *,
+        installation_id: Optional[int] = None,
+        owner: str = "esphome",
+        api_url: str = GITHUB_API,
+        clock=time.time,
+    ):
+        self.app_id = str(app_id)
+        self.installation_id = installation_id
+        self.owner = owner
+        self.api_url = api_url.rstrip("/")
+        self.minted = 0
+        self._private_key_pem = private_key_pem
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        # Minting must not go through the session the tokens authenticate.
+        self._session = pooled_session(pool_size=1)
+
+    def token(self) -> str:
+        """The current installation token, minting a new one when it is due."""
+        with self._lock:
+            expires_in = self._expires_at - self._clock()
+            if self._token is None or expires_in < REFRESH_MARGIN:
+                self._mint()
+            return self._token
+
+    def _app_jwt(self) -> str:
+        # Not github3.apps.create_token: current PyJWT refuses its integer
+        # ``iss``.
+        now = int(self._clock())
+        return jwt.encode(
+            {"iat": now - JWT_BACKDATE, "exp": now + JWT_EXPIRE_IN, "iss": self.app_id},
+            self._private_key_pem,
+            algorithm="RS256",
+        )
+
+    def _app_request(self, method: str, path: str) -> dict:
+        """Send a request authenticated as the App itself (with a JWT)."""
+        response = self._session.request(
+            method,
+            f"{self.api_url}{path}",
+            headers={
+                "Authorization": f"Bearer {self._app_jwt()}",
+                "Accept": "application/vnd.github+json",
+            },
+            timeout=30,
+        )
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            raise EsphomeReleaseError(
+                f"GitHub App {self.app_id}: {method} {path} failed with "
+                f"{response.status_code} {message or response.reason}"
+            )
+        return response.json()
+
+    def _mint(self):
+        if self.installation_id is None:
+            installation = self._app_request("GET", f"/orgs/{self.owner}/installation")
+            self.installation_id = installation["id"]
+        payload = self._app_request(
+            "POST", f"/app/installations/{self.installation_id}/access_tokens"
+        )
+        self._token = payload["token"]
+        self._expires_at = datetime.fromisoformat(
+            payload["expires_at"].replace("Z", "+00:00")
+        ).timestamp()
+        self.minted += 1
+
+
+class InstallationTokenAuth(AuthBase):
+    """Authenticates each request with the current installation token."""
+
+    def __init__(self, tokens: InstallationTokens):
+        self.tokens = tokens
+
+    def __call__(self, request):
+        request.headers["Authorization"] = f"token {self.tokens.token()}"
+        return request
@@ -1,14 +1,11 @@
-import functools
 from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Tuple
 
-from github3.pulls import PullRequest
-
 from .changelog_filter import resolve_changelog_labels
-from .model import BranchType, Version
+from .model import BranchType, PullRecord, Version
 from .project import EsphomeDocsProject, EsphomeProject, Project
-from .util import gprint, process_asynchronously
+from .util import gprint
 
 # Extra headers that are inserted in the changelog if
 # one of these labels is applied
@@ -39,10 +36,9 @@ def format_heading(title: str, *, level: int = 2):
     return f"{c} {title}\n"
 
 
-def format_line(*, project: Project, pr: PullRequest, include_author: bool) -> str:
-    username = pr.user.login
+def format_line(*, project: Project, pr: PullRecord, include_author: bool) -> str:
     pr_link = f"[{project.shortname}#{pr.number}]({pr.html_url})"
-    user_link = f"[@{username}]({pr.user.html_url})"
+    user_link = f"[@{pr.author_login}]({pr.author_url})"
 
     line = f"- {pr.title} {pr_link}"
     if include_author:
@@ -53,7 +49,7 @@ def format_line(*, project: Project, pr: PullRequest, include_author: bool) -> s
 def format_change(
     *,
     project: Project,
-    pr: PullRequest,
+    pr: PullRecord,
     labels: List[str],
     include_author: bool = True,
 ) -> str:
@@ -70,36 +66,30 @@ def collect(
     base_version: Version,
     head: BranchType,
     head_version: Version,
-) -> List[Tuple[PullRequest, List[str]]]:
+) -> List[Tuple[PullRecord, List[str]]]:
     """The changelog-relevant PRs between two refs, sorted by merge time.
 
     Each entry is the PR paired with its effective labels (see
     :func:`resolve_changelog_labels`); excluded PRs are dropped.
     """
     list_ = project.prs_between(base, head)
+    gprint(f"Processing {len(list_)} PRs")
 
-    lines: List[Tuple[PullRequest, List[str]]] = []
-
-    def job(pr_number):
-        pr: PullRequest = project.get_pr(pr_number)
-
-        labels: List[str] = [label["name"] for label in pr.labels]
-        milestone_title = pr.milestone["title"] if pr.milestone else None
+    lines: List[Tuple[PullRecord, List[str]]] = []
 
+    # One bulk fetch, streamed: the filtering below is pure and needs no
+    # per-PR round trips, so it runs while later batches still download.
+    for pr in project.iter_prs(list_):
         # Decide inclusion + effective labels (reverted/cherry-pick range).
         effective_labels = resolve_changelog_labels(
-            labels, milestone_title, base_version, head_version
+            list(pr.labels), pr.milestone_title, base_version, head_version
         )
         if effective_labels is None:
             # Excluded from this release's changelog.
-            return
+            continue
 
         lines.append((pr, effective_labels))
 
-    jobs = [functools.partial(job, pr) for pr in list_]
-    gprint(f"Processing {len(jobs)} PRs")
-    process_asynchronously(jobs, "Load PRs")
-
     # Sort log lines by when the PR was merged
     lines.sort(key=lambda x: x[0].merged_at)
     return lines
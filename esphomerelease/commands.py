@@ -1,6 +1,6 @@
 import functools
 import glob
-import json
+import os
 from pathlib import Path
 from typing import List, Optional
 
@@ -9,11 +9,23 @@ from github3.issues.label import Label
 from github3.repos import Repository
 
 from . import changelog, cutting
+from .accounting import ACCOUNTANT
 from .config import CONFIG
 from .docs import gen_supporters
-from .github import get_session
+from .daemon import CommandDaemon
+from .daemon import socket_path as daemon_socket_path
+from .github import get_app_session, warm_up
 from .model import Branch, Version
-from .project import EsphomeDocsProject, EsphomeHassioProject, EsphomeProject, Project
+from .pagination import paginate
+from .store import get_store
+from .project import (
+    ALL_PROJECTS,
+    EsphomeDocsProject,
+    EsphomeHassioProject,
+    EsphomeProject,
+    Project,
+)
+from .retry import RETRIES
 from .util import (
     confirm,
     copy_clipboard,
@@ -21,9 +33,23 @@ from .util import (
     gprint,
     process_asynchronously,
 )
+from .webhooks import WebhookReceiver
+from .writes import WriteQueue
 
 USERS_CACHE_FILE = "users_cache.json"
 
+# Commands `daemon` runs for other invocations: they need no terminal and
+# leave the local checkouts alone.
+DAEMON_COMMANDS = frozenset({"next-beta-prs", "release-notes"})
+
+# Options those commands prompt for when they are left out.
+_DAEMON_PROMPTED_OPTIONS = {
+    "release-notes": ("base_ref", "head_ref", "head_version"),
+}
+
+# The receiver started by --webhook-port, while it keeps the caches current.
+_WEBHOOK_RECEIVER: Optional[WebhookReceiver] = None
+
 
 def _commit_user_cache_if_changed():
     repo_root = Path(__file__).resolve().parents[1]
@@ -54,12 +80,77 @@ def _commit_user_cache_if_changed():
     execute_command("git", "push", cwd=str(repo_root))
 
 
+def _print_request_report():
+    if ACCOUNTANT.requests:
+        gprint(ACCOUNTANT.report())
+    for proj in ALL_PROJECTS:
+        if any(proj.pr_cache.stats):
+            gprint(f"{proj.shortname} PR cache: {proj.pr_cache.stats}")
+
+
+def _listen_for_webhooks(ctx, port: int):
+    global _WEBHOOK_RECEIVER
+
+    secret = CONFIG.get("webhook_secret")
+    if not secret:
+        raise click.UsageError("--webhook-port needs `webhook_secret` set in config.json")
+    receiver = WebhookReceiver(ALL_PROJECTS, secret=secret)
+    server = receiver.serve(port=port)
+    _WEBHOOK_RECEIVER = receiver
+    for proj in ALL_PROJECTS:
+        proj.follow_webhooks(receiver)
+    gprint(f"Listening for GitHub webhooks on http://127.0.0.1:{port}/")
+
+    def stop():
+        global _WEBHOOK_RECEIVER
+
+        _WEBHOOK_RECEIVER = None
+        for proj in ALL_PROJECTS:
+            proj.follow_webhooks(None)
+        server.shutdown()
+        server.server_close()
+
+    ctx.call_on_close(stop)
+
+
 @click.group()
 @click.option(
     "--step/--no-step", default=False, help="Prompt before each command is executed."
 )
-def cli(step):
+@click.option(
+    "--request-budget",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Abort the command before it makes more than this many GitHub requests.",
+)
+@click.option(
+    "--webhook-port",
+    type=click.IntRange(min=1, max=65535),
+    default=None,
+    help="Listen on this localhost port for GitHub webhook deliveries that "
+    "keep the PR and milestone caches current (needs webhook_secret).",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    default=False,
+    help="Answer release-notes and next-beta-prs from the local store (see "
+    "cache_dir) and the git checkouts, without asking GitHub.",
+)
+@click.pass_context
+def cli(ctx, step, request_budget, webhook_port, offline):
     CONFIG["step"] = step
+    CONFIG["offline"] = offline
+    if offline and get_store() is None:
+        raise click.UsageError("--offline needs `cache_dir` set in config.json")
+    ACCOUNTANT.reset(budget=request_budget)
+    RETRIES.reset()
+    for proj in ALL_PROJECTS:
+        proj.pr_cache.reset_stats()
+    # Runs after the command, also when it failed or hit the budget.
+    ctx.call_on_close(_print_request_report)
+    if webhook_port is not None:
+        _listen_for_webhooks(ctx, webhook_port)
 
 
 STABLE_SHORTHANDS = ("s", "stable")
@@ -126,6 +217,15 @@ def cut(version):
     _commit_user_cache_if_changed()
 
 
+@cli.command(
+    help="Load what cutting VERSION reads from GitHub into the local store, "
+    f"ahead of the cut. {VERSION_ARG_HELP}"
+)
+@click.argument("version")
+def prefetch(version):
+    cutting.prefetch(_resolve_version(version))
+
+
 def _pending_release_version() -> Version:
     """The single release that has been cut but not published yet."""
     pending = EsphomeProject.pending_release_versions()
@@ -315,7 +415,7 @@ def next_beta_prs(milestone: Optional[str]) -> None:
             "will be in the next beta"
         )
         for pr in prs:
-            print(f"  #{pr.number} {pr.title} by @{pr.user.login} ({pr.html_url})")
+            print(f"  #{pr.number} {pr.title} by @{pr.author_login} ({pr.html_url})")
 
         open_prs = proj.get_open_prs_for_milestone(milestone_obj)
         if open_prs:
@@ -378,7 +478,7 @@ def labels():
     found_components.sort()
     # print('\n'.join(found_components))
 
-    sess = get_session()
+    sess = get_app_session()
     repos: List[Repository] = [
         sess.repository("esphome", "issues"),
         sess.repository("esphome", "feature-requests"),
@@ -387,7 +487,7 @@ def labels():
     ]
 
     def list_repo_labels(repo: Repository) -> list[Label]:
-        return list(repo.labels())
+        return list(paginate(repo.labels()))
 
     # Paginating thousands of labels takes many requests per repo; run the
     # four repos' listings concurrently.
@@ -395,8 +495,10 @@ def labels():
         [functools.partial(list_repo_labels, repo) for repo in repos],
         "Fetching labels",
     )
-    failed_to_update: dict[str, list[str]] = {}
-    failed_to_create: dict[str, list[str]] = {}
+    # Creating and renaming labels counts against GitHub's secondary limits
+    # for content creation; the queue paces the writes and retries the ones
+    # that were rate limited anyway.
+    writes = WriteQueue()
     for repo, repo_labels in zip(repos, all_repo_labels):
         # Index by lowercased name: with ~3k components and ~3k labels the
         # per-component list scans are millions of string compares.
@@ -405,6 +507,7 @@ def labels():
             labels_by_lower_name.setdefault(repo_label.name.lower(), []).append(
                 repo_label
             )
+        renamed: set[int] = set()
         for comp in found_components:
             label_name = f"component: {comp.lower()}"
             found_old_labels = labels_by_lower_name.get(
@@ -416,46 +519,124 @@ def labels():
                     print(
                         f"Updated label from {found_old_label.name} to '{label_name}' in {repo.name}"
                     )
-                    try:
-                        found_old_label.update(name=label_name, color="ededed")
-                    except Exception as e:
-                        failed_to_update.setdefault(repo.name, []).append(label_name)
+                    renamed.add(id(found_old_label))
+                    writes.add(
+                        f"{repo.name}: update '{found_old_label.name}' "
+                        f"to '{label_name}'",
+                        functools.partial(
+                            found_old_label.update, name=label_name, color="ededed"
+                        ),
+                    )
                 continue
             if found_new_labels:
                 continue
             print(f"Create label '{label_name}' in {repo.name}")
-            try:
-                repo.create_label(name=label_name, color="ededed")
-            except Exception as e:
-                failed_to_create.setdefault(repo.name, []).append(label_name)
+            writes.add(
+                f"{repo.name}: create '{label_name}'",
+                functools.partial(repo.create_label, name=label_name, color="ededed"),
+            )
 
         old_repo_labels = [
-            label for label in repo_labels if label.name.startswith("integration: ")
+            label
+            for label in repo_labels
+            if label.name.startswith("integration: ") and id(label) not in renamed
         ]
         for old_label in old_repo_labels:
-            print(
-                f"Updating label '{old_label.name}' in {repo.name} to 'component: {old_label.name[13:].lower()}'"
+            new_name = f"component: {old_label.name[13:].lower()}"
+            print(f"Update label '{old_label.name}' in {repo.name} to '{new_name}'")
+            writes.add(
+                f"{repo.name}: update '{old_label.name}' to '{new_name}'",
+                functools.partial(old_label.update, name=new_name, color="ededed"),
             )
-            try:
-                old_label.update(
-                    name=f"component: {old_label.name[13:].lower()}", color="ededed"
-                )
-            except Exception as e:
-                failed_to_update.setdefault(repo.name, []).append(
-                    f"component: {old_label.name[13:].lower()}"
-                )
-
-    if failed_to_update:
-        print("Failed to update labels in the following repos:")
-        for repo_name, labels in failed_to_update.items():
-            print(f"{repo_name}: {json.dumps(labels)}")
-
-    if failed_to_create:
-        print("Failed to create labels in the following repos:")
-        for repo_name, labels in failed_to_create.items():
-            print(f"{repo_name}: {json.dumps(labels)}")
+
+    if not writes:
+        return
+    gprint(
+        f"Writing {len(writes)} label change(s), "
+        f"at least {writes.minutes()} minute(s) at GitHub's pace"
+    )
+    failures = writes.run("Writing labels")
+    if writes.retries:
+        gprint(f"Retried {writes.retries} rate limited write(s)")
+    if failures:
+        print("Failed to write the following labels:")
+        for failure in failures:
+            print(f"{failure.description}: {failure.message}")
+        raise click.ClickException(f"{len(failures)} label write(s) failed")
 
 
 @cli.command(help="Generate Supporters.")
 def supporters():
     gen_supporters()
+
+
+def _daemon_declines(argv: List[str]) -> Optional[str]:
+    """Why the daemon leaves ``argv`` to the invoking process, or None."""
+    try:
+        with cli.make_context(
+            "esphomerelease", list(argv), resilient_parsing=True
+        ) as ctx:
+            name = ctx.protected_args[0] if ctx.protected_args else None
+            webhook_port = ctx.params.get("webhook_port")
+            if name not in DAEMON_COMMANDS:
+                return f"{name or 'no command'} is not run by the daemon"
+            with cli.get_command(ctx, name).make_context(
+                name, list(ctx.args), parent=ctx, resilient_parsing=True
+            ) as sub_ctx:
+                params = sub_ctx.params
+    except click.ClickException as err:
+        return err.format_message()
+    if webhook_port is not None:
+        return "--webhook-port is not passed to the daemon"
+    prompted = [
+        f"--{option.replace('_', '-')}"
+        for option in _DAEMON_PROMPTED_OPTIONS.get(name, ())
+        if params.get(option) is None
+    ]
+    if prompted:
+        return f"{name} would prompt for {', '.join(prompted)}"
+    return None
+
+
+def _run_in_daemon(argv: List[str], color: bool) -> int:
+    try:
+        exit_code = cli.main(
+            list(argv), prog_name="esphomerelease", standalone_mode=False, color=color
+        )
+    except click.ClickException as err:
+        err.show()
+        return err.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return 1
+    return exit_code if isinstance(exit_code, int) else 0
+
+
+def _before_daemon_command():
+    if _WEBHOOK_RECEIVER is not None:
+        # Webhook deliveries keep the caches current.
+        return
+    # Without them, only what revalidates itself carries over: the session
+    # and its conditional-request cache, and the local PR store.
+    for proj in ALL_PROJECTS:
+        proj.pr_cache.clear()
+        proj.milestones.refresh()
+
+
+@cli.command(
+    help="Keep GitHub sessions and caches warm for other invocations, which "
+    f"hand {', '.join(sorted(DAEMON_COMMANDS))} to it over a Unix socket."
+)
+def daemon():
+    server = CommandDaemon(
+        _run_in_daemon, _daemon_declines, before_command=_before_daemon_command
+    ).listen(daemon_socket_path(CONFIG.get("daemon_socket")))
+    warm_up(ALL_PROJECTS)
+    gprint(f"Serving commands on {server.server_address}, Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(server.server_address)
@@ -1,12 +1,12 @@
 """Logic for cutting releases."""
 
 import datetime
+import functools
 import re
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 import click
-from github3.pulls import PullRequest
 
 from . import changelog, docs
 from .changelog_url import (
@@ -16,14 +16,17 @@ from .changelog_url import (
 )
 from .docs_pr_links import extract_docs_pr_numbers, is_confirmed_pair
 from .exceptions import EsphomeReleaseError
-from .model import Branch, BranchType, Version
-from .project import EsphomeDocsProject, EsphomeProject, Project
+from .github import warm_up
+from .model import Branch, BranchType, PullRecord, Version
+from .project import EsphomeDocsProject, EsphomeProject, MilestonePoller, Project
+from .store import get_store
 from .util import (
     confirm,
     feature_freeze_date,
     gprint,
     milestone_due_on,
     open_vscode,
+    process_asynchronously,
     propagate_docs_current_branch,
     release_date,
     update_local_copies,
@@ -51,26 +54,52 @@ def _cycle_milestone_title(version: Version) -> str:
     return str(version.replace(beta=0, dev=False))
 
 
+def _wait_for_webhook(webhooks, applied: int):
+    """Block until a delivery after the first ``applied`` ones changed a cache."""
+    gprint(
+        "Waiting for GitHub webhook deliveries to recheck (Ctrl+C to abort)...",
+        fg="yellow",
+    )
+    webhooks.wait(applied)
+
+
 def _check_open_milestone_prs(version: Version, *, block: bool):
     """Check for open PRs on the cycle milestone.
 
     Open PRs are always reported. When ``block`` is True (full releases) the
     user must clear the milestone or abort; for betas this only warns and
-    continues.
+    continues. With ``--webhook-port`` the check waits for webhook deliveries
+    and rechecks from the cache instead of asking "Check again?".
     """
     milestone_title = _cycle_milestone_title(version)
+    webhooks = EsphomeProject.webhooks
+    # Rechecks only fetch PRs that changed since the previous pass.
+    pollers: dict[str, MilestonePoller] = {}
+    reported = None
     while True:
+        applied = webhooks.applied if webhooks is not None else 0
         open_prs = []
         for proj in [EsphomeProject, EsphomeDocsProject]:
             milestone = proj.get_milestone_by_title(milestone_title)
             if milestone is None:
                 continue
-            for pr in proj.get_open_prs_for_milestone(milestone):
+            poller = pollers.get(proj.shortname)
+            if poller is None or poller.milestone.number != milestone.number:
+                poller = pollers[proj.shortname] = proj.poll_milestone(
+                    milestone, "OPEN"
+                )
+            for pr in poller.poll():
                 open_prs.append((proj, pr))
 
         if not open_prs:
             return
 
+        if webhooks is not None and open_prs == reported:
+            # A delivery that did not change the open PRs.
+            webhooks.wait(applied)
+            continue
+        reported = open_prs
+
         gprint(click.style(
             f"Warning: Found {len(open_prs)} open PR(s) on the {milestone_title} milestone:",
             fg="yellow",
@@ -81,17 +110,34 @@ def _check_open_milestone_prs(version: Version, *, block: bool):
         if not block:
             return
 
+        if webhooks is not None:
+            _wait_for_webhook(webhooks, applied)
+            continue
         if not click.confirm(
             click.style("Check again?", fg="yellow"),
             default=True,
         ):
             raise EsphomeReleaseError("Aborted: open PRs on milestone")
+        # The milestone may have been edited on GitHub while we waited.
+        for proj in [EsphomeProject, EsphomeDocsProject]:
+            proj.refresh_milestones()
+
+
+DocsPRPair = tuple[PullRecord, PullRecord]
+
 
+class _DocsPRPoll:
+    """What the docs PR gate keeps from one "Check again?" pass to the next."""
 
-DocsPRPair = tuple[PullRequest, PullRequest]
+    def __init__(self):
+        self.code_prs: Optional[MilestonePoller] = None
+        # A merged docs PR stays merged; it is never fetched again.
+        self.merged_docs: dict[int, PullRecord] = {}
 
 
-def _find_docs_pr_pairs(version: Version) -> tuple[list[DocsPRPair], list[DocsPRPair]]:
+def _find_docs_pr_pairs(
+    version: Version, poll: Optional[_DocsPRPoll] = None
+) -> tuple[list[DocsPRPair], list[DocsPRPair]]:
     """Pair the code PRs going into this cut with the docs PRs they link to.
 
     Returns ``(unmerged, unconfirmed)`` as ``(code_pr, docs_pr)`` tuples:
@@ -101,18 +147,25 @@ def _find_docs_pr_pairs(version: Version) -> tuple[list[DocsPRPair], list[DocsPR
     :func:`_check_open_milestone_prs` only sees PRs that carry the milestone,
     and docs PRs frequently have none at all, so nothing else in the cut notices
     a code PR whose documentation is still open.
+
+    Passing the ``poll`` of the previous pass makes the check incremental:
+    only code PRs that changed since then and docs PRs that had not merged
+    yet are fetched again.
     """
     milestone = EsphomeProject.get_milestone_by_title(_cycle_milestone_title(version))
     if milestone is None:
         return [], []
 
-    # Every pass re-fetches: the user is expected to merge docs PRs while the
-    # "Check again?" loop runs, so cached PR payloads would report stale state.
-    EsphomeProject.pr_cache.clear()
-    EsphomeDocsProject.pr_cache.clear()
+    poll = poll or _DocsPRPoll()
+    if poll.code_prs is None or poll.code_prs.milestone.number != milestone.number:
+        poll.code_prs = EsphomeProject.poll_milestone(milestone, "MERGED")
+    code_prs = sorted(
+        (pr for pr in poll.code_prs.poll() if "cherry-picked" not in pr.labels),
+        key=lambda pr: pr.merged_at,
+    )
 
-    references: list[tuple[PullRequest, int]] = []
-    for code_pr in EsphomeProject.get_next_beta_prs_for_milestone(milestone):
+    references: list[tuple[PullRecord, int]] = []
+    for code_pr in code_prs:
         for docs_number in extract_docs_pr_numbers(code_pr.body):
             references.append((code_pr, docs_number))
 
@@ -120,7 +173,16 @@ def _find_docs_pr_pairs(version: Version) -> tuple[list[DocsPRPair], list[DocsPR
         return [], []
 
     docs_numbers = sorted({number for _, number in references})
-    docs_prs = dict(zip(docs_numbers, EsphomeDocsProject.get_prs(docs_numbers)))
+    # The user is expected to merge docs PRs while the "Check again?" loop
+    # runs, so cached copies of unmerged ones would report stale state.
+    pending = [number for number in docs_numbers if number not in poll.merged_docs]
+    docs_prs = {
+        **poll.merged_docs,
+        **dict(zip(pending, EsphomeDocsProject.refresh_prs(pending))),
+    }
+    poll.merged_docs.update(
+        {number: pr for number, pr in docs_prs.items() if pr.merged_at is not None}
+    )
 
     unmerged: list[DocsPRPair] = []
     unconfirmed: list[DocsPRPair] = []
@@ -144,9 +206,19 @@ def _check_linked_docs_prs(version: Version):
     Shipping the code without its documentation is the failure this guards
     against, so unlike :func:`_check_open_milestone_prs` this always blocks: the
     user merges the docs PR(s) and answers "Check again?", or aborts the cut.
+    With ``--webhook-port`` the merges are picked up from webhook deliveries
+    instead.
     """
+    webhooks = EsphomeProject.webhooks
+    poll = _DocsPRPoll()
+    reported = None
     while True:
-        unmerged, unconfirmed = _find_docs_pr_pairs(version)
+        applied = webhooks.applied if webhooks is not None else 0
+        unmerged, unconfirmed = _find_docs_pr_pairs(version, poll)
+        if webhooks is not None and (unmerged, unconfirmed) == reported:
+            webhooks.wait(applied)
+            continue
+        reported = (unmerged, unconfirmed)
 
         if unconfirmed:
             gprint(
@@ -174,6 +246,9 @@ def _check_linked_docs_prs(version: Version):
                 f"      needs docs#{docs_pr.number}: {docs_pr.title} ({docs_pr.html_url})"
             )
 
+        if webhooks is not None:
+            _wait_for_webhook(webhooks, applied)
+            continue
         if not click.confirm(
             click.style("Check again?", fg="yellow"),
             default=True,
@@ -322,8 +397,8 @@ def _clear_merged_prs_from_cycle_milestone(version: Version):
     title = _cycle_milestone_title(version)
     for proj in [EsphomeProject, EsphomeDocsProject]:
         milestone = proj.get_milestone_by_title(title)
-        for issue in proj.remove_merged_prs_from_milestone(milestone):
-            gprint(f"Removed merged #{issue.number} from {title} ({proj.shortname})")
+        for pull in proj.remove_merged_prs_from_milestone(milestone):
+            gprint(f"Removed merged #{pull.number} from {title} ({proj.shortname})")
 
 
 def _close_previous_month_patch_milestones(version: Version):
@@ -351,7 +426,7 @@ def _close_previous_month_patch_milestones(version: Version):
                 gprint(
                     f"Closing leftover patch milestone {milestone.title} for {proj.shortname}"
                 )
-                milestone.update(state="closed")
+                proj.update_milestone(milestone, state="closed")
 
 
 def _set_cycle_milestone_due(version: Version, due: datetime.date):
@@ -361,7 +436,7 @@ def _set_cycle_milestone_due(version: Version, due: datetime.date):
     for proj in [EsphomeProject, EsphomeDocsProject]:
         milestone = proj.get_milestone_by_title(title)
         if milestone is not None:
-            milestone.update(due_on=due_on)
+            proj.update_milestone(milestone, due_on=due_on)
 
 
 def _close_cycle_milestone(*, version: Version, next_version: Version):
@@ -379,12 +454,12 @@ def _close_cycle_milestone(*, version: Version, next_version: Version):
 
         old_milestone = proj.get_milestone_by_title(_cycle_milestone_title(version))
         if old_milestone is not None:
-            old_milestone.update(state="closed")
+            proj.update_milestone(old_milestone, state="closed")
 
 
-def _mark_cherry_picked(cherry_picked):
-    for picked in cherry_picked:
-        picked.add_labels("cherry-picked")
+def _mark_cherry_picked(cherry_picked: list[tuple[Project, list[PullRecord]]]):
+    for proj, picked in cherry_picked:
+        proj.mark_pulls_cherry_picked(picked)
 
 
 def _default_base_version(version: Version) -> Version:
@@ -743,15 +818,99 @@ def _docs_update_supporters(*, version: Version):
         EsphomeDocsProject.commit(f"Update supporters for {version}", ignore_empty=True)
 
 
+def _warm_up_github(version: Version):
+    """Connect to GitHub in the background while the cut syncs local copies.
+
+    The base version prompt's request goes first: it is what the cut asks
+    GitHub for first once the checkouts are up to date.
+    """
+    warm_up(
+        [EsphomeProject, EsphomeDocsProject],
+        [functools.partial(_default_base_version, version)],
+    )
+
+
+def _changelog_head(version: Version) -> Branch:
+    """The branch whose commits the bump branch of ``version`` starts from.
+
+    The first beta merges dev and the first full release merges beta; later
+    cuts cherry-pick onto the branch they release from.
+    """
+    if version.beta == 1:
+        return Branch.DEV
+    if version.beta or version.patch == 0:
+        return Branch.BETA
+    return Branch.STABLE
+
+
+def prefetch(version: Version):
+    """Load what cutting ``version`` reads from GitHub into the local store.
+
+    Run ahead of release day: the cycle milestone with all its PRs, the PRs
+    between the default base and the branch the cut will build on, the docs
+    PRs the milestone links to, open milestones and recent releases. The cut
+    then revalidates what is stored instead of downloading it.
+    """
+    if get_store() is None:
+        raise EsphomeReleaseError(
+            "prefetch fills the local store; set `cache_dir` in config.json"
+        )
+    projects = [EsphomeProject, EsphomeDocsProject]
+    for proj in projects:
+        # Only remote refs and tags move; the checkouts are left alone.
+        proj.run_git("fetch", "--tags", "origin")
+
+    base = _default_base_version(version)
+    head = _changelog_head(version)
+    title = _cycle_milestone_title(version)
+    gprint(f"Prefetching {title} milestone and PRs since {base} for {version}")
+
+    def milestone_prs(proj: Project) -> list[PullRecord]:
+        milestone = proj.get_milestone_by_title(title)
+        if milestone is None:
+            return []
+        return proj.poll_milestone(milestone).poll()
+
+    def changelog_prs(proj: Project) -> list[PullRecord]:
+        numbers = proj.prs_between(f"{base}", f"origin/{proj.lookup_branch(head)}")
+        return proj.get_prs(numbers)
+
+    jobs = []
+    for proj in projects:
+        jobs += [
+            functools.partial(milestone_prs, proj),
+            functools.partial(changelog_prs, proj),
+            proj.latest_release,
+        ]
+    code_milestone, code_changelog, _, docs_milestone, docs_changelog, _ = (
+        process_asynchronously(jobs, "Prefetching")
+    )
+
+    linked = sorted(
+        {
+            number
+            for pr in code_milestone
+            for number in extract_docs_pr_numbers(pr.body)
+        }
+    )
+    EsphomeDocsProject.get_prs(linked)
+    gprint(
+        f"Stored {len(code_milestone) + len(docs_milestone)} milestone PR(s), "
+        f"{len(code_changelog) + len(docs_changelog)} changelog PR(s) and "
+        f"{len(linked)} linked docs PR(s)"
+    )
+
+
 def cut_beta_release(version: Version):
     if not version.beta:
         raise EsphomeReleaseError("Must be beta release!")
 
+    _warm_up_github(version)
+    update_local_copies()
+    propagate_docs_current_branch()
     base = _prompt_base_version(version)
     _check_open_milestone_prs(version, block=False)
     _check_linked_docs_prs(version)
-    update_local_copies()
-    propagate_docs_current_branch()
 
     # Commits that were cherry-picked
     cherry_picked = []
@@ -773,7 +932,9 @@ def cut_beta_release(version: Version):
     else:
         gprint("Creating next beta version using cherry-pick")
         for proj in [EsphomeProject, EsphomeDocsProject]:
-            cherry_picked.extend(_strategy_cherry_pick(proj, version, base=Branch.BETA))
+            cherry_picked.append(
+                (proj, _strategy_cherry_pick(proj, version, base=Branch.BETA))
+            )
     _docs_insert_changelog(version=version, base=base)
     _docs_update_supporters(version=version)
 
@@ -803,11 +964,12 @@ def cut_release(version: Version):
     if version.beta or version.dev:
         raise EsphomeReleaseError("Must be full release!")
 
+    _warm_up_github(version)
+    update_local_copies()
+    propagate_docs_current_branch()
     base = _prompt_base_version(version)
     _check_open_milestone_prs(version, block=True)
     _check_linked_docs_prs(version)
-    update_local_copies()
-    propagate_docs_current_branch()
 
     # Commits that were cherry-picked
     cherry_picked = []
@@ -815,16 +977,19 @@ def cut_release(version: Version):
     if version.patch == 0:
         gprint("Creating first release version using merge + cherry-pick")
         for proj in [EsphomeProject, EsphomeDocsProject]:
-            cherry_picked.extend(
-                _strategy_merge_then_cherry_pick(
-                    proj, version, base=Branch.STABLE, head=Branch.BETA
+            cherry_picked.append(
+                (
+                    proj,
+                    _strategy_merge_then_cherry_pick(
+                        proj, version, base=Branch.STABLE, head=Branch.BETA
+                    ),
                 )
             )
     else:
         gprint("Creating next full release using cherry-pick")
         for proj in [EsphomeProject, EsphomeDocsProject]:
-            cherry_picked.extend(
-                _strategy_cherry_pick(proj, version, base=Branch.STABLE)
+            cherry_picked.append(
+                (proj, _strategy_cherry_pick(proj, version, base=Branch.STABLE))
             )
     _docs_insert_changelog(version=version, base=base)
     _docs_update_supporters(version=version)
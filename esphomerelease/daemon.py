@@ -0,0 +1,269 @@
+"""Serve commands from a long-running process that keeps its state warm.
+
+Every invocation started cold: read ``config.json``, build the projects, run
+``gh auth token``, probe the rate limit, and list milestones and releases
+again, only to throw all of it away on exit. ``esphomerelease daemon`` keeps
+one process around; its GitHub session and conditional-request cache outlive
+the commands it runs. The CLI hands a command to
+the daemon over a Unix socket (:func:`forward`) and streams its output back,
+and runs it in-process as before whenever no daemon is listening, the
+daemon declines, or it is still busy with another client's command.
+
+The daemon only takes commands that run without a terminal (see
+``commands.DAEMON_COMMANDS``) with every option they would otherwise prompt
+for, from clients in its own working directory (``config.json`` paths are
+relative to it). A command that asks for input anyway is abandoned and
+declined, so the client runs it in-process with the terminal it needs.
+
+The wire format is one JSON object per line. The client sends
+``{"argv": [...], "cwd": ..., "color": ...}``; the daemon answers at once
+with ``{"declined": reason}`` or ``{"started": true}``, then with any number
+of ``{"out": text}`` / ``{"err": text}`` and a final ``{"exit": code}`` or
+``{"declined": reason}``. Commands swap the process-wide ``sys`` streams, so
+the daemon serves one client at a time; a client that gets no first answer
+within :data:`ACCEPT_TIMEOUT` gives up rather than queue behind a long
+command.
+
+Import-clean (stdlib only); what a command is and how it runs is passed in.
+"""
+
+import io
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import traceback
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .exceptions import EsphomeReleaseError
+
+# Seconds a client waits for the daemon's first answer. An idle daemon answers
+# in milliseconds; one that takes longer is running another command.
+ACCEPT_TIMEOUT = 1.0
+
+
+def socket_path(configured: Optional[str] = None) -> Path:
+    """Where the daemon listens: ``configured`` (the ``daemon_socket`` config
+    key) or a per-user socket in the temp directory."""
+    if configured:
+        return Path(configured).expanduser()
+    return Path(tempfile.gettempdir()) / f"esphomerelease-{os.getuid()}.sock"
+
+
+class NeedsTerminal(Exception):
+    """A command run by the daemon tried to read input."""
+
+
+class _NoInput(io.TextIOBase):
+    """``stdin`` of a command run by the daemon."""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size=-1):
+        raise NeedsTerminal
+
+    def readline(self, size=-1):
+        raise NeedsTerminal
+
+
+class _Frames(io.TextIOBase):
+    """A text stream sending what is written as ``{name: text}`` frames."""
+
+    def __init__(self, wfile, name: str, lock: threading.Lock):
+        super().__init__()
+        self._wfile = wfile
+        self._name = name
+        self._lock = lock
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            # Also tells click this is no binary stream to wrap.
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            try:
+                _send(self._wfile, {self._name: text}, self._lock)
+            except OSError:
+                # The client went away; let the command finish regardless.
+                pass
+        return len(text)
+
+
+def _send(wfile, message: dict, lock: Optional[threading.Lock] = None):
+    line = json.dumps(message).encode() + b"\n"
+    if lock is None:
+        wfile.write(line)
+        wfile.flush()
+        return
+    with lock:
+        wfile.write(line)
+        wfile.flush()
+
+
+class CommandDaemon:
+    """Runs the commands clients send over a Unix socket, one at a time.
+
+    ``accepts(argv)`` is None for a command the daemon may run, or the reason
+    it declines; ``run(argv, color)`` runs an accepted command and returns its
+    exit code. ``before_command`` is called before each of them, e.g. to drop
+    state that must not carry over from one command to the next.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[List[str], bool], int],
+        accepts: Callable[[List[str]], Optional[str]],
+        *,
+        cwd: Optional[str] = None,
+        before_command: Optional[Callable[[], None]] = None,
+    ):
+        self._run = run
+        self._accepts = accepts
+        self.cwd = os.path.realpath(cwd or os.getcwd())
+        self._before_command = before_command
+        self.commands = 0
+
+    def listen(self, path: Path) -> socketserver.UnixStreamServer:
+        """Bind ``path``; run the returned server's ``serve_forever()``.
+
+        A socket left behind by a daemon that died is replaced; one with a
+        daemon behind it is an error.
+        """
+        path = Path(path)
+        if path.exists():
+            sock = _connect(path)
+            if sock is not None:
+                sock.close()
+                raise EsphomeReleaseError(f"A daemon is already listening on {path}")
+            path.unlink()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                # pylint: disable=protected-access
+                daemon._handle(self.rfile, self.wfile)
+
+        umask = os.umask(0o177)
+        try:
+            # Only our own user may connect.
+            return socketserver.UnixStreamServer(str(path), Handler)
+        finally:
+            os.umask(umask)
+
+    def _handle(self, rfile, wfile):
+        try:
+            request = json.loads(rfile.readline())
+            argv = [str(arg) for arg in request["argv"]]
+        except (ValueError, KeyError, TypeError):
+            return
+        if os.path.realpath(request.get("cwd") or "") != self.cwd:
+            _send(wfile, {"declined": f"the daemon runs in {self.cwd}"})
+            return
+        reason = self._accepts(argv)
+        if reason is not None:
+            _send(wfile, {"declined": reason})
+            return
+        try:
+            _send(wfile, {"started": True})
+        except OSError:
+            # The client stopped waiting and runs the command itself.
+            return
+
+        if self._before_command is not None:
+            self._before_command()
+        self.commands += 1
+        lock = threading.Lock()
+        streams = sys.stdin, sys.stdout, sys.stderr
+        sys.stdin = _NoInput()
+        sys.stdout = _Frames(wfile, "out", lock)
+        sys.stderr = _Frames(wfile, "err", lock)
+        try:
+            exit_code = self._run(argv, bool(request.get("color")))
+        except NeedsTerminal:
+            reply = {"declined": "the command asked for input"}
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            reply = {"exit": 1}
+        else:
+            reply = {"exit": exit_code}
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = streams
+        try:
+            _send(wfile, reply, lock)
+        except OSError:
+            pass
+
+
+def _connect(path: Path) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(
+    path: Path,
+    argv: List[str],
+    *,
+    cwd: Optional[str] = None,
+    color: bool = False,
+    stdout=None,
+    stderr=None,
+) -> Optional[int]:
+    """Run ``argv`` in the daemon listening on ``path``.
+
+    Streams the command's output to ``stdout`` / ``stderr`` (``sys.stdout``
+    / ``sys.stderr``) and returns its exit code, or None when there is no
+    daemon, it declined, or it did not answer within :data:`ACCEPT_TIMEOUT`
+    because it is busy with another command: the caller then runs the command
+    itself.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        _send(
+            stream, {"argv": list(argv), "cwd": cwd or os.getcwd(), "color": color}
+        )
+        sock.settimeout(ACCEPT_TIMEOUT)
+        try:
+            first = stream.readline()
+        except OSError:
+            return None
+        sock.settimeout(None)
+        for line in itertools.chain([first] if first else [], stream):
+            message = json.loads(line)
+            if "started" in message:
+                continue
+            if "out" in message:
+                stdout.write(message["out"])
+                stdout.flush()
+            elif "err" in message:
+                stderr.write(message["err"])
+                stderr.flush()
+            elif "exit" in message:
+                return message["exit"]
+            else:
+                return None
+    # The daemon went away mid-command.
+    raise EsphomeReleaseError(
+        "The daemon closed the connection before the command finished"
+    )
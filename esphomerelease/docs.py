@@ -5,51 +5,51 @@ from typing import Optional
 
 from github3.exceptions import NotFoundError
 
-from .github import get_session
+from .github import get_app_session
+from .pagination import paginate
 from .project import EsphomeDocsProject
+from .retry import transient_delay
 from .supporters import (
     Supporter,
     format_supporter_lines,
     is_bot_account,
     render_supporters_template,
 )
-from .util import process_asynchronously
+from .util import iter_asynchronously
 
 # Contrib api does not return full user name, and since we query 1 api call per contrib
 # cache so next runs takes less time.
 USERS_CACHE_FILE = "users_cache.json"
 
-MAX_RETRIES = 5
-
 REPO_CONTRIBS_IGNORE = [
     "backlog",
 ]
 
 
 def get_repo_contribs(session, repo_name: str) -> list[tuple[str, str]]:
-    """(id, login) pairs of one repo's contributors, retrying transient API errors.
+    """(id, login) pairs of one repo's contributors.
 
     Bot accounts (GitHub-reported ``type == "Bot"``, or an id/login matching
     ``is_bot_account``) are filtered out here so they never get written back
     into users_cache.json by gen_supporters(). The id is the numeric GitHub
     account id, stable across login renames.
+
+    A transient error is raised, for the job list to retry; a repo that
+    cannot be listed for any other reason is reported and contributes
+    nothing.
     """
-    attempts = 0
-    exception_message = ""
-    while attempts < MAX_RETRIES:
-        try:
-            repo = session.repository("esphome", repo_name)
-            return [
-                (str(c.id), c.login)
-                for c in repo.contributors()
-                if c.type != "Bot" and not is_bot_account(str(c.id), c.login)
-            ]
-        except Exception as e:  # pylint: disable=broad-except
-            attempts += 1
-            exception_message = str(e)
-
-    print(f"Error getting contributors from {repo_name}: {exception_message}")
-    return []
+    try:
+        repo = session.repository("esphome", repo_name)
+        return [
+            (str(c.id), c.login)
+            for c in paginate(repo.contributors())
+            if c.type != "Bot" and not is_bot_account(str(c.id), c.login)
+        ]
+    except Exception as e:  # pylint: disable=broad-except
+        if transient_delay(e) is not None:
+            raise
+        print(f"Error getting contributors from {repo_name}: {e}")
+        return []
 
 
 def _fetch_user_name(
@@ -66,7 +66,7 @@ def gen_supporters():
     with open("supporters.template.md", "r", encoding="utf-8") as f:
         template = f.read()
 
-    sess = get_session()
+    sess = get_app_session()
 
     try:
         with open(USERS_CACHE_FILE, encoding="utf-8") as f:
@@ -76,17 +76,21 @@ def gen_supporters():
 
     orgs = sess.organization("esphome")
     repo_names = [
-        r.name for r in orgs.repositories() if r.name not in REPO_CONTRIBS_IGNORE
+        r.name
+        for r in paginate(orgs.repositories())
+        if r.name not in REPO_CONTRIBS_IGNORE
     ]
 
     contrib_jobs = [
         functools.partial(get_repo_contribs, sess, name) for name in repo_names
     ]
+    # A repo that still fails transiently after its retries fails the run:
+    # writing the supporters page without its contributors would drop them.
     # id -> login, deduplicated across repos. A later repo's casing for a
     # given id (should GitHub ever disagree with itself) wins, but this is
     # purely cosmetic - the id is what identifies the account.
     contribs: dict[str, str] = {}
-    for repo_contribs in process_asynchronously(contrib_jobs, "Fetching contributors"):
+    for repo_contribs in iter_asynchronously(contrib_jobs, "Fetching contributors"):
         for account_id, login in repo_contribs:
             contribs[account_id] = login
 
@@ -98,8 +102,9 @@ def gen_supporters():
         for account_id in sorted(contribs, key=lambda i: contribs[i].casefold())
         if account_id not in users
     ]
-    for account_id, login, name, error in process_asynchronously(
-        user_jobs, "Fetching user names"
+    # Each name is stored as it arrives; the order of the cache is fixed below.
+    for account_id, login, name, error in iter_asynchronously(
+        user_jobs, "Fetching user names", ordered=False
     ):
         if error is not None:
             print(f"Error getting user {login}: {error}")
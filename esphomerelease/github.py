@@ -1,15 +1,30 @@
 import subprocess
+import threading
 from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional
 
-import github3.session
 from github3 import GitHub
 
+from .appauth import InstallationTokenAuth, InstallationTokens
 from .config import CONFIG
 from .exceptions import EsphomeReleaseError
+from .transport import ReleaseSession, pooled_session
 
 
 GITHUB_SESSION = None
 GITHUB_TOKEN: str | None = None
+GITHUB_APP_TOKENS: Optional[InstallationTokens] = None
+GITHUB_APP_SESSION = None
+
+# Held while the session is being set up, so a warm-up in progress is waited
+# for instead of duplicated.
+_SESSION_LOCK = threading.Lock()
+# Held while the App's installation tokens and session are set up.
+_APP_TOKENS_LOCK = threading.Lock()
+# Rate limit status of a session set up in the background, printed by the
+# first foreground get_session() so it does not interleave with prompts.
+_UNANNOUNCED: Optional[str] = None
 
 # The gh OAuth token needs the `repo` scope to create releases and pull
 # requests. Without it the API answers 403 instead of anything descriptive.
@@ -55,6 +70,38 @@ def _token_from_gh_cli() -> str:
     return token
 
 
+def get_app_tokens() -> Optional[InstallationTokens]:
+    """Return the GitHub App installation tokens, if an App is configured.
+
+    Set `github_app_id` and `github_app_private_key` (the path of the App's
+    PEM key) in config.json to authenticate the org-wide commands as the App's
+    installation on the esphome organization (see :func:`get_app_session`);
+    `github_app_installation_id` saves looking it up.
+    """
+    global GITHUB_APP_TOKENS
+
+    if GITHUB_APP_TOKENS is not None or not CONFIG.get("github_app_id"):
+        return GITHUB_APP_TOKENS
+
+    with _APP_TOKENS_LOCK:
+        if GITHUB_APP_TOKENS is not None:
+            return GITHUB_APP_TOKENS
+        key_path = Path(CONFIG.get("github_app_private_key") or "").expanduser()
+        try:
+            private_key_pem = key_path.read_bytes()
+        except OSError as err:
+            raise EsphomeReleaseError(
+                "`github_app_id` is set, but the App's private key could not be "
+                f"read from `github_app_private_key` ({err})."
+            ) from None
+        GITHUB_APP_TOKENS = InstallationTokens(
+            CONFIG["github_app_id"],
+            private_key_pem,
+            installation_id=CONFIG.get("github_app_installation_id"),
+        )
+    return GITHUB_APP_TOKENS
+
+
 def get_token() -> str:
     """Return the GitHub token to authenticate with, resolving it once.
 
@@ -78,22 +125,107 @@ def get_token() -> str:
     return GITHUB_TOKEN
 
 
-def get_session() -> GitHub:
-    global GITHUB_SESSION
-
-    if GITHUB_SESSION is not None:
-        return GITHUB_SESSION
-
-    token = get_token()
-
-    # Increase read timeout for creating PRs with long bodies.
-    sess = github3.session.GitHubSession(default_read_timeout=30)
-    gh = GitHub(token=token, session=sess)
+def _rate_limit_status(gh: GitHub) -> str:
     rate_limit = gh.rate_limit()["rate"]
     limit = rate_limit["limit"]
     remaining = rate_limit["remaining"]
     reset = datetime.utcfromtimestamp(rate_limit["reset"])
-    print(f"{remaining}/{limit} rate limit remaining")
-    print(f"Reset at {reset} UTC (in {reset - datetime.utcnow()})")
-    GITHUB_SESSION = gh
-    return GITHUB_SESSION
+    return (
+        f"{remaining}/{limit} rate limit remaining\n"
+        f"Reset at {reset} UTC (in {reset - datetime.utcnow()})"
+    )
+
+
+def get_session(*, announce: bool = True) -> GitHub:
+    global GITHUB_SESSION, _UNANNOUNCED
+
+    with _SESSION_LOCK:
+        if GITHUB_SESSION is None:
+            token = get_token()
+
+            # Increase read timeout for creating PRs with long bodies. Repeat
+            # GETs (milestone and release listings polled by the cut
+            # pre-flight) are revalidated with conditional requests instead of
+            # downloaded again.
+            sess = pooled_session(ReleaseSession, default_read_timeout=30)
+            gh = GitHub(token=token, session=sess)
+            _UNANNOUNCED = _rate_limit_status(gh)
+            GITHUB_SESSION = gh
+        if announce and _UNANNOUNCED is not None:
+            print(_UNANNOUNCED)
+            _UNANNOUNCED = None
+        return GITHUB_SESSION
+
+
+def get_app_session() -> GitHub:
+    """The session of the org-wide bulk commands (`supporters`, `labels`).
+
+    Authenticated as the GitHub App installation when one is configured (see
+    :func:`get_app_tokens`), so those commands spend the installation's rate
+    limit rather than the release manager's. Everything else, the cut and
+    publish writes included, stays on :func:`get_session`, which is also what
+    this returns without an App.
+    """
+    global GITHUB_APP_SESSION
+
+    app_tokens = get_app_tokens()
+    if app_tokens is None:
+        return get_session()
+
+    with _APP_TOKENS_LOCK:
+        if GITHUB_APP_SESSION is None:
+            sess = pooled_session(ReleaseSession, default_read_timeout=30)
+            # Installation tokens expire hourly; each request takes the
+            # current one.
+            sess.auth = InstallationTokenAuth(app_tokens)
+            gh = GitHub(session=sess)
+            print(f"GitHub App {app_tokens.app_id}: {_rate_limit_status(gh)}")
+            GITHUB_APP_SESSION = gh
+        return GITHUB_APP_SESSION
+
+
+def announce_rate_limit():
+    """Print the rate limit status of a session set up in the background.
+
+    Printed once, by whichever of this and :func:`get_session` comes first in
+    the foreground; does nothing before a session is set up.
+    """
+    global _UNANNOUNCED
+
+    with _SESSION_LOCK:
+        if _UNANNOUNCED is not None:
+            print(_UNANNOUNCED)
+            _UNANNOUNCED = None
+
+
+def warm_up(projects: Iterable, calls: Iterable[Callable] = ()) -> threading.Thread:
+    """Set up the GitHub session for ``projects`` in a background thread.
+
+    Resolves the token (a ``gh`` subprocess), opens the connection, probes the
+    rate limit, makes ``calls`` (what the foreground asks GitHub first) and
+    lists each project's open milestones and recent releases, while the
+    foreground syncs the local git checkouts. Anything
+    the foreground asks for meanwhile waits for the warm-up instead of
+    repeating it; later listings are answered from the registry or revalidated
+    with a 304.
+
+    Failures are dropped here: the same call fails again in the foreground,
+    where it is reported properly.
+    """
+    projects = list(projects)
+    calls = list(calls)
+
+    def run():
+        try:
+            get_session(announce=False)
+            for call in calls:
+                call()
+            for proj in projects:
+                proj.get_open_milestones()
+                proj.latest_release()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    thread = threading.Thread(target=run, name="github-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,158 @@
+"""Adaptive limit on concurrent GitHub requests.
+
+A fixed thread count is wrong in both directions: on a many-core runner it
+floods GitHub and trips the secondary (abuse) rate limit, on a small laptop it
+leaves throughput unused. Every request made through the release session
+takes a slot from one shared :class:`ConcurrencyGovernor`, which adjusts the
+number of slots from what GitHub reports back:
+
+- each run of successful, normally fast responses earns one more slot
+  (additive increase, up to ``maximum``);
+- a response much slower than usual gives one slot back;
+- a secondary rate limit (403/429 with ``Retry-After`` or the abuse message)
+  halves the slots and pauses every request until GitHub's retry time;
+- a nearly exhausted primary quota (``X-RateLimit-Remaining``) drops to a
+  single slot, so what is left is not burnt in a burst.
+
+Import-clean (stdlib only); responses are duck-typed (``status_code``,
+``headers``, ``text``).
+"""
+
+import contextlib
+import threading
+import time
+from typing import Optional
+
+# GitHub's documented wait when a secondary rate limit carries no Retry-After.
+DEFAULT_SECONDARY_RETRY_AFTER = 60.0
+
+# A response this many times slower than the running average counts as
+# GitHub struggling.
+SLOW_RESPONSE_FACTOR = 2.0
+
+
+def secondary_rate_limit_delay(response) -> Optional[float]:
+    """Seconds to wait before retrying ``response``, if it was rate limited.
+
+    Returns ``None`` for anything that is not a secondary rate limit, in
+    particular a 403 for missing permissions or an exhausted primary quota
+    (which only resets on the hour and is not worth waiting for).
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return DEFAULT_SECONDARY_RETRY_AFTER
+    if response.status_code == 429:
+        return DEFAULT_SECONDARY_RETRY_AFTER
+    if "secondary rate limit" in (getattr(response, "text", "") or "").lower():
+        return DEFAULT_SECONDARY_RETRY_AFTER
+    return None
+
+
+class ConcurrencyGovernor:
+    """AIMD-controlled semaphore shared by every GitHub-bound request."""
+
+    def __init__(
+        self,
+        *,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 32,
+        reserve: int = 200,
+        clock=time.monotonic,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        # Below this many remaining primary-quota requests, run one at a time.
+        self.reserve = reserve
+        self.limit = initial
+        self.peak = initial
+        self.requests = 0
+        self.backoffs = 0
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._streak = 0
+        self._average_latency: Optional[float] = None
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one request slot, waiting out any rate limit pause first."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - self._clock()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight < self.limit:
+                    break
+                else:
+                    self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, response, latency: float) -> Optional[float]:
+        """Adjust the limit from one response.
+
+        Returns the delay before the request should be retried when GitHub
+        rate limited it (every slot is paused for that long), else ``None``.
+        """
+        with self._cond:
+            self.requests += 1
+            try:
+                delay = self._adjust(response, latency)
+            finally:
+                self._cond.notify_all()
+            return delay
+
+    def _adjust(self, response, latency: float) -> Optional[float]:
+        delay = secondary_rate_limit_delay(response)
+        if delay is not None:
+            self.backoffs += 1
+            self._streak = 0
+            self.limit = max(self.minimum, self.limit // 2)
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+            return delay
+
+        remaining = response.headers.get("X-RateLimit-Remaining", "")
+        if remaining.isdigit() and int(remaining) < self.reserve:
+            self._streak = 0
+            self.limit = self.minimum
+            return None
+
+        average = self._average_latency
+        self._average_latency = (
+            latency if average is None else 0.8 * average + 0.2 * latency
+        )
+        if average is not None and latency > SLOW_RESPONSE_FACTOR * average:
+            self._streak = 0
+            self.limit = max(self.minimum, self.limit - 1)
+            return None
+
+        self._streak += 1
+        if self._streak >= self.limit and self.limit < self.maximum:
+            self._streak = 0
+            self.limit += 1
+            self.peak = max(self.peak, self.limit)
+        return None
+
+    def summary(self) -> str:
+        backoffs = f", {self.backoffs} rate limit back-off(s)" if self.backoffs else ""
+        return (
+            f"GitHub concurrency settled at {self.limit} "
+            f"(peak {self.peak}, {self.requests} requests{backoffs})"
+        )
+
+
+# Shared by every session the release tooling creates, so all GitHub-bound
+# jobs draw from the same budget.
+GOVERNOR = ConcurrencyGovernor()
@@ -0,0 +1,364 @@
+"""Batched reads through GitHub's GraphQL API.
+
+The REST API answers one pull request per request, so hydrating the few hundred
+PRs of a release cycle costs as many round trips and a large share of the
+hourly rate limit. A single GraphQL query can alias up to 100 ``pullRequest``
+lookups, so the same cycle needs around ten requests.
+
+Milestone contents are read from ``milestone.pullRequests`` rather than the
+REST issues index, which is known to drop PRs; each page of 100 carries the
+full PR (merged state, labels, merge commit), so nothing is fetched twice.
+
+Import-clean (stdlib and ``.exceptions`` only): the session is passed in, so
+the query building and payload parsing are unit-testable without a configured
+working copy or GitHub credentials.
+"""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from .exceptions import EsphomeReleaseError
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# GitHub caps a connection page (and, in practice, a sensible number of
+# aliased lookups per document) at 100 nodes.
+MAX_NODES_PER_QUERY = 100
+
+# Everything the changelog, cherry-pick and docs-pairing code reads off a PR.
+PULL_REQUEST_FRAGMENT = """
+fragment PullFields on PullRequest {
+  id
+  number
+  title
+  body
+  url
+  state
+  mergedAt
+  updatedAt
+  mergeCommit { oid }
+  author { __typename login url }
+  labels(first: 100) { nodes { name } }
+  milestone { number title }
+}
+"""
+
+
+class GraphQLError(EsphomeReleaseError):
+    """The GraphQL endpoint answered with errors instead of data.
+
+    ``status_code`` is the HTTP status of a failed request, e.g. to tell a
+    502 worth retrying from a query GitHub rejected.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a GraphQL ``DateTime`` (always UTC, ``Z``-suffixed)."""
+    if value is None:
+        return None
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+class GraphQLPullRequest:
+    """A pull request hydrated from GraphQL, shaped like github3's ``PullRequest``.
+
+    Only the attributes the release tooling reads are provided, in the same
+    form github3 exposes them (``labels`` as a list of ``{"name": ...}`` dicts,
+    ``milestone`` as a dict, a timezone-aware ``merged_at``), so cached
+    GraphQL and REST results are interchangeable for every consumer.
+    """
+
+    def __init__(self, node: dict):
+        self._node = node
+        # Payloads persisted before the id was queried have none.
+        self.node_id: Optional[str] = node.get("id")
+        self.number: int = node["number"]
+        self.title: str = node["title"]
+        self.body: str = node["body"]
+        self.html_url: str = node["url"]
+        self.state: str = "open" if node["state"] == "OPEN" else "closed"
+        self.merged_at: Optional[datetime] = _parse_timestamp(node["mergedAt"])
+        self.updated_at: Optional[datetime] = _parse_timestamp(node["updatedAt"])
+        merge_commit = node["mergeCommit"]
+        self.merge_commit_sha: Optional[str] = (
+            merge_commit["oid"] if merge_commit else None
+        )
+        self.labels: List[dict] = [
+            {"name": label["name"]} for label in node["labels"]["nodes"]
+        ]
+        milestone = node["milestone"]
+        self.milestone: Optional[dict] = (
+            {"number": milestone["number"], "title": milestone["title"]}
+            if milestone
+            else None
+        )
+        author = node["author"] or {}
+        login = author.get("login", "ghost")
+        # REST reports app accounts as e.g. ``dependabot[bot]``; GraphQL drops
+        # the suffix. Restore it so changelog lines read the same either way.
+        if author.get("__typename") == "Bot":
+            login = f"{login}[bot]"
+        self.user = SimpleNamespace(
+            login=login, html_url=author.get("url", "https://github.com/ghost")
+        )
+
+    def as_dict(self) -> dict:
+        """The raw GraphQL node, e.g. for persisting (mirrors github3)."""
+        return self._node
+
+    def __repr__(self):
+        return f"<GraphQLPullRequest #{self.number}>"
+
+
+def build_pull_requests_query(
+    numbers: List[int], selection: str = "...PullFields"
+) -> str:
+    """One document looking up every PR in ``numbers`` under its own alias.
+
+    ``selection`` is the field selection applied to each PR; the default pulls
+    in :data:`PULL_REQUEST_FRAGMENT`.
+    """
+    lookups = "\n".join(
+        f"    pr{number}: pullRequest(number: {int(number)}) {{ {selection} }}"
+        for number in numbers
+    )
+    query = (
+        "query($owner: String!, $name: String!) {\n"
+        "  repository(owner: $owner, name: $name) {\n"
+        f"{lookups}\n"
+        "  }\n"
+        "}\n"
+    )
+    if "...PullFields" in selection:
+        query += PULL_REQUEST_FRAGMENT
+    return query
+
+
+def _post(session, query: str, variables: Optional[dict]) -> dict:
+    response = session.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+    if response.status_code != 200:
+        raise GraphQLError(
+            f"GraphQL request failed with HTTP {response.status_code}: "
+            f"{response.text[:200]}",
+            response.status_code,
+        )
+    return response.json()
+
+
+def execute(session, query: str, variables: Optional[dict] = None) -> dict:
+    """POST a GraphQL document and return its ``data``.
+
+    ``NOT_FOUND`` errors are tolerated (the affected fields come back ``null``
+    and the caller decides); any other error fails the whole call.
+    """
+    return response_data(_post(session, query, variables))
+
+
+def execute_partial(
+    session, query: str, variables: Optional[dict] = None
+) -> Tuple[dict, List[dict]]:
+    """POST a GraphQL document and return its ``data`` and ``errors``.
+
+    For documents of independent fields (aliased mutations), where one failed
+    field must not discard the results of the others. Only a failed HTTP
+    request raises.
+    """
+    payload = _post(session, query, variables)
+    return payload.get("data") or {}, payload.get("errors") or []
+
+
+def response_data(payload: dict) -> dict:
+    """The ``data`` of a 200 GraphQL response, under :func:`execute`'s error
+    policy."""
+    errors = [
+        error
+        for error in payload.get("errors") or []
+        if error.get("type") != "NOT_FOUND"
+    ]
+    if errors:
+        raise GraphQLError(
+            "GraphQL request failed: "
+            + "; ".join(error.get("message", str(error)) for error in errors)
+        )
+    return payload.get("data") or {}
+
+
+def _query_pull_requests(
+    session, owner: str, name: str, numbers: List[int], selection: str
+) -> Dict[int, dict]:
+    if len(numbers) > MAX_NODES_PER_QUERY:
+        raise ValueError(
+            f"At most {MAX_NODES_PER_QUERY} PRs per query, got {len(numbers)}"
+        )
+    data = execute(
+        session,
+        build_pull_requests_query(numbers, selection),
+        {"owner": owner, "name": name},
+    )
+    repository = data.get("repository") or {}
+    nodes = {number: repository.get(f"pr{number}") for number in numbers}
+    return {number: node for number, node in nodes.items() if node is not None}
+
+
+def fetch_pull_request_batch(
+    session, owner: str, name: str, numbers: List[int]
+) -> Dict[int, GraphQLPullRequest]:
+    """Hydrate up to :data:`MAX_NODES_PER_QUERY` PRs with a single request.
+
+    Numbers that are not pull requests in the repository are left out of the
+    result rather than failing the batch.
+    """
+    nodes = _query_pull_requests(session, owner, name, numbers, "...PullFields")
+    return {number: GraphQLPullRequest(node) for number, node in nodes.items()}
+
+
+def fetch_pull_request_ids(
+    session, owner: str, name: str, numbers: List[int]
+) -> Dict[int, str]:
+    """The node ids mutations address PRs by, one request per 100 numbers."""
+    ids: Dict[int, str] = {}
+    for batch in chunked(numbers):
+        nodes = _query_pull_requests(session, owner, name, batch, "id")
+        ids.update({number: node["id"] for number, node in nodes.items()})
+    return ids
+
+
+def fetch_label_ids(session, owner: str, name: str, labels: List[str]) -> Dict[str, str]:
+    """The node ids of the named labels, in one request.
+
+    Raises :class:`GraphQLError` for a label the repository does not have.
+    """
+    lookups = "\n".join(
+        f"    label{index}: label(name: {json.dumps(label)}) {{ id }}"
+        for index, label in enumerate(labels)
+    )
+    data = execute(
+        session,
+        "query($owner: String!, $name: String!) {\n"
+        "  repository(owner: $owner, name: $name) {\n"
+        f"{lookups}\n"
+        "  }\n"
+        "}\n",
+        {"owner": owner, "name": name},
+    )
+    repository = data.get("repository") or {}
+    ids = {}
+    for index, label in enumerate(labels):
+        node = repository.get(f"label{index}")
+        if node is None:
+            raise GraphQLError(f"Label {label!r} not found in {owner}/{name}")
+        ids[label] = node["id"]
+    return ids
+
+
+def fetch_updated_at_batch(
+    session, owner: str, name: str, numbers: List[int]
+) -> Dict[int, str]:
+    """The raw ``updatedAt`` of up to :data:`MAX_NODES_PER_QUERY` PRs.
+
+    A near-free probe for revalidating cached payloads in bulk: only PRs whose
+    timestamp moved need hydrating again.
+    """
+    nodes = _query_pull_requests(session, owner, name, numbers, "updatedAt")
+    return {number: node["updatedAt"] for number, node in nodes.items()}
+
+
+def _milestone_pull_requests_query(selection: str) -> str:
+    query = f"""
+query(
+  $owner: String!, $name: String!, $milestone: Int!,
+  $states: [PullRequestState!], $after: String
+) {{
+  repository(owner: $owner, name: $name) {{
+    milestone(number: $milestone) {{
+      pullRequests(first: 100, after: $after, states: $states) {{
+        pageInfo {{ hasNextPage endCursor }}
+        nodes {{ {selection} }}
+      }}
+    }}
+  }}
+}}
+"""
+    if "...PullFields" in selection:
+        query += PULL_REQUEST_FRAGMENT
+    return query
+
+
+MILESTONE_PULL_REQUESTS_QUERY = _milestone_pull_requests_query("...PullFields")
+
+# Only what tells whether a listed PR changed; see fetch_milestone_pull_stamps.
+MILESTONE_PULL_STAMPS_QUERY = _milestone_pull_requests_query("number updatedAt")
+
+
+def _milestone_nodes(
+    session,
+    query: str,
+    owner: str,
+    name: str,
+    milestone: int,
+    *,
+    states: Optional[List[str]],
+) -> List[dict]:
+    nodes: List[dict] = []
+    variables = {"owner": owner, "name": name, "milestone": milestone, "states": states}
+    while True:
+        data = execute(session, query, variables)
+        node = (data.get("repository") or {}).get("milestone")
+        if node is None:
+            raise GraphQLError(f"Milestone {milestone} not found in {owner}/{name}")
+        connection = node["pullRequests"]
+        nodes.extend(connection["nodes"])
+        if not connection["pageInfo"]["hasNextPage"]:
+            return nodes
+        variables = {**variables, "after": connection["pageInfo"]["endCursor"]}
+
+
+def fetch_milestone_pull_requests(
+    session,
+    owner: str,
+    name: str,
+    milestone: int,
+    states: Optional[List[str]] = None,
+) -> List[GraphQLPullRequest]:
+    """Every PR on milestone number ``milestone``, a page of 100 per request.
+
+    ``states`` filters by ``OPEN``, ``CLOSED`` (unmerged) and ``MERGED``;
+    ``None`` returns all of them.
+    """
+    nodes = _milestone_nodes(
+        session, MILESTONE_PULL_REQUESTS_QUERY, owner, name, milestone, states=states
+    )
+    return [GraphQLPullRequest(node) for node in nodes]
+
+
+def fetch_milestone_pull_stamps(
+    session,
+    owner: str,
+    name: str,
+    milestone: int,
+    states: Optional[List[str]] = None,
+) -> Dict[int, Optional[datetime]]:
+    """``updatedAt`` of every PR on a milestone, in listing order.
+
+    The same listing as :func:`fetch_milestone_pull_requests` without the PR
+    bodies: a cheap way to find which PRs changed since they were fetched.
+    """
+    nodes = _milestone_nodes(
+        session, MILESTONE_PULL_STAMPS_QUERY, owner, name, milestone, states=states
+    )
+    return {node["number"]: _parse_timestamp(node["updatedAt"]) for node in nodes}
+
+
+def chunked(numbers: List[int], size: int = MAX_NODES_PER_QUERY) -> List[List[int]]:
+    """Split ``numbers`` into query-sized batches, preserving order."""
+    batches = []
+    for start in range(0, len(numbers), size):
+        end = start + size
+        batches.append(numbers[start:end])
+    return batches
@@ -0,0 +1,224 @@
+"""Worker threads shared by every job list a command runs.
+
+:func:`~esphomerelease.util.iter_asynchronously` runs its jobs as a
+:class:`TaskGroup` on :data:`JOB_POOL`; helpers that fan out within a job,
+such as :func:`~esphomerelease.pagination.paginate` and
+:class:`~esphomerelease.writes.WriteQueue`, start groups of their own with
+:func:`start_jobs`, so nested work neither stacks private thread pools on
+the shared one nor waits for a worker that will never come free.
+
+Import-clean; jobs are plain callables.
+"""
+
+import collections
+import queue
+import threading
+from typing import Iterator, Optional
+
+from .accounting import calling_function, charged_to
+from .governor import GOVERNOR
+from .retry import RetryPolicy
+
+
+class JobPool:
+    """Worker threads shared by every job list the command runs.
+
+    Each :func:`~esphomerelease.util.iter_asynchronously` call used to start and join threads of
+    its own, so a job that fanned out again (a prefetch job fetching a set of
+    PRs, a supporters job paginating a repo) stacked a second pool on top of
+    the first. Every job list now runs as a task group on this one pool,
+    whose size caps how many jobs run at once across the whole command.
+
+    A job that starts a job list of its own does not wait idly for free
+    workers: while its group has jobs no worker has picked up, it runs them
+    itself, in the slot it already holds. Nested job lists can therefore
+    neither exceed the cap nor deadlock with every worker waiting.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tasks: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: list = []
+        self._queued = 0
+        self._idle = 0
+        self._local = threading.local()
+
+    @property
+    def in_worker(self) -> bool:
+        """Whether the calling thread is one of the pool's workers."""
+        return getattr(self._local, "worker", False)
+
+    def submit(self, task):
+        """Run ``task()`` on a worker, starting another one if all are busy."""
+        with self._lock:
+            # Tasks no worker has taken yet are spoken for by the idle ones.
+            if self._queued >= self._idle and len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"job-pool-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            self._queued += 1
+            self._tasks.put(task)
+
+    def _work(self):
+        self._local.worker = True
+        with self._lock:
+            self._idle += 1
+        while True:
+            task = self._tasks.get()
+            with self._lock:
+                self._queued -= 1
+                self._idle -= 1
+            try:
+                task()
+            finally:
+                with self._lock:
+                    self._idle += 1
+
+
+class TaskGroup:
+    """One job list on the :class:`JobPool`.
+
+    At most ``limit`` of them are handed to the pool at a time; each finished
+    job hands over the next. Each job runs under ``retry``; with ``fail_fast``
+    a failed job leaves the jobs not started yet undone. Results and errors
+    arrive on ``done`` as ``(num, value, exc)``. The jobs' GitHub requests are
+    charged to the function that started the group.
+    """
+
+    def __init__(
+        self,
+        pool: JobPool,
+        jobs: list,
+        limit: int,
+        retry: RetryPolicy,
+        fail_fast: bool,
+    ):
+        self._pool = pool
+        self._caller = calling_function()
+        self._retry = retry
+        self._fail_fast = fail_fast
+        self._backlog = collections.deque(enumerate(jobs))
+        self._limit = limit
+        self._submitted = 0
+        self._running = 0
+        self._cond = threading.Condition()
+        self.done: queue.Queue = queue.Queue()
+
+    def start(self):
+        self._top_up()
+
+    def _top_up(self):
+        with self._cond:
+            count = min(len(self._backlog), self._limit - self._submitted)
+            self._submitted += count
+        for _ in range(count):
+            self._pool.submit(self._run_submitted)
+
+    def _take(self):
+        with self._cond:
+            if not self._backlog:
+                return None
+            self._running += 1
+            return self._backlog.popleft()
+
+    def _run(self, item):
+        num, job = item
+        # A raised job must not kill the worker; its error is handed over
+        # like a result.
+        try:
+            with charged_to(self._caller):
+                result = self._retry.call(job)
+            self.done.put((num, result, None))
+        except Exception as exc:  # pylint: disable=broad-except
+            if self._fail_fast:
+                # Before anyone hears of it: no worker may start another job.
+                with self._cond:
+                    self._backlog.clear()
+            self.done.put((num, None, exc))
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _run_submitted(self):
+        item = self._take()
+        if item is not None:
+            self._run(item)
+        with self._cond:
+            self._submitted -= 1
+        self._top_up()
+
+    def next_done(self) -> tuple:
+        """Wait for the next finished job, running queued ones when nested."""
+        while self._pool.in_worker:
+            try:
+                return self.done.get_nowait()
+            except queue.Empty:
+                pass
+            item = self._take()
+            if item is None:
+                break
+            self._run(item)
+        return self.done.get()
+
+    def cancel(self, *, wait: bool = True):
+        """Drop the jobs not started yet; ``wait`` for the running ones."""
+        with self._cond:
+            self._backlog.clear()
+            if wait:
+                self._cond.wait_for(lambda: self._running == 0)
+                return
+        # Whatever still runs finishes unobserved; it needs no more retries.
+        self._retry.stop()
+
+
+# Sized to the governor's ceiling: how many GitHub requests are actually in
+# flight is the governor's call, the pool only has to keep it fed.
+JOB_POOL = JobPool(GOVERNOR.maximum)
+
+
+def start_jobs(
+    jobs, num_threads: Optional[int] = None, *, retry: Optional[RetryPolicy] = None
+) -> Iterator:
+    """Start ``jobs`` on :data:`JOB_POOL` now; iterate their results in job order.
+
+    The quiet counterpart of :func:`~esphomerelease.util.iter_asynchronously`
+    for helpers: no progress bar or summary, and the jobs are under way before
+    the first result is asked for. At most ``num_threads`` of them run at
+    once. A failed job (after ``retry``) drops the jobs not started yet and
+    is raised when the results reach it or a later job.
+    """
+    jobs = list(jobs)
+    if num_threads is None:
+        num_threads = JOB_POOL.size
+    group = TaskGroup(
+        JOB_POOL,
+        jobs,
+        max(1, min(num_threads, len(jobs))),
+        retry or RetryPolicy(),
+        True,
+    )
+    if jobs:
+        group.start()
+    return _in_job_order(group, len(jobs))
+
+
+def _in_job_order(group: TaskGroup, count: int) -> Iterator:
+    results: dict = {}
+    failed = False
+    try:
+        for num in range(count):
+            while num not in results:
+                done, value, exc = group.next_done()
+                if exc is not None:
+                    failed = True
+                    raise exc
+                results[done] = value
+            yield results.pop(num)
+    finally:
+        group.cancel(wait=not failed)
@@ -0,0 +1,74 @@
+"""Registry of a repository's open milestones.
+
+A cut looks milestones up by title over and over, for every project: the open
+PR check, the docs PR pairing, the cherry-pick strategies and each of the
+milestone housekeeping steps. Every lookup used to list all open milestones
+again. :class:`MilestoneRegistry` lists them once, indexes them by title and
+by number, and is kept current by the writes the tooling makes itself
+(``Project.create_milestone`` / ``ensure_milestone`` / ``update_milestone``).
+Polling loops that must notice changes made elsewhere call :meth:`refresh`.
+
+Import-clean (stdlib only).
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class MilestoneRegistry:
+    """Open milestones by title and number, listed on first use."""
+
+    def __init__(self, load: Callable[[], Iterable]):
+        self._load = load
+        self._lock = threading.Lock()
+        self._by_number: Optional[Dict[int, object]] = None
+        self._by_title: Dict[str, object] = {}
+
+    def _index(self) -> Dict[int, object]:
+        with self._lock:
+            if self._by_number is None:
+                milestones = list(self._load())
+                self._by_number = {ms.number: ms for ms in milestones}
+                self._by_title = {ms.title: ms for ms in milestones}
+            return self._by_number
+
+    def by_title(self, title: str):
+        """The open milestone called ``title``, or None."""
+        self._index()
+        return self._by_title.get(title)
+
+    def by_number(self, number: int):
+        """The open milestone with ``number``, or None."""
+        return self._index().get(number)
+
+    def open(self) -> List:
+        """Every open milestone, in listing order."""
+        return list(self._index().values())
+
+    def put(self, milestone):
+        """Record a milestone that was just created or changed (still open)."""
+        with self._lock:
+            if self._by_number is None:
+                # Not listed yet; the first lookup will list it anyway.
+                return
+            self._drop(milestone.number)
+            self._by_number[milestone.number] = milestone
+            self._by_title[milestone.title] = milestone
+
+    def discard(self, milestone):
+        """Forget a milestone that was just closed."""
+        with self._lock:
+            if self._by_number is not None:
+                self._drop(milestone.number)
+
+    def _drop(self, number: int):
+        old = self._by_number.pop(number, None)
+        # Matched by identity: an update may have renamed the object in place.
+        for title in [t for t, ms in self._by_title.items() if ms is old]:
+            del self._by_title[title]
+
+    def refresh(self):
+        """Forget everything; the next lookup lists the milestones again."""
+        with self._lock:
+            self._by_number = None
+            self._by_title = {}
@@ -1,7 +1,9 @@
 import re
 import enum
+import sys
 from dataclasses import dataclass, replace
-from typing import Union
+from datetime import datetime
+from typing import Optional, Tuple, Union
 
 
 class Branch(enum.Enum):
@@ -106,3 +108,80 @@ class Version:
 
     def __ge__(self, other) -> bool:
         return self > other or self == other
+
+
+@dataclass(frozen=True, slots=True)
+class PullRecord:
+    """The fields of a pull request the release tooling actually reads.
+
+    github3's ``PullRequest`` keeps the whole payload, nested user/repo/branch
+    objects and a session reference alive; a cycle-sized changelog held tens
+    of megabytes of it. ``Project.pr_cache`` keeps these instead. Label names
+    and logins repeat across PRs and are interned.
+    """
+
+    number: int
+    title: str
+    labels: Tuple[str, ...]
+    milestone_title: Optional[str]
+    merged_at: Optional[datetime]
+    merge_commit_sha: Optional[str]
+    author_login: str
+    author_url: str
+    html_url: str
+    body: Optional[str]
+    # What GraphQL mutations address the PR by; unknown for old cached payloads.
+    node_id: Optional[str] = None
+    # When the PR last changed, to tell whether a listing has news.
+    updated_at: Optional[datetime] = None
+    # "open" or "closed" (merged or not), to filter milestone listings.
+    state: Optional[str] = None
+
+    @classmethod
+    def from_pull(cls, pull) -> "PullRecord":
+        """Slim down a github3 ``PullRequest`` or a ``GraphQLPullRequest``."""
+        milestone = pull.milestone
+        return cls(
+            number=pull.number,
+            title=pull.title,
+            labels=tuple(sys.intern(label["name"]) for label in pull.labels),
+            milestone_title=milestone["title"] if milestone else None,
+            merged_at=pull.merged_at,
+            merge_commit_sha=pull.merge_commit_sha,
+            author_login=sys.intern(pull.user.login),
+            author_url=pull.user.html_url,
+            html_url=pull.html_url,
+            body=pull.body,
+            node_id=getattr(pull, "node_id", None),
+            updated_at=getattr(pull, "updated_at", None),
+            state=getattr(pull, "state", None),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "PullRecord":
+        """Slim down the REST JSON of a PR, as carried by webhook deliveries."""
+        milestone = payload.get("milestone")
+        user = payload.get("user") or {}
+        return cls(
+            number=payload["number"],
+            title=payload["title"],
+            labels=tuple(
+                sys.intern(label["name"]) for label in payload.get("labels") or ()
+            ),
+            milestone_title=milestone["title"] if milestone else None,
+            merged_at=_parse_timestamp(payload.get("merged_at")),
+            merge_commit_sha=payload.get("merge_commit_sha"),
+            author_login=sys.intern(user.get("login", "")),
+            author_url=user.get("html_url", ""),
+            html_url=payload["html_url"],
+            body=payload.get("body"),
+            node_id=payload.get("node_id"),
+            updated_at=_parse_timestamp(payload.get("updated_at")),
+            state=payload.get("state"),
+        )
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
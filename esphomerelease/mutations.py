@@ -0,0 +1,146 @@
+"""Batched label and milestone writes through GitHub's GraphQL API.
+
+Marking the PRs of a cut ``cherry-picked`` and clearing the milestone of the
+PRs a first beta merged were one REST write per PR, sent one after another:
+after a first beta, hundreds of sequential writes, each of them counted
+against GitHub's secondary limits for writes. :class:`MutationBatcher` packs
+many ``addLabelsToLabelable`` / ``updatePullRequest`` operations into one
+document of aliased mutations and paces the documents, one content write per
+mutation, on the same :data:`~esphomerelease.writes.CONTENT_WRITES` pacer
+as the REST writes of :mod:`~esphomerelease.writes`.
+
+Every mutation in a document succeeds or fails on its own. Failures are
+returned per PR (:class:`MutationFailure`) instead of raised, so one locked or
+deleted PR does not stop the rest from being written.
+"""
+
+import json
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import graphql
+from .exceptions import EsphomeReleaseError
+from .writes import CONTENT_WRITES, WritePacer
+
+# Mutations packed into one document.
+MUTATIONS_PER_DOCUMENT = 25
+
+
+class MutationFailure(NamedTuple):
+    """A PR whose write did not go through, and why."""
+
+    number: int
+    message: str
+
+
+class MutationBatcher:
+    """Sends PR mutations for one repository in paced, aliased documents.
+
+    PRs are passed as anything with ``number`` and ``node_id`` (a
+    :class:`~esphomerelease.model.PullRecord`); node ids that are not known
+    yet are looked up first, 100 per request.
+    """
+
+    def __init__(
+        self,
+        session,
+        owner: str,
+        name: str,
+        *,
+        per_document: int = MUTATIONS_PER_DOCUMENT,
+        pacer: Optional[WritePacer] = None,
+    ):
+        self.session = session
+        self.owner = owner
+        self.name = name
+        self.per_document = per_document
+        self.pacer = pacer or CONTENT_WRITES
+        self.documents = 0
+
+    def add_labels(self, pulls: Iterable, *labels: str) -> List[MutationFailure]:
+        """Add ``labels`` to every PR in ``pulls``."""
+        pulls = list(pulls)
+        if not pulls:
+            return []
+        label_ids = graphql.fetch_label_ids(
+            self.session, self.owner, self.name, list(labels)
+        )
+        label_list = json.dumps([label_ids[label] for label in labels])
+        return self._run(
+            pulls,
+            lambda node_id: (
+                f"addLabelsToLabelable(input: {{labelableId: {json.dumps(node_id)}, "
+                f"labelIds: {label_list}}}) {{ clientMutationId }}"
+            ),
+        )
+
+    def clear_milestones(self, pulls: Iterable) -> List[MutationFailure]:
+        """Remove every PR in ``pulls`` from its milestone."""
+        return self._run(
+            pulls,
+            lambda node_id: (
+                f"updatePullRequest(input: {{pullRequestId: {json.dumps(node_id)}, "
+                "milestoneId: null}) { clientMutationId }"
+            ),
+        )
+
+    def _node_ids(self, pulls: List) -> Tuple[Dict[int, str], List[MutationFailure]]:
+        ids = {
+            pull.number: pull.node_id
+            for pull in pulls
+            if getattr(pull, "node_id", None) is not None
+        }
+        unknown = [pull.number for pull in pulls if pull.number not in ids]
+        if unknown:
+            ids.update(
+                graphql.fetch_pull_request_ids(
+                    self.session, self.owner, self.name, unknown
+                )
+            )
+        failures = [
+            MutationFailure(number, "not a pull request in the repository")
+            for number in unknown
+            if number not in ids
+        ]
+        return ids, failures
+
+    def _run(self, pulls: Iterable, mutation) -> List[MutationFailure]:
+        ids, failures = self._node_ids(list(pulls))
+        operations = list(ids.items())
+        for start in range(0, len(operations), self.per_document):
+            end = start + self.per_document
+            chunk = operations[start:end]
+            self.pacer.take(len(chunk))
+            document = (
+                "mutation {\n"
+                + "\n".join(
+                    f"  m{index}: {mutation(node_id)}"
+                    for index, (_, node_id) in enumerate(chunk)
+                )
+                + "\n}\n"
+            )
+            self.documents += 1
+            try:
+                data, errors = graphql.execute_partial(self.session, document)
+            except EsphomeReleaseError as err:
+                failures.extend(MutationFailure(number, str(err)) for number, _ in chunk)
+                continue
+            failures.extend(_failures(chunk, data, errors))
+        return failures
+
+
+def _failures(
+    chunk: List[Tuple[int, str]], data: dict, errors: List[dict]
+) -> List[MutationFailure]:
+    """The operations of ``chunk`` that came back without a result."""
+    messages: Dict[Optional[str], str] = {}
+    for error in errors:
+        path = error.get("path") or [None]
+        messages.setdefault(path[0], error.get("message", str(error)))
+    return [
+        MutationFailure(
+            number,
+            messages.get(f"m{index}") or messages.get(None) or "no result returned",
+        )
+        for index, (number, _) in enumerate(chunk)
+        if data.get(f"m{index}") is None
+    ]
@@ -0,0 +1,90 @@
+"""Concurrent page fetching for long github3 listings.
+
+github3 walks a listing one page after another: each request starts only when
+the previous page has been consumed. Label, contributor and repository
+listings run to dozens of pages, so the walk is a chain of round trips.
+
+:func:`paginate` asks for the largest page size, reads the number of pages
+from the first response's ``Link: rel="last"`` and fetches all remaining pages
+at once, still yielding items in listing order. Listings without a last link
+(cursor-paginated endpoints) fall back to following ``rel="next"`` one page
+ahead of the caller. Pages are fetched as jobs on the shared
+:data:`~esphomerelease.jobs.JOB_POOL`, so a listing paginated within a job
+runs its pages in the slots the command already has.
+"""
+
+import functools
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from github3 import models
+from github3.structs import GitHubIterator
+
+from .jobs import start_jobs
+
+# GitHub's maximum page size for REST listings.
+PER_PAGE = 100
+
+# Pages of one listing fetched at the same time; every request still takes a
+# governor slot.
+MAX_PAGE_WORKERS = 8
+
+
+def _page_urls(last_url: str) -> List[str]:
+    """URLs of pages 2..N, derived from the ``rel="last"`` link of page 1."""
+    parsed = urlparse(last_url)
+    query = parse_qs(parsed.query)
+    last_page = int(query["page"][0])
+    urls = []
+    for page in range(2, last_page + 1):
+        query["page"] = [str(page)]
+        urls.append(urlunparse(parsed._replace(query=urlencode(query, doseq=True))))
+    return urls
+
+
+def _page_url(response, rel: str) -> Optional[str]:
+    return response.links.get(rel, {}).get("url")
+
+
+def paginate(listing: Iterable, *, workers: int = MAX_PAGE_WORKERS) -> Iterator:
+    """Yield every item of a github3 listing, fetching its pages concurrently.
+
+    Anything that is not an unbounded github3 iterator (a bounded
+    ``number=``, or a plain list) is iterated as-is.
+    """
+    if not isinstance(listing, GitHubIterator) or listing.count != -1:
+        yield from listing
+        return
+
+    cls = listing.cls
+    if issubclass(cls, models.GitHubCore):
+        cls = functools.partial(cls, session=listing)
+
+    def fetch(url: str, params: Optional[dict] = None):
+        # pylint: disable=protected-access
+        response = listing._get(url, params=params, headers=listing.headers)
+        payload = listing._json(response, 200) or []
+        if isinstance(payload, dict) and listing.list_key is not None:
+            payload = payload[listing.list_key]
+        return response, [cls(item) for item in payload if item is not None]
+
+    response, items = fetch(listing.url, {**listing.params, "per_page": PER_PAGE})
+
+    last_url = _page_url(response, "last")
+    if last_url is not None and "page" in parse_qs(urlparse(last_url).query):
+        jobs = [functools.partial(fetch, url) for url in _page_urls(last_url)]
+        pages = start_jobs(jobs, workers)
+        yield from items
+        for _, page in pages:
+            yield from page
+        return
+
+    # No last link: keep one page in flight ahead of the caller instead.
+    next_url = _page_url(response, "next")
+    while True:
+        ahead = start_jobs([functools.partial(fetch, next_url)]) if next_url else None
+        yield from items
+        if ahead is None:
+            return
+        [(response, items)] = ahead
+        next_url = _page_url(response, "next")
@@ -3,56 +3,66 @@ import functools
 import os
 import re
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 import click
 import pexpect
-from github3.issues.issue import Issue
 from github3.issues.milestone import Milestone
 from github3.pulls import PullRequest
 from github3.repos.repo import Repository
 
-from . import util
+from . import graphql, util
 from .config import CONFIG
 from .exceptions import EsphomeReleaseError
-from .model import Branch, BranchType, Version
-from .util import confirm, execute_command, gprint, process_asynchronously
+from .milestones import MilestoneRegistry
+from .model import Branch, BranchType, PullRecord, Version
+from .mutations import MutationBatcher, MutationFailure
+from .pagination import paginate
+from .singleflight import SingleFlightCache
+from .store import CachedPull, OfflineError, Store, get_store
+from .util import (
+    confirm,
+    execute_command,
+    gprint,
+    iter_asynchronously,
+    process_asynchronously,
+)
 
 
-def _issue_pr_merged_at(issue: Issue) -> Optional[str]:
-    """Merge timestamp of the PR behind an issue, from the issue payload.
+def is_offline() -> bool:
+    """Whether ``--offline`` asks to answer from the local store only."""
+    return bool(CONFIG.get("offline"))
 
-    The issues listing embeds a ``pull_request`` block (with ``merged_at``)
-    for issues that are pull requests, so both "is this a PR" and "is it
-    merged" can be answered without any extra API request. Returns ``None``
-    for plain issues and for unmerged PRs.
-    """
-    urls = issue.pull_request_urls or {}
-    return urls.get("merged_at")
 
+def _offline_store() -> Store:
+    store = get_store()
+    if store is None:
+        raise OfflineError("--offline needs `cache_dir` set in config.json")
+    return store
 
-def _issue_is_pr(issue: Issue) -> bool:
-    """Whether an issue from a listing is a pull request (no API call)."""
-    return issue.pull_request_urls is not None
 
+def _pull_is_cherry_picked(pull) -> bool:
+    """Whether a PR carries the ``cherry-picked`` label (no API call)."""
+    return "cherry-picked" in pull.labels
 
-def _issue_is_cherry_picked(issue: Issue) -> bool:
-    """Whether the issue carries the ``cherry-picked`` label (no API call).
 
-    Uses the labels embedded in the issue listing payload instead of the
-    ``issue.labels()`` method, which hits the API once per issue.
-    """
-    return any(label.name == "cherry-picked" for label in issue.original_labels)
+def _pull_in_states(pull: PullRecord, states) -> bool:
+    """Whether a PR is in one of the GraphQL ``states`` (all when empty)."""
+    if not states:
+        return True
+    if pull.merged_at is not None:
+        return "MERGED" in states
+    return ("OPEN" if pull.state == "open" else "CLOSED") in states
 
 
 class Project:
-    # Safety bound on the closed-PR scan used to recover milestone PRs GitHub's
-    # index dropped (see _recover_drifted_milestone_prs). A cycle's milestone
-    # PRs cluster within days, so a few hundred recent closed PRs always covers
-    # a patch/beta window; the cap just stops a runaway scan.
-    MILESTONE_SCAN_LIMIT = 500
+    # From this many uncached PRs on, get_prs hydrates them through batched
+    # GraphQL queries (100 PRs per request) instead of one REST request each.
+    # Smaller sets finish in a single parallel round trip over REST anyway.
+    BULK_FETCH_THRESHOLD = 10
 
     def __init__(
         self,
@@ -68,9 +78,18 @@ class Project:
         self._repo_name: str = repo_name
         self.shortname: str = shortname
         self._repo: Optional[Repository] = None
+        self._repo_lock = threading.Lock()
 
         # A cache or
-        self.pr_cache: Dict[int, PullRequest] = {}
+        self.pr_cache: SingleFlightCache[int, PullRecord] = SingleFlightCache()
+
+        # Open milestones, listed once and kept current by our own writes
+        self.milestones = MilestoneRegistry(self._list_open_milestones)
+
+        # The webhook receiver keeping pr_cache and milestones current, if any,
+        # and the (milestone number, states) listings loaded while it did
+        self.webhooks = None
+        self._webhook_listings: set = set()
 
         # The current branch so we don't have to go through git
         self.branch: Optional[str] = None
@@ -102,38 +121,303 @@ class Project:
     @property
     def repo(self) -> Repository:
         """Return the repository as a git object"""
-        # Load lazily
-        if self._repo is None:
-            from esphomerelease.github import get_session
-
-            self._repo = get_session().repository("esphome", self._repo_name)
+        if is_offline():
+            raise OfflineError(
+                f"{self.shortname}: this needs GitHub, which --offline does not ask"
+            )
+        from esphomerelease.github import announce_rate_limit, get_session
+
+        # Load lazily; a background warm-up may be loading it already. Only
+        # the main thread announces the rate limit, so no prompt is broken
+        # up, and it does so even when the warm-up already loaded the repo.
+        foreground = threading.current_thread() is threading.main_thread()
+        with self._repo_lock:
+            if self._repo is None:
+                session = get_session(announce=foreground)
+                self._repo = session.repository("esphome", self._repo_name)
+            elif foreground:
+                announce_rate_limit()
         return self._repo
 
-    def get_pr(self, pr: int) -> PullRequest:
+    def get_pr(self, pr: int) -> PullRecord:
         """Get a PR by number (and cache it)."""
-        if pr not in self.pr_cache:
-            self.pr_cache[pr] = self.repo.pull_request(pr)
-        return self.pr_cache[pr]
+        if is_offline():
+            return self._stored_prs([pr])[0]
+        return self.pr_cache.get_or_fetch(pr, self._fetch_pr)
+
+    def get_prs(self, numbers: List[int]) -> List[PullRecord]:
+        """Get multiple PRs by number, fetching uncached ones in parallel.
+
+        Large sets (a cycle-sized changelog) are hydrated in GraphQL batches;
+        anything those leave out falls through to the REST lookup, which
+        raises for numbers that really are not PRs.
+
+        Numbers another thread is already fetching are not fetched again;
+        their result is shared once it arrives.
+        """
+        if is_offline():
+            return self._stored_prs(numbers)
+        self._fetch_claimed(self.pr_cache.claim(numbers))
+        return [self.pr_cache.wait(n) for n in numbers]
+
+    def iter_prs(self, numbers: List[int]) -> Iterator[PullRecord]:
+        """Like :meth:`get_prs`, but yield each PR as soon as it is there.
+
+        The PRs are fetched in the background, GraphQL batches landing in
+        ``pr_cache`` one by one, so the caller works through the first ones
+        while the rest are still downloading. PRs come in the order of
+        ``numbers``.
+        """
+        if is_offline():
+            yield from self._stored_prs(numbers)
+            return
+        claimed = self.pr_cache.claim(numbers)
+        fetcher = threading.Thread(
+            # A failure reaches the caller through the claimed PRs it fails.
+            target=lambda: self._fetch_claimed(claimed, reraise=False),
+            name=f"fetch-{self._repo_name}-prs",
+            daemon=True,
+        )
+        fetcher.start()
+        for number in numbers:
+            yield self.pr_cache.wait(number)
 
-    def get_prs(self, numbers: List[int]) -> List[PullRequest]:
-        """Get multiple PRs by number, fetching uncached ones in parallel."""
-        missing = list(dict.fromkeys(n for n in numbers if n not in self.pr_cache))
+    def _fetch_claimed(self, claimed: List[int], *, reraise: bool = True):
+        """Fetch the PRs of a ``pr_cache`` claim into the cache."""
+        try:
+            missing = claimed
+            if len(missing) >= self.BULK_FETCH_THRESHOLD:
+                self._bulk_fetch_prs(missing)
+                missing = [n for n in missing if n not in self.pr_cache]
+            if missing:
+                jobs = [functools.partial(self._fetch_into_cache, n) for n in missing]
+                process_asynchronously(jobs, "Fetching PRs")
+        except BaseException as err:  # pylint: disable=broad-except
+            self.pr_cache.abandon(claimed, err)
+            if reraise:
+                raise
+
+    def refresh_prs(self, numbers: List[int]) -> List[PullRecord]:
+        """Fetch ``numbers`` again even if cached, e.g. because they changed.
+
+        While webhooks keep ``pr_cache`` current, cached PRs are current too
+        and only uncached ones are fetched.
+        """
+        if self.webhooks is None:
+            self.pr_cache.discard(numbers)
+        return self.get_prs(numbers)
+
+    def follow_webhooks(self, receiver):
+        """Trust ``pr_cache`` and ``milestones`` while ``receiver`` applies
+        webhook deliveries to them; ``None`` goes back to asking GitHub."""
+        self.webhooks = receiver
+        self._webhook_listings.clear()
+
+    def _stored_prs(self, numbers: List[int]) -> List[PullRecord]:
+        """``numbers`` from the local store alone, for ``--offline``."""
+        entries = _offline_store().get_pulls(self._repo_name, numbers)
+        missing = [number for number in numbers if number not in entries]
         if missing:
-            jobs = [functools.partial(self.repo.pull_request, n) for n in missing]
-            for pull in process_asynchronously(jobs, "Fetching PRs"):
-                self.pr_cache[pull.number] = pull
-        return [self.pr_cache[n] for n in numbers]
+            raise OfflineError(
+                f"{len(missing)} {self.shortname} PR(s) are not in the local store "
+                f"({', '.join(f'#{number}' for number in missing[:10])}"
+                f"{', ...' if len(missing) > 10 else ''}); run once without "
+                "--offline to fetch them."
+            )
+        pulls = {
+            number: self._pull_from_cached(entry) for number, entry in entries.items()
+        }
+        self.pr_cache.update(pulls)
+        return [pulls[number] for number in numbers]
+
+    def _fetch_into_cache(self, number: int) -> PullRecord:
+        # Publish each PR as it arrives, so threads waiting on it need not
+        # wait for the whole batch.
+        pull = self._fetch_pr(number)
+        self.pr_cache[number] = pull
+        return pull
+
+    def _pull_from_cached(self, entry: CachedPull) -> PullRecord:
+        """Rebuild a PR record from its persisted payload."""
+        if entry.kind == "graphql":
+            return PullRecord.from_pull(graphql.GraphQLPullRequest(entry.payload))
+        # Offline there is no repository to hand github3; nothing is fetched.
+        return PullRecord.from_pull(PullRequest(dict(entry.payload), self._repo))
+
+    def _cache_entry(self, pull: PullRequest) -> CachedPull:
+        """The persistable form of a freshly fetched PR."""
+        payload = pull.as_dict()
+        if isinstance(pull, graphql.GraphQLPullRequest):
+            return CachedPull(
+                self._repo_name,
+                pull.number,
+                "graphql",
+                payload,
+                None,
+                payload["updatedAt"],
+            )
+        return CachedPull(
+            self._repo_name,
+            pull.number,
+            "rest",
+            payload,
+            pull.etag,
+            payload.get("updated_at"),
+        )
 
-    def _milestone_pr_issues(self, milestone: Milestone, state: str) -> List[Issue]:
-        """List the issues on a milestone that are pull requests.
+    def _fetch_pr(self, number: int) -> PullRecord:
+        """Fetch one PR over REST, reading through the on-disk store.
 
-        Judged from the listing payload alone — no per-issue API requests.
+        A stored copy is revalidated with ``If-None-Match``; GitHub answers an
+        unchanged PR with a 304 that does not count against the rate limit.
         """
-        return [
-            issue
-            for issue in self.repo.issues(milestone=milestone.number, state=state)
-            if _issue_is_pr(issue)
+        store = get_store()
+        entry = store.get_pull(self._repo_name, number) if store is not None else None
+        if entry is None or not entry.etag:
+            pull = self.repo.pull_request(number)
+        else:
+            response = self.repo.session.get(
+                f"{self.repo.url}/pulls/{number}",
+                headers={"If-None-Match": entry.etag},
+            )
+            if response.status_code == 304:
+                return self._pull_from_cached(entry)
+            # pylint: disable=protected-access
+            pull = PullRequest(self.repo._json(response, 200), self.repo)
+        if store is not None:
+            store.put_pull(self._cache_entry(pull))
+        return PullRecord.from_pull(pull)
+
+    def _graphql_batches(
+        self, fetch, numbers: List[int], heading: str
+    ) -> Iterator[dict]:
+        """Run a ``graphql`` batch function over ``numbers``, queries in parallel.
+
+        Yields each batch's result as soon as its query returns.
+        """
+        session = self.repo.session
+        jobs = [
+            functools.partial(fetch, session, "esphome", self._repo_name, batch)
+            for batch in graphql.chunked(numbers)
         ]
+        return iter_asynchronously(jobs, heading, ordered=False)
+
+    def _bulk_fetch_prs(self, numbers: List[int]):
+        """Fill ``pr_cache`` with ``numbers`` via concurrent GraphQL batches.
+
+        PRs already in the on-disk store are revalidated with an
+        ``updatedAt``-only probe (100 PRs per query) and only the ones that
+        changed are hydrated again.
+        """
+        store = get_store()
+        cached = (
+            store.get_pulls(self._repo_name, numbers) if store is not None else {}
+        )
+        stale = [n for n in numbers if n not in cached]
+        if cached:
+            current = {}
+            for batch in self._graphql_batches(
+                graphql.fetch_updated_at_batch, list(cached), "Revalidating PRs"
+            ):
+                current.update(batch)
+            for number, entry in cached.items():
+                unchanged = current.get(number) == entry.updated_at
+                if entry.updated_at is not None and unchanged:
+                    self.pr_cache[number] = self._pull_from_cached(entry)
+                else:
+                    stale.append(number)
+        if not stale:
+            return
+        # Each batch is handed to whoever waits for its PRs (see iter_prs)
+        # while the next ones are still being fetched.
+        for fetched in self._graphql_batches(
+            graphql.fetch_pull_request_batch, stale, "Fetching PRs (GraphQL)"
+        ):
+            pulls = list(fetched.values())
+            self.pr_cache.update(
+                {pull.number: PullRecord.from_pull(pull) for pull in pulls}
+            )
+            if store is not None:
+                store.put_pulls([self._cache_entry(pull) for pull in pulls])
+
+    def _milestone_pulls(
+        self, milestone: Milestone, *states: str
+    ) -> List[PullRecord]:
+        """List the PRs on a milestone, in the given GraphQL ``states``.
+
+        Read from ``milestone.pullRequests``, 100 full PRs per request: unlike
+        the REST issues index it does not drop PRs, and no PR needs fetching
+        again afterwards. The PRs are kept in the local store, where
+        ``--offline`` reads them back from.
+
+        While webhooks keep ``pr_cache`` current, a listing that was loaded
+        once is answered from the cache from then on.
+        """
+        key = (milestone.number, frozenset(states))
+        if self.webhooks is not None and key in self._webhook_listings:
+            return sorted(
+                (
+                    pull
+                    for pull in self.pr_cache.values()
+                    if pull.milestone_title == milestone.title
+                    and _pull_in_states(pull, states)
+                ),
+                key=lambda pull: pull.number,
+            )
+        if is_offline():
+            entries = _offline_store().get_milestone_pulls(
+                self._repo_name, milestone.title, states
+            )
+            pulls = [self._pull_from_cached(entry) for entry in entries]
+            self.pr_cache.update({pull.number: pull for pull in pulls})
+            return pulls
+
+        webhooks = self.webhooks
+        applied = webhooks.applied if webhooks is not None else 0
+        fetched = graphql.fetch_milestone_pull_requests(
+            self.repo.session,
+            "esphome",
+            self._repo_name,
+            milestone.number,
+            list(states) or None,
+        )
+        pulls = [PullRecord.from_pull(pull) for pull in fetched]
+        self.pr_cache.update({pull.number: pull for pull in pulls})
+        store = get_store()
+        if store is not None:
+            store.put_pulls([self._cache_entry(pull) for pull in fetched])
+        self._store_milestone_listing(milestone, states, pulls)
+        # A delivery applied while listing may have been overwritten by an
+        # older copy; list again next time rather than trust the cache.
+        if webhooks is not None and webhooks.applied == applied:
+            self._webhook_listings.add(key)
+        return pulls
+
+    def _store_milestone_listing(self, milestone: Milestone, states, pulls):
+        """Remember which PRs a listing found, for ``--offline``."""
+        store = get_store()
+        if store is not None:
+            store.put_milestone_listing(
+                self._repo_name,
+                milestone.title,
+                states,
+                [pull.number for pull in pulls],
+            )
+
+    def poll_milestone(self, milestone: Milestone, *states: str) -> "MilestonePoller":
+        """Follow the PRs on ``milestone`` across repeated checks."""
+        return MilestonePoller(self, milestone, states)
+
+    def _mutations(self) -> MutationBatcher:
+        return MutationBatcher(self.repo.session, "esphome", self._repo_name)
+
+    def _report_failed_writes(self, action: str, failures: List[MutationFailure]):
+        for failure in failures:
+            gprint(
+                f"Could not {action} {self.shortname}#{failure.number}: "
+                f"{failure.message}",
+                fg="red",
+            )
 
     def get_pr_by_title(
         self,
@@ -148,31 +432,58 @@ class Project:
             base = self.lookup_branch(base)
 
         res = []
-        for pr in self.repo.pull_requests(head=head, base=base):
-            self.pr_cache[pr.number] = pr
+        for pr in paginate(self.repo.pull_requests(head=head, base=base)):
+            self.pr_cache[pr.number] = PullRecord.from_pull(pr)
             if pr.title == title:
                 res.append(pr)
         return res
 
-    def get_milestone_by_title(self, title: str) -> Optional[Milestone]:
-        """Get a milestone by title."""
-        seen = []
-        for ms in self.repo.milestones(state="open"):
-            if ms.title == title:
-                return ms
+    def _list_open_milestones(self) -> List[Milestone]:
+        """List the open milestones, through the local store."""
+        if is_offline():
+            return [
+                Milestone(payload, None)
+                for payload in _offline_store().get_open_milestones(self._repo_name)
+            ]
+        milestones = list(self.repo.milestones(state="open"))
+        store = get_store()
+        if store is not None:
+            store.put_open_milestones(
+                self._repo_name, [milestone.as_dict() for milestone in milestones]
+            )
+        return milestones
 
-            seen.append(ms.title)
+    def get_milestone_by_title(self, title: str) -> Optional[Milestone]:
+        """Get an open milestone by title."""
+        return self.milestones.by_title(title)
 
-        return None
+    def get_milestone(self, number: int) -> Optional[Milestone]:
+        """Get an open milestone by number."""
+        return self.milestones.by_number(number)
 
     def get_open_milestones(self) -> List[Milestone]:
         """Get all open milestones."""
-        return list(self.repo.milestones(state="open"))
+        return self.milestones.open()
+
+    def refresh_milestones(self):
+        """Re-list the open milestones on next use, to see changes made elsewhere."""
+        self.milestones.refresh()
 
     def create_milestone(
         self, title: str, *, due_on: Optional[str] = None
     ) -> Milestone:
-        return self.repo.create_milestone(title, due_on=due_on)
+        milestone = self.repo.create_milestone(title, due_on=due_on)
+        self.milestones.put(milestone)
+        return milestone
+
+    def update_milestone(self, milestone: Milestone, **fields) -> bool:
+        """Edit a milestone (``Milestone.update``) and keep the registry current."""
+        updated = milestone.update(**fields)
+        if fields.get("state") == "closed":
+            self.milestones.discard(milestone)
+        else:
+            self.milestones.put(milestone)
+        return updated
 
     def ensure_milestone(
         self, title: str, *, due_on: Optional[str] = None
@@ -197,20 +508,19 @@ class Project:
                 else None
             )
             if actual_day != wanted_day:
-                milestone.update(due_on=due_on)
+                self.update_milestone(milestone, due_on=due_on)
         return milestone
 
-    def get_open_prs_for_milestone(self, milestone: Milestone) -> List[PullRequest]:
+    def get_open_prs_for_milestone(self, milestone: Milestone) -> List[PullRecord]:
         """Get all open PRs assigned to a milestone."""
         if milestone is None:
             return []
 
-        issues = self._milestone_pr_issues(milestone, "open")
-        return self.get_prs([issue.number for issue in issues])
+        return self._milestone_pulls(milestone, "OPEN")
 
     def get_next_beta_prs_for_milestone(
         self, milestone: Milestone
-    ) -> List[PullRequest]:
+    ) -> List[PullRecord]:
         """Get merged PRs in a milestone that haven't been cherry-picked yet.
 
         These are the PRs :meth:`cherry_pick_from_milestone` would pick at the
@@ -219,121 +529,26 @@ class Project:
         if milestone is None:
             return []
 
-        numbers = [
-            issue.number
-            for issue in self._milestone_pr_issues(milestone, "closed")
-            if _issue_pr_merged_at(issue) is not None
-            and not _issue_is_cherry_picked(issue)
-        ]
-        return sorted(self.get_prs(numbers), key=lambda pr: pr.merged_at)
-
-    def _find_drifted_milestone_prs(
-        self, milestone: Milestone, known: set
-    ) -> List[Issue]:
-        """Identify milestone PRs GitHub's issues index silently dropped.
-
-        ``repo.issues(milestone=...)`` — and the search API — can omit PRs whose
-        own ``milestone`` field points here, an index that lags the PR record
-        (observed 2026-07: the 2026.7.1 listing returned 35 of the 39 PRs
-        actually on the milestone, silently dropping 4 merged patch PRs from the
-        cut). The milestone's own counters stay correct, so a shortfall of the
-        closed listing against ``closed_issues`` triggers a bounded scan of
-        closed PRs that trusts each PR's own milestone (the reliable source) to
-        find the ones the index dropped. ``known`` is the set of PR numbers the
-        index already returned. Returns the missing PRs as issues (may be fewer
-        than the shortfall if the scan hits its cap — the caller warns).
-        """
-        missing = milestone.closed_issues - len(known)
-        if missing <= 0:
-            return []
-
-        found: List[Issue] = []
-        scanned = 0
-        for pull in self.repo.pull_requests(
-            state="closed", sort="updated", direction="desc"
-        ):
-            if len(found) >= missing or scanned >= self.MILESTONE_SCAN_LIMIT:
-                break
-            scanned += 1
-            if pull.number in known:
-                continue
-            pull_milestone = pull.milestone
-            if pull_milestone is None or pull_milestone.number != milestone.number:
-                continue
-            # pull_requests() only yields PRs, so this number is always a PR.
-            found.append(self.repo.issue(pull.number))
-        return found
-
-    def _resolve_milestone_index_drift(self, milestone: Milestone) -> List[Issue]:
-        """Hand milestone PRs the index dropped to the user to cherry-pick.
-
-        On a shortfall (see :meth:`_find_drifted_milestone_prs`), print the
-        missing PRs with ready-to-run ``git cherry-pick`` commands and drop into
-        a subshell so the user applies them, resolves any conflicts and confirms
-        — the same manual flow used when a cherry-pick or merge conflicts,
-        rather than hard-aborting the cut. Returns the identified PRs as issues
-        so the caller labels them cherry-picked alongside the auto-picked ones.
-        """
-        # Count all closed issues the index returned (PRs and plain issues) so a
-        # plain issue on the milestone isn't mistaken for a dropped PR.
-        known = {
-            issue.number
-            for issue in self.repo.issues(milestone=milestone.number, state="closed")
-        }
-        missing = milestone.closed_issues - len(known)
-        if missing <= 0:
-            return []
-
-        drifted = self._find_drifted_milestone_prs(milestone, known)
-        pulls = self.get_prs([issue.number for issue in drifted])
-        indexed = milestone.closed_issues - missing
-        lines = [
-            f"Milestone '{milestone.title}' reports {milestone.closed_issues} "
-            f"closed PR(s) but GitHub's milestone index only listed {indexed}.",
-            f"{missing} PR(s) are missing from the cut due to milestone index "
-            "drift (the PRs carry the milestone but the index dropped them).",
-            "",
-            "Cherry-pick the missing PR(s) into this branch:",
-        ]
-        for pull in pulls:
-            lines.append(
-                f"    git cherry-pick {pull.merge_commit_sha}"
-                f"    # #{pull.number} {pull.title}"
-            )
-        if len(drifted) < missing:
-            lines.append("")
-            lines.append(
-                f"WARNING: only identified {len(drifted)} of {missing} missing "
-                f"PR(s); open the '{milestone.title}' milestone on GitHub, find "
-                "any others (their own milestone is set) and cherry-pick them too."
-            )
-        lines += [
-            "",
-            " - resolve any conflicts, then git add . && git commit",
-            " - confirm every missing PR is now cherry-picked in",
-            " - exit the shell with Ctrl+D",
+        pulls = [
+            pull
+            for pull in self._milestone_pulls(milestone, "MERGED")
+            if not _pull_is_cherry_picked(pull)
         ]
-        self._spawn_subshell(run="git log --oneline -15", print_lines=lines)
-        return drifted
+        return sorted(pulls, key=lambda pr: pr.merged_at)
 
-    def cherry_pick_from_milestone(self, milestone: Milestone) -> List[Issue]:
+    def cherry_pick_from_milestone(self, milestone: Milestone) -> List[PullRecord]:
         """Cherry-pick all PRs in a milestone to the current branch.
 
-        Returns a list of the found PRs (as Issue objects)
+        Returns the picked PRs, for :meth:`mark_pulls_cherry_picked`.
         """
         if milestone is None:
             return []
 
-        listed = self._milestone_pr_issues(milestone, "closed")
-        pick_issues: List[Issue] = []
-
-        for issue in listed:
-            # Merged state and labels come from the issue listing payload;
-            # only the PRs that will actually be picked are fetched (in
-            # parallel, for their merge_commit_sha) below.
-            if _issue_pr_merged_at(issue) is None:
+        to_pick: List[PullRecord] = []
+        for pull in self._milestone_pulls(milestone, "CLOSED", "MERGED"):
+            if pull.merged_at is None:
                 log = click.style(
-                    f"Not merged yet: {issue.title}\nIf you want to add it please merge "
+                    f"Not merged yet: {pull.title}\nIf you want to add it please merge "
                     f"it manually then confirm.",
                     fg="yellow",
                 )
@@ -341,34 +556,31 @@ class Project:
                     pass
                 continue
 
-            if _issue_is_cherry_picked(issue):
+            if _pull_is_cherry_picked(pull):
                 # Expected for every PR already in an earlier beta of the
                 # cycle, so it is not worth reporting.
                 continue
 
-            pick_issues.append(issue)
+            to_pick.append(pull)
 
-        pulls = self.get_prs([issue.number for issue in pick_issues])
-        to_pick = sorted(zip(pulls, pick_issues), key=lambda obj: obj[0].merged_at)
+        to_pick.sort(key=lambda pull: pull.merged_at)
 
-        for pull, _ in to_pick:
+        for pull in to_pick:
             gprint(f"Cherry picking {pull.title}: {pull.merge_commit_sha}")
 
-        for pull, issue in to_pick:
+        for pull in to_pick:
             self.cherry_pick(pull.merge_commit_sha)
 
-        picked = [x[1] for x in to_pick]
-        # Any PRs the milestone index silently dropped are handled by hand in a
-        # subshell (they land after the auto-picked ones, before the version bump).
-        drifted = self._resolve_milestone_index_drift(milestone)
-        return picked + drifted
+        return to_pick
 
-    def mark_pulls_cherry_picked(self, to_pick: List[Issue]):
-        """Mark all PRs cherry-picked by adding a label."""
-        for issue in to_pick:
-            issue.add_labels("cherry-picked")
+    def mark_pulls_cherry_picked(self, to_pick: List[PullRecord]):
+        """Mark all PRs cherry-picked by adding a label, in batched mutations."""
+        failures = self._mutations().add_labels(to_pick, "cherry-picked")
+        self._report_failed_writes("label as cherry-picked", failures)
 
-    def remove_merged_prs_from_milestone(self, milestone: Milestone) -> List[Issue]:
+    def remove_merged_prs_from_milestone(
+        self, milestone: Milestone
+    ) -> List[PullRecord]:
         """Remove already-merged PRs from a milestone.
 
         Used at the first beta cut: those PRs are brought into the release by the
@@ -378,13 +590,11 @@ class Project:
         if milestone is None:
             return []
 
-        removed = []
-        for issue in self._milestone_pr_issues(milestone, "closed"):
-            if _issue_pr_merged_at(issue) is None:
-                continue
-            issue.edit(milestone=0)  # 0 clears the milestone in github3
-            removed.append(issue)
-        return removed
+        merged = self._milestone_pulls(milestone, "MERGED")
+        failures = self._mutations().clear_milestones(merged)
+        self._report_failed_writes("clear the milestone of", failures)
+        failed = {failure.number for failure in failures}
+        return [pull for pull in merged if pull.number not in failed]
 
     # GitHub lists releases newest-first, so the highest version is always
     # within the most recently created ones — one API page is enough instead
@@ -393,12 +603,30 @@ class Project:
 
     def latest_release(self, *, include_prereleases: bool = True) -> Version:
         """Get the latest release"""
-        if not include_prereleases:
-            return Version.parse(self.repo.latest_release().tag_name)
+        if is_offline():
+            tags = _offline_store().get_release_tags(
+                self._repo_name, include_prereleases=include_prereleases
+            )
+            if not tags:
+                raise OfflineError(f"No {self.shortname} release in the local store")
+        else:
+            if not include_prereleases:
+                releases = [self.repo.latest_release()]
+            else:
+                releases = list(
+                    self.repo.releases(number=self.RECENT_RELEASES_TO_CHECK)
+                )
+            store = get_store()
+            if store is not None:
+                store.put_releases(
+                    self._repo_name,
+                    [(release.tag_name, release.prerelease) for release in releases],
+                )
+            tags = [release.tag_name for release in releases]
         found_versions = []
-        for release in self.repo.releases(number=self.RECENT_RELEASES_TO_CHECK):
+        for tag in tags:
             try:
-                found_versions.append(Version.parse(release.tag_name))
+                found_versions.append(Version.parse(tag))
             except ValueError:
                 pass
         return max(found_versions)
@@ -736,6 +964,62 @@ class Project:
         return prs
 
 
+class MilestonePoller:
+    """The PRs on a milestone, re-read incrementally on every :meth:`poll`.
+
+    The first poll lists the milestone in full. Later polls list only each
+    PR's ``updatedAt`` and fetch just the PRs that are new or changed since
+    the previous poll (merged, relabelled, edited); PRs that left the
+    milestone drop out. A recheck of an unchanged milestone costs one small
+    request per 100 PRs, and none while webhooks keep the PR cache current.
+    """
+
+    def __init__(self, project: Project, milestone: Milestone, states):
+        self.project = project
+        self.milestone = milestone
+        self.states = tuple(states)
+        # Numbers fetched by the last poll (everything on the first).
+        self.changed: List[int] = []
+        self._pulls: Optional[Dict[int, PullRecord]] = None
+
+    def poll(self) -> List[PullRecord]:
+        project = self.project
+        if self._pulls is None or project.webhooks is not None:
+            previous = self._pulls or {}
+            # pylint: disable=protected-access
+            pulls = project._milestone_pulls(self.milestone, *self.states)
+            self._pulls = {pull.number: pull for pull in pulls}
+            self.changed = [
+                number
+                for number, pull in self._pulls.items()
+                if previous.get(number) != pull
+            ]
+            return pulls
+
+        stamps = graphql.fetch_milestone_pull_stamps(
+            project.repo.session,
+            "esphome",
+            project.name,
+            self.milestone.number,
+            list(self.states) or None,
+        )
+        self.changed = [
+            number
+            for number, updated_at in stamps.items()
+            if number not in self._pulls
+            or self._pulls[number].updated_at is None
+            or self._pulls[number].updated_at != updated_at
+        ]
+        refreshed = dict(zip(self.changed, project.refresh_prs(self.changed)))
+        self._pulls = {
+            number: refreshed.get(number) or self._pulls[number] for number in stamps
+        }
+        pulls = list(self._pulls.values())
+        # pylint: disable=protected-access
+        project._store_milestone_listing(self.milestone, self.states, pulls)
+        return pulls
+
+
 EsphomeProject = Project(
     repo_name="esphome",
     path=CONFIG["esphome_path"],
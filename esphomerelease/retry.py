@@ -0,0 +1,158 @@
+"""Retrying jobs that failed for a transient reason.
+
+``get_repo_contribs`` retried any error straight away, five times over, and
+every other GitHub-bound job failed the whole command on the first 502 or
+connection reset: one flaky request meant starting a multi-minute cut again.
+:func:`~esphomerelease.util.iter_asynchronously` now runs every job through a
+:class:`RetryPolicy`, which retries the failures that are worth another go:
+
+- 5xx answers, from github3 (``ServerError``) or the GraphQL endpoint;
+- timeouts and dropped connections;
+- secondary rate limits the session did not already wait out, no earlier
+  than their ``Retry-After``. A response the
+  :class:`~esphomerelease.transport.ReleaseSession` gave up retrying is
+  marked ``rate_limit_retried`` and not retried again here.
+
+Retries back off exponentially with full jitter (a random delay between zero
+and the exponential cap), so jobs that failed together do not retry in lock
+step. Every policy spends from one :class:`RetryBudget` per command
+(:data:`RETRIES`, reset by the CLI), nested job lists included, so an outage
+fails a command after a bounded wait instead of retrying every job to the
+limit.
+
+Import-clean; errors are recognised by type and duck-typed status codes.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import requests
+from github3.exceptions import TransportError
+
+from .governor import secondary_rate_limit_delay
+
+T = TypeVar("T")
+
+# Attempts of one job, the first included.
+MAX_ATTEMPTS = 4
+
+# Cap of the backoff before the first retry, doubling for each further one.
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+
+# Retries one command may spend across all of its job lists.
+RETRY_BUDGET = 20
+
+
+def transient_delay(exc: BaseException) -> Optional[float]:
+    """Whether ``exc`` is worth retrying: the least delay before doing so
+    (0.0 unless GitHub said how long to wait), or ``None`` if it is not."""
+    response = getattr(exc, "response", None)
+    if response is not None and getattr(response, "headers", None) is not None:
+        delay = secondary_rate_limit_delay(response)
+        if delay is not None:
+            if getattr(response, "rate_limit_retried", False):
+                return None
+            return delay
+    if isinstance(
+        exc,
+        (
+            TransportError,
+            requests.ConnectionError,
+            requests.Timeout,
+            ConnectionError,
+            TimeoutError,
+        ),
+    ):
+        return 0.0
+    status = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int) and 500 <= status < 600:
+        return 0.0
+    return None
+
+
+class RetryBudget:
+    """The retries one command may spend, across every policy it uses."""
+
+    def __init__(self, limit: int = RETRY_BUDGET):
+        self.limit = limit
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def reset(self, limit: int = RETRY_BUDGET):
+        """Start budgeting a new command."""
+        with self._lock:
+            self.limit = limit
+            self.spent = 0
+
+    def spend(self) -> bool:
+        """Claim one retry; ``False`` once the budget is used up."""
+        with self._lock:
+            if self.spent >= self.limit:
+                return False
+            self.spent += 1
+            return True
+
+
+# Shared by every policy that is not given a budget of its own.
+RETRIES = RetryBudget()
+
+
+class RetryPolicy:
+    """Retries transient failures with jittered exponential backoff."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = MAX_ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        budget: Optional[RetryBudget] = None,
+        sleep=time.sleep,
+        jitter=random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RETRIES
+        self.retries = 0
+        self._stopped = False
+        self._sleep = sleep
+        self._jitter = jitter
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """The delay after failed attempt ``attempt`` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self._jitter() * cap
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._stopped or not self.budget.spend():
+                return False
+            self.retries += 1
+            return True
+
+    def stop(self):
+        """Spend no more retries, e.g. once the job list has failed anyway."""
+        with self._lock:
+            self._stopped = True
+
+    def call(self, job: Callable[[], T]) -> T:
+        """Run ``job``, retrying it while it fails transiently.
+
+        The last error is raised once the job runs out of attempts, the
+        command out of budget, or the error is not transient.
+        """
+        attempt = 1
+        while True:
+            try:
+                return job()
+            except Exception as exc:  # pylint: disable=broad-except
+                least = transient_delay(exc)
+                if least is None or attempt >= self.max_attempts or not self._spend():
+                    raise
+                self._sleep(max(least, self.backoff(attempt)))
+                attempt += 1
@@ -0,0 +1,149 @@
+"""Thread-safe cache that merges concurrent fetches of the same key.
+
+``Project.pr_cache`` is filled from ``process_asynchronously`` workers, the
+GraphQL batches and the milestone listings, often at the same time: the code
+PRs of a cut and the docs pairing ask for overlapping numbers. With a plain
+dict each of them went to the network for a PR another thread was already
+fetching. :class:`SingleFlightCache` makes the first asker of a key its
+fetcher; everyone asking while that fetch is in flight waits for, and shares,
+its result.
+
+Its hit, miss and coalesced counts (:attr:`~SingleFlightCache.stats`) are
+printed with the request report at the end of each command.
+
+It keeps the dict surface (``in``, ``[]``, ``update``, ``clear``, ``values``,
+iteration) the rest of the code and the tests rely on. Import-clean (stdlib only).
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, NamedTuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    coalesced: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es), "
+            f"{self.coalesced} coalesced"
+        )
+
+
+class SingleFlightCache(Generic[K, V]):
+    """Dict-like cache where each missing key is fetched by exactly one caller."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[K, V] = {}
+        self._in_flight: Dict[K, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.coalesced)
+
+    def reset_stats(self):
+        """Count from zero again, e.g. for the next command."""
+        with self._lock:
+            self.hits = self.misses = self.coalesced = 0
+
+    def claim(self, keys: Iterable[K]) -> List[K]:
+        """Register interest in ``keys``; return the ones the caller must fetch.
+
+        Returned keys are in flight under the caller, who must hand every one
+        of them to :meth:`__setitem__` / :meth:`update` or :meth:`abandon`.
+        Keys already cached or in flight elsewhere are not returned; read
+        them with :meth:`wait`.
+        """
+        owned = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._values:
+                    self.hits += 1
+                elif key in self._in_flight:
+                    self.coalesced += 1
+                else:
+                    self.misses += 1
+                    self._in_flight[key] = Future()
+                    owned.append(key)
+        return owned
+
+    def abandon(self, keys: Iterable[K], error: BaseException):
+        """Fail the still in-flight ``keys`` of a claim, waking their waiters."""
+        with self._lock:
+            futures = [self._in_flight.pop(key, None) for key in keys]
+        for future in futures:
+            if future is not None:
+                future.set_exception(error)
+
+    def wait(self, key: K) -> V:
+        """The value of ``key``, blocking while another thread fetches it."""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            future = self._in_flight.get(key)
+        if future is None:
+            raise KeyError(key)
+        return future.result()
+
+    def get_or_fetch(self, key: K, fetch: Callable[[K], V]) -> V:
+        """The cached value of ``key``, fetching it at most once across threads."""
+        if not self.claim([key]):
+            return self.wait(key)
+        try:
+            value = fetch(key)
+        except BaseException as err:
+            self.abandon([key], err)
+            raise
+        self[key] = value
+        return value
+
+    def __setitem__(self, key: K, value: V):
+        with self._lock:
+            self._values[key] = value
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def update(self, values: Dict[K, V]):
+        for key, value in values.items():
+            self[key] = value
+
+    def __getitem__(self, key: K) -> V:
+        with self._lock:
+            return self._values[key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._values
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._values))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def values(self) -> List[V]:
+        """A snapshot of the cached values."""
+        with self._lock:
+            return list(self._values.values())
+
+    def discard(self, keys: Iterable[K]):
+        """Drop the cached values of ``keys``, so the next ask fetches them."""
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value (fetches in flight still complete)."""
+        with self._lock:
+            self._values.clear()
@@ -0,0 +1,411 @@
+"""Persistent on-disk store of GitHub metadata.
+
+``Project.pr_cache`` only lives for one process, so ``cut``, ``publish`` and
+``release-notes`` would each download the same merged PRs again. This store
+keeps every fetched PR in a local SQLite file, keyed by ``(repo, number)``,
+together with the ``ETag`` and ``updated_at`` needed to revalidate it cheaply:
+a REST ``If-None-Match`` request answered with 304 does not count against the
+rate limit. The least recently used entries are evicted past a size cap.
+
+Each PR's milestone, state and merge time are kept in indexed columns next to
+the payload, and the last listing of each repository's open milestones and
+recent releases is kept too, as are the PR numbers of each open milestone as
+last listed. PRs on those listings are never evicted. That is enough to
+answer ``release-notes`` and ``next-beta-prs`` with ``--offline``, from this
+file and the local git checkouts alone.
+
+Import-clean (stdlib only): payloads are stored as-is and turning them back
+into PR and milestone objects is left to :mod:`esphomerelease.project`.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .exceptions import EsphomeReleaseError
+
+# Default LRU cap. A release cycle touches roughly a thousand PRs, so this
+# keeps a few cycles of both repos around.
+DEFAULT_MAX_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pulls (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    etag TEXT,
+    updated_at TEXT,
+    last_used REAL NOT NULL,
+    milestone TEXT,
+    state TEXT,
+    merged_at TEXT,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS milestones (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS milestone_listings (
+    repo TEXT NOT NULL,
+    title TEXT NOT NULL,
+    states TEXT NOT NULL,
+    listed_at REAL NOT NULL,
+    PRIMARY KEY (repo, title, states)
+);
+CREATE TABLE IF NOT EXISTS milestone_listing_pulls (
+    repo TEXT NOT NULL,
+    title TEXT NOT NULL,
+    states TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    PRIMARY KEY (repo, title, states, number)
+);
+CREATE TABLE IF NOT EXISTS releases (
+    repo TEXT NOT NULL,
+    tag_name TEXT NOT NULL,
+    prerelease INTEGER NOT NULL,
+    PRIMARY KEY (repo, tag_name)
+);
+"""
+
+# Created once the columns they cover exist, also in stores written before
+# the columns were added.
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS pulls_last_used ON pulls (last_used);
+CREATE INDEX IF NOT EXISTS pulls_milestone ON pulls (repo, milestone, state);
+CREATE INDEX IF NOT EXISTS pulls_merged_at ON pulls (repo, merged_at);
+CREATE INDEX IF NOT EXISTS milestones_title ON milestones (repo, title);
+CREATE INDEX IF NOT EXISTS milestone_listing_pulls_number
+    ON milestone_listing_pulls (repo, number);
+"""
+
+# Columns derived from the payload, added to stores that predate them.
+_PULL_COLUMNS = ("milestone", "state", "merged_at")
+
+
+class OfflineError(EsphomeReleaseError):
+    """``--offline`` needed something the local store does not have."""
+
+
+def _states_key(states: Optional[Sequence[str]]) -> str:
+    """How a listing's GraphQL ``states`` filter is stored ("" for all)."""
+    return ",".join(sorted(states or ()))
+
+
+def _pull_columns(kind: str, payload: dict) -> Tuple[Optional[str], ...]:
+    """Milestone title, GraphQL-style state and merge time of a payload."""
+    milestone = payload.get("milestone") or {}
+    if kind == "graphql":
+        return milestone.get("title"), payload.get("state"), payload.get("mergedAt")
+    merged_at = payload.get("merged_at")
+    state = payload.get("state")
+    if state is not None:
+        state = "MERGED" if merged_at else state.upper()
+    return milestone.get("title"), state, merged_at
+
+
+class CachedPull(NamedTuple):
+    """One stored PR payload and what is needed to revalidate it.
+
+    ``kind`` says which API the payload came from (``"rest"`` or
+    ``"graphql"``), since the two are shaped differently.
+    """
+
+    repo: str
+    number: int
+    kind: str
+    payload: dict
+    etag: Optional[str]
+    updated_at: Optional[str]
+
+
+class Store:
+    """Thread-safe SQLite-backed metadata store with LRU eviction of PRs."""
+
+    def __init__(self, path: Path, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Worker threads share one connection; the lock serializes access.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._add_pull_columns()
+            self._conn.executescript(_INDEXES)
+            self._conn.commit()
+
+    def _add_pull_columns(self):
+        """Add and fill the derived PR columns of a store that predates them."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(pulls)")}
+        missing = [column for column in _PULL_COLUMNS if column not in existing]
+        if not missing:
+            return
+        for column in missing:
+            self._conn.execute(f"ALTER TABLE pulls ADD COLUMN {column} TEXT")
+        rows = self._conn.execute("SELECT repo, number, kind, payload FROM pulls")
+        self._conn.executemany(
+            "UPDATE pulls SET milestone = ?, state = ?, merged_at = ? "
+            "WHERE repo = ? AND number = ?",
+            [
+                (*_pull_columns(kind, json.loads(payload)), repo, number)
+                for repo, number, kind, payload in rows.fetchall()
+            ],
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_pull(self, repo: str, number: int) -> Optional[CachedPull]:
+        return self.get_pulls(repo, [number]).get(number)
+
+    def get_pulls(self, repo: str, numbers: Iterable[int]) -> Dict[int, CachedPull]:
+        """Look up several PRs at once, marking the hits as recently used."""
+        numbers = list(dict.fromkeys(numbers))
+        found: Dict[int, CachedPull] = {}
+        if not numbers:
+            return found
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for i in range(0, len(numbers), 500):
+                end = i + 500
+                chunk = numbers[i:end]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT number, kind, payload, etag, updated_at FROM pulls "
+                    f"WHERE repo = ? AND number IN ({marks})",
+                    [repo, *chunk],
+                ).fetchall()
+                for number, kind, payload, etag, updated_at in rows:
+                    found[number] = CachedPull(
+                        repo, number, kind, json.loads(payload), etag, updated_at
+                    )
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE pulls SET last_used = ? WHERE repo = ? AND number = ?",
+                    [(now, repo, number) for number in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_pulls(self, entries: List[CachedPull]):
+        """Insert or replace entries, then evict down to ``max_entries``."""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pulls (repo, number, kind, payload, etag, "
+                "updated_at, last_used, milestone, state, merged_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry.repo,
+                        entry.number,
+                        entry.kind,
+                        json.dumps(entry.payload),
+                        entry.etag,
+                        entry.updated_at,
+                        now,
+                        *_pull_columns(entry.kind, entry.payload),
+                    )
+                    for entry in entries
+                ],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the least recently used PRs past ``max_entries``, except the
+        ones on a stored milestone listing."""
+        (pinned,) = self._conn.execute(
+            "SELECT COUNT(*) FROM pulls WHERE EXISTS ("
+            "SELECT 1 FROM milestone_listing_pulls AS listed "
+            "WHERE listed.repo = pulls.repo AND listed.number = pulls.number)"
+        ).fetchone()
+        self._conn.execute(
+            "DELETE FROM pulls WHERE rowid IN ("
+            "SELECT rowid FROM pulls WHERE NOT EXISTS ("
+            "SELECT 1 FROM milestone_listing_pulls AS listed "
+            "WHERE listed.repo = pulls.repo AND listed.number = pulls.number) "
+            "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max(0, self.max_entries - pinned),),
+        )
+
+    def put_pull(self, entry: CachedPull):
+        self.put_pulls([entry])
+
+    def put_milestone_listing(
+        self,
+        repo: str,
+        title: str,
+        states: Optional[Sequence[str]],
+        numbers: Iterable[int],
+    ):
+        """Record the PRs a listing of milestone ``title`` in ``states`` found."""
+        key = _states_key(states)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO milestone_listings "
+                "(repo, title, states, listed_at) VALUES (?, ?, ?, ?)",
+                (repo, title, key, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM milestone_listing_pulls "
+                "WHERE repo = ? AND title = ? AND states = ?",
+                (repo, title, key),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO milestone_listing_pulls "
+                "(repo, title, states, number) VALUES (?, ?, ?, ?)",
+                [(repo, title, key, number) for number in numbers],
+            )
+            self._conn.commit()
+
+    def get_milestone_pulls(
+        self, repo: str, title: str, states: Optional[Sequence[str]] = None
+    ) -> List[CachedPull]:
+        """The stored PRs on milestone ``title``, in GraphQL ``states``.
+
+        The PRs are the ones the last listing of the milestone in these
+        ``states`` found, or the last listing in every state, narrowed down.
+        Raises :class:`OfflineError` when the milestone was never listed or a
+        listed PR is not stored.
+        """
+        key = _states_key(states)
+        query = (
+            "SELECT listed.number, kind, payload, etag, updated_at "
+            "FROM milestone_listing_pulls AS listed LEFT JOIN pulls "
+            "ON pulls.repo = listed.repo AND pulls.number = listed.number "
+            "WHERE listed.repo = ? AND listed.title = ? AND listed.states = ?"
+        )
+        with self._lock:
+            listed = {
+                states_key
+                for (states_key,) in self._conn.execute(
+                    "SELECT states FROM milestone_listings "
+                    "WHERE repo = ? AND title = ? AND states IN (?, '')",
+                    (repo, title, key),
+                )
+            }
+            if not listed:
+                raise OfflineError(
+                    f"Milestone {title} of {repo} was never listed; run once "
+                    "without --offline to list it."
+                )
+            params: list = [repo, title, key if key in listed else ""]
+            if key not in listed:
+                # Narrow down the listing in every state.
+                query += (
+                    " AND (pulls.number IS NULL OR "
+                    f"state IN ({','.join('?' * len(states))}))"
+                )
+                params += states
+            rows = self._conn.execute(
+                query + " ORDER BY listed.number", params
+            ).fetchall()
+        missing = [number for number, kind, *_ in rows if kind is None]
+        if missing:
+            raise OfflineError(
+                f"{len(missing)} PR(s) on milestone {title} of {repo} are not "
+                "in the local store "
+                f"({', '.join(f'#{number}' for number in missing[:10])}"
+                f"{', ...' if len(missing) > 10 else ''}); run once without "
+                "--offline to fetch them."
+            )
+        return [
+            CachedPull(repo, number, kind, json.loads(payload), etag, updated_at)
+            for number, kind, payload, etag, updated_at in rows
+        ]
+
+    def put_open_milestones(self, repo: str, payloads: List[dict]):
+        """Replace the stored open milestones of ``repo`` with a fresh listing.
+
+        The PR listings of milestones that are no longer open are dropped,
+        and with them what kept their PRs from being evicted.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM milestones WHERE repo = ?", (repo,))
+            self._conn.executemany(
+                "INSERT INTO milestones (repo, number, title, payload) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (repo, payload["number"], payload["title"], json.dumps(payload))
+                    for payload in payloads
+                ],
+            )
+            for table in ("milestone_listings", "milestone_listing_pulls"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE repo = ? AND title NOT IN ("
+                    "SELECT title FROM milestones WHERE repo = ?)",
+                    (repo, repo),
+                )
+            self._conn.commit()
+
+    def get_open_milestones(self, repo: str) -> List[dict]:
+        """The last listing of ``repo``'s open milestones."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM milestones WHERE repo = ? ORDER BY number",
+                (repo,),
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def put_releases(self, repo: str, releases: Iterable[Tuple[str, bool]]):
+        """Record ``(tag_name, prerelease)`` of releases seen on ``repo``."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO releases (repo, tag_name, prerelease) "
+                "VALUES (?, ?, ?)",
+                [(repo, tag, int(prerelease)) for tag, prerelease in releases],
+            )
+            self._conn.commit()
+
+    def get_release_tags(
+        self, repo: str, *, include_prereleases: bool = True
+    ) -> List[str]:
+        """Tag names of the releases seen on ``repo``."""
+        query = "SELECT tag_name FROM releases WHERE repo = ?"
+        if not include_prereleases:
+            query += " AND prerelease = 0"
+        with self._lock:
+            return [tag for (tag,) in self._conn.execute(query, (repo,))]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pulls").fetchone()[0]
+
+
+STORE: Optional[Store] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> Optional[Store]:
+    """The process-wide store, or ``None`` when no ``cache_dir`` is configured."""
+    global STORE
+
+    if STORE is not None:
+        return STORE
+
+    from .config import CONFIG
+
+    cache_dir = CONFIG.get("cache_dir")
+    if not cache_dir:
+        return None
+    # Workers of the shared pool ask for it too; open the file only once.
+    with _STORE_LOCK:
+        if STORE is None:
+            STORE = Store(
+                Path(cache_dir).expanduser() / "github.sqlite",
+                max_entries=CONFIG.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+            )
+    return STORE
@@ -0,0 +1,263 @@
+"""HTTP transport underneath the github3 session.
+
+:class:`ReleaseSession` is the ``GitHubSession`` every GitHub call of the
+release tooling goes through. It adds two things to github3's own session.
+Every session, GitHub-bound or not, is built by :func:`pooled_session`.
+
+Conditional requests
+--------------------
+github3 downloads a listing in full every time it is asked for it, even when
+nothing changed since the last call. The release tooling re-reads the same
+listings constantly (open milestones, milestone issues, recent releases), most
+visibly in the "Check again?" loops of the cut pre-flight, which re-poll every
+few seconds while the release manager waits.
+
+The session remembers the ``ETag`` / ``Last-Modified`` of every successful GET
+and turns the next GET of the same URL into a conditional request. GitHub
+answers an unchanged resource with a 304, which is not counted against the
+rate limit, and the session hands github3 the cached 200 response as if it had
+been downloaded again.
+
+Adaptive concurrency
+--------------------
+Every request holds a slot of the shared
+:data:`~esphomerelease.governor.GOVERNOR` while in flight, and its response is
+fed back so the number of slots follows GitHub's latency and rate limit
+headers. Requests refused by a secondary rate limit are retried after
+GitHub's ``Retry-After``. Every request is also counted by the shared
+:data:`~esphomerelease.accounting.ACCOUNTANT`, which can stop a command that
+goes over its request budget.
+
+Connection pooling
+------------------
+``requests`` keeps at most 10 connections per host, while
+``process_asynchronously`` runs up to the governor's ceiling of workers at
+once; every connection beyond the tenth was opened, used once and thrown
+away, repeating the TLS handshake. :func:`pooled_session` mounts adapters
+whose pools match the worker count, and :func:`pool_stats` reports how many
+requests reused a kept-alive connection.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import github3.session
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .accounting import ACCOUNTANT, RequestAccountant
+from .governor import GOVERNOR, ConcurrencyGovernor
+
+# How often one request is retried after secondary rate limits before the
+# 403/429 is handed to the caller.
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Distinct hosts a session keeps pools for (GitHub API, uploads, Netlify, ...).
+POOL_HOSTS = 8
+
+# Conditional request headers; a caller that sets one of these itself (e.g.
+# the PR store revalidating a payload) wants to see the raw 304.
+_CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CachedResponse(NamedTuple):
+    """What is needed to replay a 200 GET response."""
+
+    url: str
+    headers: dict
+    content: bytes
+    encoding: Optional[str]
+
+    @property
+    def validators(self) -> dict:
+        """Request headers that make a repeat GET conditional on this copy."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+class ResponseCache:
+    """Thread-safe, size-capped LRU of cacheable GET responses by URL."""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _replay(entry: CachedResponse, revalidated: requests.Response) -> requests.Response:
+    """Build the 200 response a 304 stands for, from the cached copy."""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = entry.url
+    response.encoding = entry.encoding
+    response._content = entry.content  # pylint: disable=protected-access
+    headers = CaseInsensitiveDict(entry.headers)
+    # Rate limit headers describe the current state, not the cached one.
+    for name, value in revalidated.headers.items():
+        if name.lower().startswith("x-ratelimit-"):
+            headers[name] = value
+    response.headers = headers
+    response.request = revalidated.request
+    response.elapsed = revalidated.elapsed
+    response.from_cache = True
+    return response
+
+
+# github3 never implemented ``oauth2_auth``; there is nothing to override.
+class ReleaseSession(github3.session.GitHubSession):  # pylint: disable=abstract-method
+    """A ``GitHubSession`` with conditional GETs and governed concurrency."""
+
+    def __init__(
+        self,
+        *args,
+        response_cache: Optional[ResponseCache] = None,
+        governor: Optional[ConcurrencyGovernor] = None,
+        accountant: Optional[RequestAccountant] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.response_cache = response_cache or ResponseCache()
+        self.governor = governor or GOVERNOR
+        self.accountant = accountant or ACCOUNTANT
+
+    def _cache_key(self, url: str, kwargs: dict) -> tuple:
+        prepared = requests.Request("GET", url, params=kwargs.get("params")).prepare()
+        headers = kwargs.get("headers") or {}
+        accept = headers.get("Accept", self.headers.get("Accept"))
+        return prepared.url, accept
+
+    def request(self, *args, **kwargs):
+        url = args[1] if len(args) > 1 else kwargs.get("url")
+        attempt = 0
+        while True:
+            self.accountant.start()
+            with self.governor.slot():
+                start = time.monotonic()
+                response = self._conditional_request(*args, **kwargs)
+                latency = time.monotonic() - start
+                delay = self.governor.observe(response, latency)
+            self.accountant.record(
+                url, response, latency, stream=bool(kwargs.get("stream"))
+            )
+            if delay is None:
+                return response
+            if attempt >= MAX_RATE_LIMIT_RETRIES:
+                # Retried enough; the job-level retry must not start over.
+                response.rate_limit_retried = True
+                return response
+            # The governor has paused every slot for ``delay``; taking a slot
+            # again on the next attempt waits it out.
+            attempt += 1
+
+    def _conditional_request(self, method, url, *args, **kwargs):
+        headers = kwargs.get("headers") or {}
+        if (
+            method.upper() != "GET"
+            or args
+            or any(name in headers for name in _CONDITIONAL_HEADERS)
+        ):
+            return super().request(method, url, *args, **kwargs)
+
+        key = self._cache_key(url, kwargs)
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            kwargs["headers"] = {**headers, **entry.validators}
+
+        response = super().request(method, url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            return _replay(entry, response)
+        if response.status_code == 200 and (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            self.response_cache.put(
+                key,
+                CachedResponse(
+                    response.url,
+                    dict(response.headers),
+                    response.content,
+                    response.encoding,
+                ),
+            )
+        return response
+
+
+class PoolStats(NamedTuple):
+    """Connections opened versus requests sent by a session's pools."""
+
+    connections: int
+    requests: int
+
+    @property
+    def reused(self) -> int:
+        """Requests that went out over an already open connection."""
+        return max(0, self.requests - self.connections)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} requests over {self.connections} connections "
+            f"({self.reused} reused)"
+        )
+
+
+def pooled_session(
+    session_class=requests.Session, *, pool_size: Optional[int] = None, **kwargs
+) -> requests.Session:
+    """Build a ``session_class`` whose keep-alive pools fit the worker pool.
+
+    ``pool_size`` defaults to the governor's ceiling, which is also how many
+    workers ``process_asynchronously`` starts, so no worker ever has to open
+    a connection that is discarded right after.
+    """
+    pool_size = pool_size or GOVERNOR.maximum
+    session = session_class(**kwargs)
+    for prefix in ("https://", "http://"):
+        session.mount(
+            prefix,
+            HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size),
+        )
+    return session
+
+
+def pool_stats(session: requests.Session) -> PoolStats:
+    """Sum the connection counters of every pool ``session`` has opened."""
+    connections = requests_sent = 0
+    for adapter in session.adapters.values():
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is None:
+            continue
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+    return PoolStats(connections, requests_sent)
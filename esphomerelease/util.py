@@ -1,11 +1,10 @@
 import datetime
-import os
 import subprocess
-import time
 import threading
-import queue
+import time
 import shlex
 import sys
+from typing import Iterator, Optional
 
 import click
 import requests
@@ -13,6 +12,21 @@ import requests
 from .config import CONFIG
 from .model import Branch, Version
 from .exceptions import EsphomeReleaseError
+from .governor import GOVERNOR
+from .jobs import JOB_POOL, TaskGroup
+from .retry import RetryPolicy
+from .transport import pool_stats, pooled_session
+
+# Pooled keep-alive session for the non-GitHub endpoints (Netlify, Cloudflare).
+HTTP_SESSION = None
+
+
+def get_http_session() -> requests.Session:
+    global HTTP_SESSION
+
+    if HTTP_SESSION is None:
+        HTTP_SESSION = pooled_session()
+    return HTTP_SESSION
 
 
 def copy_clipboard(text):
@@ -41,7 +55,7 @@ def wait_for_netlify(version: Version):
     start = time.time()
     while True:
         url = f"https://{'beta.' if version.beta else ''}esphome.io/_static/version"
-        req = requests.get(url)
+        req = get_http_session().get(url)
         if req.content.decode() == str(version):
             break
         print(f"Waiting for netlify: {req.content} != {version}")
@@ -67,60 +81,167 @@ def purge_cloudflare_cache():
         "Content-Type": "application/json",
     }
     zone = CONFIG["cloudflare_zone"]
-    requests.post(
+    get_http_session().post(
         f"https://api.cloudflare.com/client/v4/zones/{zone}/purge_cache",
         headers=headers,
         data='{"purge_everything": true}',
     )
 
 
-def process_asynchronously(
-    jobs, heading: str = None, num_threads: int = os.cpu_count()
-) -> list:
-    """Run a list of function objects asynchronously in a thread pool and return the result as a list."""
+class _JobLists:
+    """Which job list prints its progress bar and summary.
+
+    Job lists nest: a job fans out again, a background fetcher fills a cache
+    while the caller reads from it. Only the outermost job list on the main
+    thread prints, so nothing is printed from another thread into the
+    caller's output, and the retries of the job lists run meanwhile are
+    counted in its summary.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._quiet_retries = 0
+
+    def open(self) -> Optional[int]:
+        """Enter a job list; for the outermost one, a mark for :meth:`close`."""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        if depth or threading.current_thread() is not threading.main_thread():
+            return None
+        return self._quiet_retries
+
+    def close(self, mark: Optional[int], retries: int) -> int:
+        """Leave a job list; the retries the outermost one reports."""
+        self._local.depth -= 1
+        with self._lock:
+            if mark is None:
+                self._quiet_retries += retries
+                return 0
+            return retries + self._quiet_retries - mark
+
+
+_JOB_LISTS = _JobLists()
+
+
+class _NoProgress:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, steps: int):
+        pass
+
+
+def iter_asynchronously(
+    jobs,
+    heading: str = None,
+    num_threads: int = None,
+    *,
+    ordered: bool = True,
+    retry: Optional[RetryPolicy] = None,
+    fail_fast: bool = True,
+) -> Iterator:
+    """Run a list of function objects on the :data:`~esphomerelease.jobs.JOB_POOL`, yielding their results.
+
+    Unlike :func:`process_asynchronously`, results are handed out while the
+    remaining jobs still run, so the caller can filter, format or write them
+    meanwhile: in job order as soon as every earlier job is done (``ordered``),
+    or in the order the jobs finish. At most ``num_threads`` of the jobs run
+    at once (by default as many as the pool has workers). Only the outermost
+    job list on the main thread shows progress and a summary; job lists run
+    by jobs or background threads are quiet.
+
+    A job that fails transiently (a 5xx, a dropped connection, a secondary
+    rate limit) is retried under ``retry``, by default a fresh
+    :class:`~esphomerelease.retry.RetryPolicy` per call.
+
+    A job that still fails makes the call fail fast: the jobs not started yet
+    are dropped and the error is raised right away, without waiting for the
+    running ones (whose results are discarded). With ``fail_fast`` off, every
+    job runs to the end first and the error of the first failing job (in job
+    order) is raised then; ``ordered`` stops yielding at that job. A caller that
+    stops reading early leaves the jobs not started yet undone, and waits for
+    the running ones.
+    """
+    jobs = list(jobs)
     if not jobs:
-        return []
+        return
+
+    if num_threads is None:
+        num_threads = JOB_POOL.size
+    num_threads = max(1, min(num_threads, len(jobs)))
+    requests_before = GOVERNOR.requests
 
-    result = {}
+    retry = retry or RetryPolicy()
+    group = TaskGroup(JOB_POOL, jobs, num_threads, retry, fail_fast)
+    group.start()
+    mark = _JOB_LISTS.open()
+
+    results: dict = {}
     errors: dict = {}
-    q = queue.Queue(maxsize=num_threads)
+    next_num = 0
+    try:
+        if mark is None:
+            progress = _NoProgress()
+        else:
+            progress = click.progressbar(length=len(jobs), label=heading)
+        with progress as bar:
+            for _ in jobs:
+                num, value, exc = group.next_done()
+                bar.update(1)
+                if exc is not None:
+                    errors[num] = exc
+                    if fail_fast:
+                        break
+                elif not ordered:
+                    yield value
+                else:
+                    results[num] = value
+                while ordered and next_num in results:
+                    yield results.pop(next_num)
+                    next_num += 1
+        if errors:
+            raise errors[min(errors)]
+    finally:
+        group.cancel(wait=not (fail_fast and errors))
+        retries = _JOB_LISTS.close(mark, retry.retries)
+        if retries:
+            gprint(f"Retried {retries} failed job(s)")
+
+        if mark is not None and GOVERNOR.requests != requests_before:
+            from .github import GITHUB_SESSION
+
+            gprint(GOVERNOR.summary())
+            if GITHUB_SESSION is not None:
+                gprint(f"GitHub connections: {pool_stats(GITHUB_SESSION.session)}")
 
-    def worker():
-        while True:
-            item = q.get()
-            if item is None:
-                q.task_done()
-                break
 
-            num, job = item
-            # A raised job must not kill the worker before task_done(),
-            # otherwise q.join() blocks forever.
-            try:
-                result[num] = job()
-            except Exception as exc:  # pylint: disable=broad-except
-                errors[num] = exc
-            finally:
-                q.task_done()
-
-    threads = []
-    for _ in range(num_threads):
-        t = threading.Thread(target=worker)
-        t.start()
-        threads.append(t)
-
-    job_list = list(enumerate(jobs)) + [None] * num_threads
-    with click.progressbar(job_list, label=heading) as bar:
-        for item in bar:
-            q.put(item)
-        q.join()
-
-    for t in threads:
-        t.join()
-
-    if errors:
-        raise errors[min(errors)]
-
-    return [result[i] for i, job in enumerate(jobs)]
+def process_asynchronously(
+    jobs,
+    heading: str = None,
+    num_threads: int = None,
+    *,
+    retry: Optional[RetryPolicy] = None,
+    fail_fast: bool = True,
+) -> list:
+    """Run a list of function objects asynchronously in a thread pool and return the result as a list.
+
+    The jobs run on the shared :data:`~esphomerelease.jobs.JOB_POOL`, which only bounds how many
+    jobs run at once; how many GitHub requests are actually in flight is
+    decided by the shared :data:`~esphomerelease.governor.GOVERNOR`, which
+    every GitHub session request passes through. The pool is therefore sized
+    to the governor's ceiling rather than to the CPU count.
+
+    See :func:`iter_asynchronously` to handle results as they arrive.
+    """
+    return list(
+        iter_asynchronously(
+            jobs, heading, num_threads, retry=retry, fail_fast=fail_fast
+        )
+    )
 
 
 def _discard_local_changes():
@@ -0,0 +1,228 @@
+"""Push-based invalidation of the PR and milestone caches.
+
+The tooling learns that a PR merged, a label changed or a milestone moved
+only by asking GitHub again. :class:`WebhookReceiver` is an optional local
+HTTP listener (``esphomerelease --webhook-port``) for GitHub webhook
+deliveries of ``pull_request``, ``issues``, ``milestone`` and ``label``
+events, forwarded to it with e.g. ``gh webhook forward``. Each delivery is
+applied to the ``pr_cache`` and ``milestones`` of the project it belongs to,
+so the next lookup sees the change without a request:
+
+- ``pull_request`` carries the whole PR and replaces its cached record;
+- ``issues`` events on a PR update the labels and milestone of a cached
+  record;
+- a closed or deleted ``milestone`` leaves the registry, any other change
+  makes the registry list the milestones again; renames are carried over to
+  the cached PRs;
+- a renamed or deleted ``label`` is renamed in, or removed from, the cached
+  PRs.
+
+A PR that joins a milestone is not missed: GitHub sends a ``pull_request``
+delivery (``milestoned``) with the whole PR along with the ``issues`` one.
+Projects that follow the receiver (``Project.follow_webhooks``) read their
+milestone listings from the cache once they were listed in full, and the cut
+pre-flight checks :meth:`WebhookReceiver.wait` for the next delivery instead
+of asking GitHub again.
+
+:meth:`WebhookReceiver.replay` feeds recorded deliveries through the same
+code, for tests and for debugging a cut after the fact.
+
+Import-clean (stdlib only); projects are duck-typed (``name``, ``pr_cache``,
+``milestones``).
+"""
+
+import dataclasses
+import hashlib
+import hmac
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterable, Optional, Tuple
+
+from .exceptions import EsphomeReleaseError
+from .model import PullRecord
+
+EVENTS = ("pull_request", "issues", "milestone", "label")
+
+
+def load_deliveries(path: Path) -> Iterable[Tuple[str, dict]]:
+    """Read recorded deliveries, one ``{"event": ..., "payload": ...}`` per line."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                delivery = json.loads(line)
+                yield delivery["event"], delivery["payload"]
+
+
+def _update_cached(cache, change: Callable[[PullRecord], PullRecord]):
+    """Apply ``change`` to every cached record it changes."""
+    for number in cache:
+        try:
+            record = cache[number]
+        except KeyError:
+            # Dropped while we were iterating.
+            continue
+        changed = change(record)
+        if changed != record:
+            cache[number] = changed
+
+
+class WebhookReceiver:
+    """Applies GitHub webhook deliveries to the caches of ``projects``."""
+
+    def __init__(self, projects: Iterable, *, secret: Optional[str] = None):
+        self._projects = {f"esphome/{project.name}": project for project in projects}
+        self.secret = secret
+        # Deliveries that changed a cache, for waiters and reports.
+        self.applied = 0
+        self._applied = threading.Condition()
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        """Whether ``body`` carries the ``X-Hub-Signature-256`` of the secret.
+
+        Without a secret no delivery is accepted: any local process could
+        otherwise rewrite the caches a cut relies on.
+        """
+        if not self.secret or not signature:
+            return False
+        expected = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(f"sha256={expected}", signature)
+
+    def apply(self, event: str, payload: dict) -> bool:
+        """Apply one delivery; whether it concerned a project we cache."""
+        if event not in EVENTS:
+            return False
+        repository = payload.get("repository") or {}
+        project = self._projects.get(repository.get("full_name"))
+        if project is None:
+            return False
+        getattr(self, f"_apply_{event}")(project, payload)
+        with self._applied:
+            self.applied += 1
+            self._applied.notify_all()
+        return True
+
+    def replay(self, deliveries: Iterable[Tuple[str, dict]]) -> int:
+        """Apply recorded ``(event, payload)`` deliveries in order.
+
+        Returns how many of them concerned a project we cache.
+        """
+        return sum(self.apply(event, payload) for event, payload in deliveries)
+
+    def wait(self, applied: int, timeout: Optional[float] = None) -> bool:
+        """Block until more than ``applied`` deliveries have been applied."""
+        with self._applied:
+            return self._applied.wait_for(lambda: self.applied > applied, timeout)
+
+    @staticmethod
+    def _apply_pull_request(project, payload: dict):
+        record = PullRecord.from_payload(payload["pull_request"])
+        project.pr_cache[record.number] = record
+
+    @staticmethod
+    def _apply_issues(project, payload: dict):
+        issue = payload["issue"]
+        if "pull_request" not in issue or issue["number"] not in project.pr_cache:
+            # Plain issues, and PRs the next lookup fetches in full anyway.
+            return
+        milestone = issue.get("milestone")
+        record = project.pr_cache[issue["number"]]
+        project.pr_cache[record.number] = dataclasses.replace(
+            record,
+            title=issue["title"],
+            labels=tuple(
+                sys.intern(label["name"]) for label in issue.get("labels") or ()
+            ),
+            milestone_title=milestone["title"] if milestone else None,
+            state=issue.get("state", record.state),
+        )
+
+    @staticmethod
+    def _apply_milestone(project, payload: dict):
+        milestone = payload["milestone"]
+        if payload["action"] in ("closed", "deleted"):
+            project.milestones.discard(SimpleNamespace(number=milestone["number"]))
+        else:
+            # Deliveries carry JSON, the registry holds github3 milestones.
+            project.milestones.refresh()
+
+        renamed = (payload.get("changes") or {}).get("title")
+        if renamed:
+            old, new = renamed["from"], milestone["title"]
+            _update_cached(
+                project.pr_cache,
+                lambda record: dataclasses.replace(record, milestone_title=new)
+                if record.milestone_title == old
+                else record,
+            )
+
+    @staticmethod
+    def _apply_label(project, payload: dict):
+        name = payload["label"]["name"]
+        if payload["action"] == "deleted":
+            _update_cached(
+                project.pr_cache,
+                lambda record: dataclasses.replace(
+                    record,
+                    labels=tuple(label for label in record.labels if label != name),
+                ),
+            )
+            return
+        renamed = (payload.get("changes") or {}).get("name")
+        if renamed:
+            old = renamed["from"]
+            _update_cached(
+                project.pr_cache,
+                lambda record: dataclasses.replace(
+                    record,
+                    labels=tuple(
+                        sys.intern(name) if label == old else label
+                        for label in record.labels
+                    ),
+                ),
+            )
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Listen for deliveries in a daemon thread; ``shutdown()`` the result.
+
+        ``port`` 0 picks a free port, see ``server_address``. A receiver
+        without a secret would reject every delivery, so it refuses to listen.
+        """
+        if not self.secret:
+            raise EsphomeReleaseError("Webhook deliveries need a secret to check")
+        server = ThreadingHTTPServer((host, port), _handler(self))
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="webhook-receiver", daemon=True
+        ).start()
+        return server
+
+
+def _handler(receiver: WebhookReceiver):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):  # pylint: disable=invalid-name
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if not receiver.verify(body, self.headers.get("X-Hub-Signature-256")):
+                self.send_error(401, "Bad signature")
+                return
+            event = self.headers.get("X-GitHub-Event")
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, "Body is not JSON")
+                return
+            if not event or not isinstance(payload, dict):
+                self.send_error(400, "Not a GitHub webhook delivery")
+                return
+            # 202 for deliveries we applied, 204 for pings and everything else.
+            self.send_response(202 if receiver.apply(event, payload) else 204)
+            self.end_headers()
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            # Deliveries arrive during interactive prompts; stay quiet.
+            pass
+
+    return WebhookHandler
@@ -0,0 +1,201 @@
+"""Paced queue for GitHub REST writes.
+
+The ``labels`` command created and renamed labels one REST call at a time,
+about 3k components across four repos, and swallowed every exception. A run
+that hit GitHub's secondary rate limit for content creation left hundreds of
+labels unsynced, indistinguishable from labels that really could not be
+written. :class:`WriteQueue` runs queued writes a few at once, as jobs on the
+shared :data:`~esphomerelease.jobs.JOB_POOL`, and:
+
+- starts no more writes than GitHub allows for content-generating requests
+  (80 a minute, 500 an hour), so a full sync runs at a predictable pace
+  instead of into the limit; the pace (:data:`CONTENT_WRITES`) is shared
+  with the PR mutations of :mod:`~esphomerelease.mutations`, which count
+  against the same limits;
+- retries a write refused by a secondary rate limit after the response's
+  ``Retry-After``, holding every other write back for as long, and one that
+  failed for another transient reason (a 5xx, a timeout or a dropped
+  connection, see :func:`~esphomerelease.retry.transient_delay`) after a
+  jittered backoff, spending from the command's retry budget;
+- returns the writes that failed for good (:class:`WriteFailure`), e.g. a
+  422 for an invalid name, instead of raising them.
+
+Label writes are not batched like the PR mutations of
+:mod:`~esphomerelease.mutations`: GitHub's GraphQL label mutations are still
+in preview, and the REST calls are what the command has always made.
+
+Import-clean; a write is any callable, typically one raising github3's errors.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+import click
+
+from .jobs import start_jobs
+from .retry import RetryBudget, RetryPolicy, transient_delay
+
+# GitHub's documented secondary limits for requests that generate content.
+CONTENT_WRITES_PER_MINUTE = 80
+CONTENT_WRITES_PER_HOUR = 500
+
+# Writes in flight at once. GitHub asks for writes to be sent serially; a few
+# workers only hide the latency of each call, the pacing sets the rate.
+WRITE_WORKERS = 4
+
+# How often one write is attempted before a transient error counts as a
+# failure.
+MAX_WRITE_ATTEMPTS = 5
+
+
+class WriteFailure(NamedTuple):
+    """A queued write that did not go through, and why."""
+
+    description: str
+    message: str
+
+
+class WritePacer:
+    """Starts content writes no faster than GitHub's secondary limits allow.
+
+    The limits are per user, not per kind of write: REST label writes and
+    GraphQL PR mutations draw from the same allowance, so both wait on
+    :data:`CONTENT_WRITES`.
+    """
+
+    def __init__(
+        self,
+        per_minute: int = CONTENT_WRITES_PER_MINUTE,
+        per_hour: int = CONTENT_WRITES_PER_HOUR,
+        *,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # Start times of the last ``per_hour`` writes.
+        self._starts: deque = deque(maxlen=per_hour)
+        self._paused_until = 0.0
+
+    def minutes(self, count: int) -> int:
+        """How long ``count`` writes take at least, at the allowed pace."""
+        return max(-(-count // self.per_minute), 60 * ((count - 1) // self.per_hour))
+
+    def _next_start(self, now: float, count: int) -> float:
+        """When ``count`` more writes may start, given the ones started before."""
+        start = max(now, self._paused_until)
+        for limit, period in ((self.per_minute, 60.0), (self.per_hour, 3600.0)):
+            # The writes started within ``period`` must leave room for these.
+            before = limit - count + 1
+            if len(self._starts) >= before:
+                start = max(start, self._starts[-before] + period)
+        return start
+
+    def take(self, count: int = 1):
+        """Wait until ``count`` more writes may start, and count them as started.
+
+        A batch larger than the per-minute limit counts as that limit.
+        """
+        count = max(1, min(count, self.per_minute, self.per_hour))
+        while True:
+            with self._lock:
+                now = self._clock()
+                start = self._next_start(now, count)
+                if start <= now:
+                    self._starts.extend([now] * count)
+                    return
+            self._sleep(start - now)
+
+    def pause(self, delay: float):
+        """Hold every write back for ``delay`` seconds, e.g. after a rate limit."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+
+
+# Shared by every writer, so all content writes of a command share one pace.
+CONTENT_WRITES = WritePacer()
+
+
+class WriteQueue:
+    """Collects writes with :meth:`add` and sends them paced with :meth:`run`.
+
+    Writes are paced by ``pacer``, by default the shared
+    :data:`CONTENT_WRITES`.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = WRITE_WORKERS,
+        pacer: Optional[WritePacer] = None,
+        max_attempts: int = MAX_WRITE_ATTEMPTS,
+        backoff: Optional[Callable[[int], float]] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.workers = workers
+        self.pacer = pacer or CONTENT_WRITES
+        self.max_attempts = max_attempts
+        self.retries = 0
+        policy = RetryPolicy(max_attempts=max_attempts, budget=budget)
+        self._backoff = backoff or policy.backoff
+        self._budget = policy.budget
+        self._lock = threading.Lock()
+        self._writes: List[tuple] = []
+
+    def add(self, description: str, write: Callable[[], object]):
+        """Queue ``write``; ``description`` names it in progress and failures."""
+        self._writes.append((description, write))
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def minutes(self) -> int:
+        """How long the queued writes take at least, at the allowed pace."""
+        return self.pacer.minutes(len(self._writes))
+
+    def _pause(self, delay: float):
+        with self._lock:
+            self.retries += 1
+        self.pacer.pause(delay)
+
+    def _send(self, description: str, write) -> Optional[WriteFailure]:
+        for attempt in range(1, self.max_attempts + 1):
+            self.pacer.take()
+            try:
+                write()
+            except Exception as err:  # pylint: disable=broad-except
+                delay = transient_delay(err)
+                if (
+                    delay is None
+                    or attempt == self.max_attempts
+                    or not self._budget.spend()
+                ):
+                    return WriteFailure(description, str(err) or repr(err))
+                self._pause(max(delay, self._backoff(attempt)))
+            else:
+                return None
+        return None
+
+    def run(self, heading: Optional[str] = None) -> List[WriteFailure]:
+        """Send every queued write; return the ones that failed for good."""
+        writes, self._writes = self._writes, []
+        if not writes:
+            return []
+        # _send reports failures instead of raising, and retries on its own.
+        results = start_jobs(
+            [functools.partial(self._send, *queued) for queued in writes],
+            self.workers,
+            retry=RetryPolicy(max_attempts=1),
+        )
+        failures = []
+        with click.progressbar(results, length=len(writes), label=heading) as bar:
+            for failure in bar:
+                if failure is not None:
+                    failures.append(failure)
+        return failures
@@ -12,6 +12,7 @@ setup(
     name="esphomerelease",
     version="1.0",
     packages=["esphomerelease"],
+    python_requires=">=3.10",
     install_requires=REQUIRES,
     entry_points={"console_scripts": ["esphomerelease = esphomerelease.__main__:main"]},
 )
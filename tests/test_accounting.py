@@ -0,0 +1,247 @@
+"""Tests for the per-command GitHub request accounting.
+
+``accounting`` and ``transport`` do not import ``.config``, so no
+``config.json`` is needed. Requests go through a real ``ReleaseSession`` with
+the network replaced by a hand-rolled ``requests`` adapter. The tests that
+drive real ``project`` and ``util`` code use the temp ``config.json`` reload
+pattern of the other ``project`` tests.
+"""
+
+import functools
+import importlib
+import json
+import re
+
+import types
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from esphomerelease.accounting import (
+    RequestAccountant,
+    RequestBudgetExceeded,
+    endpoint_template,
+)
+from esphomerelease.retry import RetryBudget, RetryPolicy
+from esphomerelease.transport import ReleaseSession
+
+API = "https://api.github.com"
+
+
+class FakeAdapter(BaseAdapter):
+    """Serves ``resources`` (url -> (etag, payload)) honouring If-None-Match."""
+
+    def __init__(self, resources: dict):
+        super().__init__()
+        self.resources = resources
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        etag, payload = self.resources[request.url]
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.headers["X-RateLimit-Remaining"] = str(5000 - len(self.sent))
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response.headers["ETag"] = etag
+        response._content = json.dumps(payload).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    "url, template",
+    [
+        (f"{API}/repos/esphome/esphome/pulls/17797", "/repos/{o}/{r}/pulls/{n}"),
+        (f"{API}/repos/esphome/esphome.io/milestones?state=open", "/repos/{o}/{r}/milestones"),
+        (f"{API}/repos/esphome/esphome/labels/cherry-picked", "/repos/{o}/{r}/labels/{name}"),
+        (
+            f"{API}/repos/esphome/esphome/commits/{'a1' * 20}/status",
+            "/repos/{o}/{r}/commits/{sha}/status",
+        ),
+        (f"{API}/users/jesserockz", "/users/{u}"),
+        (f"{API}/orgs/esphome/repos", "/orgs/{org}/repos"),
+        (f"{API}/graphql", "/graphql"),
+    ],
+)
+def test_endpoint_template(url, template):
+    assert endpoint_template(url) == template
+
+
+def _session(resources: dict, accountant: RequestAccountant):
+    session = ReleaseSession(accountant=accountant)
+    adapter = FakeAdapter(resources)
+    session.mount("https://", adapter)
+    return session, adapter
+
+
+def _caller(name: str):
+    """A function that looks like it lives in ``esphomerelease.<module>``."""
+    module, function = name.split(".")
+    namespace = {"__name__": f"esphomerelease.{module}"}
+    exec(  # pylint: disable=exec-used
+        f"def {function}(session, url):\n    return session.get(url)\n", namespace
+    )
+    return namespace[function]
+
+
+def test_requests_are_grouped_by_endpoint_and_caller():
+    urls = [f"{API}/repos/esphome/esphome/pulls/{n}" for n in (1, 2)]
+    accountant = RequestAccountant()
+    session, _ = _session(
+        {url: ('"v1"', {"number": i}) for i, url in enumerate(urls)}, accountant
+    )
+    get_pr = _caller("project._fetch_pr")
+    recheck = _caller("cutting._find_docs_pr_pairs")
+
+    for url in urls:
+        get_pr(session, url)
+    recheck(session, urls[0])
+
+    endpoints = accountant.usage("endpoint")
+    assert list(endpoints) == ["/repos/{o}/{r}/pulls/{n}"]
+    assert endpoints["/repos/{o}/{r}/pulls/{n}"].requests == 3
+    assert endpoints["/repos/{o}/{r}/pulls/{n}"].not_modified == 1
+
+    callers = accountant.usage("caller")
+    assert callers["project._fetch_pr"].requests == 2
+    assert callers["project._fetch_pr"].received > 0
+    assert callers["cutting._find_docs_pr_pairs"].received == 0
+    assert accountant.rate_limit_remaining == 4997
+
+    report = accountant.report()
+    assert report.startswith("GitHub API: 3 request(s)")
+    assert "1 not modified (304)" in report
+    assert "project._fetch_pr" in report
+
+
+def test_budget_aborts_before_the_request_that_would_exceed_it():
+    url = f"{API}/repos/esphome/esphome/releases"
+    accountant = RequestAccountant(budget=2)
+    session, adapter = _session({url: ('"v1"', [])}, accountant)
+
+    session.get(url)
+    session.get(url)
+    with pytest.raises(RequestBudgetExceeded, match="budget of 2"):
+        session.get(url)
+    assert len(adapter.sent) == 2
+
+    accountant.reset()
+    session.get(url)
+    assert accountant.requests == 1
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(repo_dir),
+        "esphome_io_path": str(repo_dir),
+        "esphome_hassio_path": str(repo_dir),
+        "esphome_issues_path": str(repo_dir),
+        "esphome_feature_requests_path": str(repo_dir),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project_mod
+
+    importlib.reload(project_mod)
+    import esphomerelease.util as util_mod
+
+    importlib.reload(util_mod)
+    return project_mod, util_mod
+
+
+class GraphQLAdapter(BaseAdapter):
+    """Answers the aliased ``prN`` lookups of GraphQL batch queries."""
+
+    def send(self, request, **kwargs):
+        query = json.loads(request.body)["query"]
+        numbers = re.findall(r"pullRequest\(number: (\d+)\)", query)
+        nodes = {
+            f"pr{n}": {
+                "number": int(n),
+                "title": f"PR {n}",
+                "body": "",
+                "url": f"https://github.com/esphome/esphome/pull/{n}",
+                "state": "OPEN",
+                "mergedAt": None,
+                "updatedAt": "2026-07-02T08:00:00Z",
+                "mergeCommit": None,
+                "author": None,
+                "labels": {"nodes": []},
+                "milestone": None,
+            }
+            for n in numbers
+        }
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        response._content = json.dumps({"data": {"repository": nodes}}).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def test_graphql_batches_are_charged_to_the_project_function(modules, tmp_path):
+    project_mod, _ = modules
+    accountant = RequestAccountant()
+    session = ReleaseSession(accountant=accountant)
+    session.mount("https://", GraphQLAdapter())
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    proj._repo = types.SimpleNamespace(session=session)
+
+    proj.get_prs(list(range(1, 151)))
+
+    callers = accountant.usage("caller")
+    assert list(callers) == ["project._bulk_fetch_prs"]
+    assert callers["project._bulk_fetch_prs"].requests == 2
+
+
+def test_retried_jobs_are_charged_to_the_function_that_started_them(modules):
+    _, util_mod = modules
+    url = f"{API}/repos/esphome/esphome/pulls/1"
+    accountant = RequestAccountant()
+    session, adapter = _session({url: ('"v1"', {"number": 1})}, accountant)
+    send = adapter.send
+
+    def flaky_send(request, **kwargs):
+        if not adapter.sent:
+            adapter.sent.append(request)
+            raise requests.ConnectionError("connection reset")
+        return send(request, **kwargs)
+
+    adapter.send = flaky_send
+    namespace = {
+        "__name__": "esphomerelease.cutting",
+        "util": util_mod,
+        "jobs": [functools.partial(session.get, url)],
+        "retry": RetryPolicy(budget=RetryBudget(), sleep=lambda _: None),
+    }
+    exec(  # pylint: disable=exec-used
+        "def _find_docs_pr_pairs():\n"
+        "    return list(util.iter_asynchronously(jobs, retry=retry))\n",
+        namespace,
+    )
+
+    namespace["_find_docs_pr_pairs"]()
+
+    assert namespace["retry"].retries == 1
+    assert list(accountant.usage("caller")) == ["cutting._find_docs_pr_pairs"]
@@ -0,0 +1,228 @@
+"""Tests for authenticating as a GitHub App installation.
+
+``appauth`` is import-clean. Tokens are minted from a stand-in of GitHub's
+App endpoints served on localhost, which checks the JWT against the App's
+public key and its dates against the test's clock; the key pair is generated
+per test run.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import esphomerelease.github as github_mod
+from esphomerelease.appauth import (
+    InstallationTokenAuth,
+    InstallationTokens,
+    REFRESH_MARGIN,
+)
+from esphomerelease.exceptions import EsphomeReleaseError
+from esphomerelease.transport import pooled_session
+
+APP_ID = 4242
+INSTALLATION_ID = 77
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def private_key_pem(private_key):
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+class StandIn:
+    """GitHub's App endpoints, answering with numbered installation tokens."""
+
+    def __init__(self, public_key):
+        self.public_key = public_key
+        self.requests = []
+        self.expires_at = "2026-10-16T13:00:00Z"
+        self.refuse = False
+        self.clock = time.time
+
+    def answer(self, method, path, authorization):
+        self.requests.append((method, path, authorization))
+        if path == "/rate_limit":
+            return 200, {"resources": {}}
+        scheme, _, credentials = authorization.partition(" ")
+        try:
+            claims = jwt.decode(
+                credentials,
+                self.public_key,
+                algorithms=["RS256"],
+                options={"verify_exp": False, "verify_iat": False},
+            )
+        except jwt.InvalidTokenError:
+            return 401, {"message": "A JSON web token could not be decoded"}
+        now = self.clock()
+        if not claims["iat"] <= now < claims["exp"] <= claims["iat"] + 600:
+            return 401, {"message": "The JWT is not valid at this time"}
+        if scheme != "Bearer" or claims["iss"] != str(APP_ID) or self.refuse:
+            return 401, {"message": "Bad credentials"}
+        if (method, path) == ("GET", "/orgs/esphome/installation"):
+            return 200, {"id": INSTALLATION_ID}
+        mint = f"/app/installations/{INSTALLATION_ID}/access_tokens"
+        if (method, path) == ("POST", mint):
+            minted = sum(1 for request in self.requests if request[0] == "POST")
+            return 201, {"token": f"ghs_{minted}", "expires_at": self.expires_at}
+        return 404, {"message": "Not Found"}
+
+
+@pytest.fixture
+def stand_in(private_key):
+    endpoint = StandIn(private_key.public_key())
+
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            status, body = endpoint.answer(
+                self.command, self.path, self.headers.get("Authorization", "")
+            )
+            content = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = _answer  # pylint: disable=invalid-name
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield endpoint
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# 2026-10-16T12:00:00Z, an hour before the stand-in's tokens expire.
+NOON = 1792152000.0
+
+
+def test_tokens_are_minted_once_and_refreshed_before_they_expire(
+    stand_in, private_key_pem
+):
+    clock = stand_in.clock = FakeClock(NOON)
+    tokens = InstallationTokens(
+        APP_ID, private_key_pem, api_url=stand_in.url, clock=clock
+    )
+
+    assert tokens.token() == "ghs_1"
+    assert tokens.token() == "ghs_1"
+    assert tokens.installation_id == INSTALLATION_ID
+
+    clock.now = NOON + 3600 - REFRESH_MARGIN + 1
+    stand_in.expires_at = "2026-10-16T14:00:00Z"
+    assert tokens.token() == "ghs_2"
+    assert tokens.minted == 2
+    # The installation is only looked up once.
+    assert [request[:2] for request in stand_in.requests] == [
+        ("GET", "/orgs/esphome/installation"),
+        ("POST", f"/app/installations/{INSTALLATION_ID}/access_tokens"),
+        ("POST", f"/app/installations/{INSTALLATION_ID}/access_tokens"),
+    ]
+
+
+def test_requests_carry_the_current_installation_token(stand_in, private_key_pem):
+    stand_in.clock = FakeClock(NOON)
+    tokens = InstallationTokens(
+        APP_ID,
+        private_key_pem,
+        installation_id=INSTALLATION_ID,
+        api_url=stand_in.url,
+        clock=stand_in.clock,
+    )
+    session = pooled_session()
+    session.auth = InstallationTokenAuth(tokens)
+
+    assert session.get(f"{stand_in.url}/rate_limit").status_code == 200
+    assert stand_in.requests[-1] == ("GET", "/rate_limit", "token ghs_1")
+
+
+def test_refused_app_credentials_are_reported(stand_in, private_key_pem):
+    stand_in.refuse = True
+    tokens = InstallationTokens(
+        APP_ID,
+        private_key_pem,
+        installation_id=INSTALLATION_ID,
+        api_url=stand_in.url,
+    )
+
+    with pytest.raises(EsphomeReleaseError, match="401 Bad credentials"):
+        tokens.token()
+
+
+@pytest.fixture
+def app_config(tmp_path, monkeypatch, private_key_pem):
+    key_path = tmp_path / "app.pem"
+    key_path.write_bytes(private_key_pem)
+    monkeypatch.setattr(github_mod, "GITHUB_TOKEN", None)
+    monkeypatch.setattr(github_mod, "GITHUB_APP_TOKENS", None)
+    monkeypatch.setitem(github_mod.CONFIG, "github_app_id", APP_ID)
+    monkeypatch.setitem(github_mod.CONFIG, "github_app_private_key", str(key_path))
+    return key_path
+
+
+class FakeGitHub:
+    """Stand-in for github3.GitHub recording how it was built."""
+
+    def __init__(self, token=None, session=None):
+        self.token = token
+        self.session = session
+
+    def rate_limit(self):
+        return {"rate": {"limit": 12500, "remaining": 12499, "reset": 0}}
+
+
+def test_only_the_org_wide_session_authenticates_as_the_app(
+    app_config, monkeypatch, capsys
+):
+    monkeypatch.setattr(github_mod, "GitHub", FakeGitHub)
+    monkeypatch.setattr(github_mod, "GITHUB_SESSION", None)
+    monkeypatch.setattr(github_mod, "GITHUB_APP_SESSION", None)
+    monkeypatch.setattr(github_mod, "_UNANNOUNCED", None)
+    monkeypatch.setattr(github_mod, "_token_from_gh_cli", lambda: "gho_user")
+
+    app_session = github_mod.get_app_session()
+
+    assert github_mod.get_app_session() is app_session
+    assert app_session.token is None
+    assert app_session.session.auth.tokens is github_mod.get_app_tokens()
+    assert f"GitHub App {APP_ID}: 12499/12500" in capsys.readouterr().out
+
+    # Cuts and publishing still act as the release manager.
+    user_session = github_mod.get_session()
+    assert user_session.token == "gho_user"
+    assert user_session.session.auth is None
+    assert github_mod.get_token() == "gho_user"
+
+
+def test_unreadable_app_key_is_reported(app_config, monkeypatch):
+    monkeypatch.setattr(github_mod, "GITHUB_APP_SESSION", None)
+    app_config.unlink()
+
+    with pytest.raises(EsphomeReleaseError, match="github_app_private_key"):
+        github_mod.get_app_session()
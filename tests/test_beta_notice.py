@@ -207,13 +207,19 @@ class FakePR:
         self.merged_at = number  # merge order follows PR numbers
         self.html_url = f"https://github.com/esphome/esphome/pull/{number}"
         self.user = FakeUser("someone")
+        self.merge_commit_sha = f"sha{number}"
+        self.body = ""
 
 
 class FakeProject:
+    """Serves the fake PRs as the ``PullRecord``s ``Project`` caches."""
+
     shortname = "esphome"
 
     def __init__(self, prs):
-        self._prs = {pr.number: pr for pr in prs}
+        from esphomerelease.model import PullRecord
+
+        self._prs = {pr.number: PullRecord.from_pull(pr) for pr in prs}
 
     def prs_between(self, base, head):
         return list(self._prs)
@@ -221,6 +227,12 @@ class FakeProject:
     def get_pr(self, number):
         return self._prs[number]
 
+    def get_prs(self, numbers):
+        return [self._prs[number] for number in numbers]
+
+    def iter_prs(self, numbers):
+        yield from self.get_prs(numbers)
+
 
 LINE_LABELS = (
     "new-feature",
@@ -262,7 +274,7 @@ def _run_docs_insert_changelog(cutting, monkeypatch, version, base, prs):
         cutting.EsphomeDocsProject, "commit", lambda msg, **k: commits.append(msg)
     )
     monkeypatch.setattr(cutting.EsphomeProject, "prs_between", fake.prs_between)
-    monkeypatch.setattr(cutting.EsphomeProject, "get_pr", fake.get_pr)
+    monkeypatch.setattr(cutting.EsphomeProject, "iter_prs", fake.iter_prs)
     monkeypatch.setattr(cutting, "open_vscode", lambda path: None)
     monkeypatch.setattr(cutting, "confirm", lambda msg: None)
     monkeypatch.setattr(cutting, "gprint", lambda msg, **k: messages.append(msg))
@@ -524,7 +536,7 @@ def test_docs_changes_formats_and_flags(cutting, monkeypatch):
     ]
     fake = FakeProject(prs)
     monkeypatch.setattr(cutting.EsphomeProject, "prs_between", fake.prs_between)
-    monkeypatch.setattr(cutting.EsphomeProject, "get_pr", fake.get_pr)
+    monkeypatch.setattr(cutting.EsphomeProject, "iter_prs", fake.iter_prs)
 
     changes = cutting._docs_changes(
         version=Version.parse("2026.7.0b2"), base=Version.parse("2026.7.0b1")
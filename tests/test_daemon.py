@@ -0,0 +1,213 @@
+"""Tests for running commands in a long-lived daemon over a Unix socket.
+
+``daemon`` is import-clean: the daemon is served from a thread with a fake
+command runner, and ``forward`` is the real client. Which commands the CLI
+hands to the daemon is checked against ``commands``, imported with the
+import-safe reload pattern used elsewhere in this repo.
+"""
+
+import importlib
+import io
+import json
+import os
+import threading
+import time
+
+import click
+import pytest
+
+from esphomerelease.daemon import CommandDaemon, forward
+from esphomerelease.exceptions import EsphomeReleaseError
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def serve(run, accepts=lambda argv: None, **kwargs):
+        path = tmp_path / "daemon.sock"
+        daemon = CommandDaemon(run, accepts, cwd=str(tmp_path), **kwargs)
+        server = daemon.listen(path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return daemon, path
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_output_is_streamed_and_the_exit_code_returned(serve, tmp_path):
+    calls = []
+
+    def run(argv, color):
+        calls.append((argv, color))
+        print("3 PR(s) on milestone")
+        click.secho("warning", fg="yellow", err=True, color=color)
+        return 2
+
+    before = []
+    daemon, path = serve(run, before_command=lambda: before.append(True))
+
+    out, err = io.StringIO(), io.StringIO()
+    for _ in range(2):
+        exit_code = forward(
+            path,
+            ["next-beta-prs"],
+            cwd=str(tmp_path),
+            color=True,
+            stdout=out,
+            stderr=err,
+        )
+        assert exit_code == 2
+
+    assert calls == [(["next-beta-prs"], True)] * 2
+    assert daemon.commands == 2 and len(before) == 2
+    assert out.getvalue() == "3 PR(s) on milestone\n" * 2
+    assert err.getvalue() == (click.style("warning", fg="yellow") + "\n") * 2
+
+
+def test_declined_commands_are_left_to_the_caller(serve, tmp_path):
+    calls = []
+    _, path = serve(
+        lambda argv, color: calls.append(argv) or 0,
+        accepts=lambda argv: None if argv == ["next-beta-prs"] else "not here",
+    )
+
+    assert forward(path, ["cut", "b"], cwd=str(tmp_path)) is None
+    # config.json paths are relative to the daemon's working directory.
+    assert forward(path, ["next-beta-prs"], cwd="/") is None
+    assert calls == []
+
+
+def test_commands_that_ask_for_input_are_declined(serve, tmp_path):
+    def run(argv, color):
+        return int(click.prompt("Please enter base version", default="2026.7.0"))
+
+    _, path = serve(run)
+
+    out = io.StringIO()
+    assert forward(path, ["release-notes"], cwd=str(tmp_path), stdout=out) is None
+    assert "Please enter base version" in out.getvalue()
+
+
+def test_a_busy_daemon_is_not_waited_for(serve, tmp_path, monkeypatch):
+    monkeypatch.setattr("esphomerelease.daemon.ACCEPT_TIMEOUT", 0.2)
+    release = threading.Event()
+    calls = []
+
+    def run(argv, color):
+        calls.append(argv)
+        release.wait(5)
+        return 0
+
+    daemon, path = serve(run)
+    cut = threading.Thread(
+        target=forward,
+        args=(path, ["cut", "b"]),
+        kwargs={"cwd": str(tmp_path), "stdout": io.StringIO()},
+    )
+    cut.start()
+    while not calls:
+        time.sleep(0.01)
+
+    # Even --help must not queue behind a long cut; it runs in-process.
+    assert forward(path, ["--help"], cwd=str(tmp_path)) is None
+    release.set()
+    cut.join()
+
+    # The abandoned request is dropped, not run for nobody.
+    assert forward(path, ["next-beta-prs"], cwd=str(tmp_path)) == 0
+    assert calls == [["cut", "b"], ["next-beta-prs"]]
+    assert daemon.commands == 2
+
+
+def test_no_daemon_means_running_in_process(tmp_path):
+    assert forward(tmp_path / "daemon.sock", ["next-beta-prs"]) is None
+
+
+def test_only_one_daemon_listens_on_a_socket(serve, tmp_path):
+    _, path = serve(lambda argv, color: 0)
+
+    with pytest.raises(EsphomeReleaseError, match="already listening"):
+        CommandDaemon(lambda argv, color: 0, lambda argv: None).listen(path)
+    assert os.stat(path).st_mode & 0o077 == 0
+
+
+@pytest.fixture
+def commands(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(repo_dir),
+        "esphome_io_path": str(repo_dir),
+        "esphome_hassio_path": str(repo_dir),
+        "esphome_issues_path": str(repo_dir),
+        "esphome_feature_requests_path": str(repo_dir),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project_mod
+
+    importlib.reload(project_mod)
+    import esphomerelease.cutting as cutting_mod
+
+    importlib.reload(cutting_mod)
+    import esphomerelease.commands as commands_mod
+
+    importlib.reload(commands_mod)
+    return commands_mod
+
+
+@pytest.mark.parametrize(
+    "argv, declined",
+    [
+        (["next-beta-prs", "2026.8.0"], False),
+        (
+            [
+                "--request-budget",
+                "50",
+                "release-notes",
+                "--base-ref",
+                "2026.7.0",
+                "--head-ref",
+                "beta",
+                "--head-version",
+                "2026.8.0b1",
+            ],
+            False,
+        ),
+        # Would prompt for the head ref and version.
+        (["release-notes", "--base-ref", "2026.7.0"], True),
+        (["cut", "b"], True),
+        (["--webhook-port", "8765", "next-beta-prs"], True),
+        (["--help"], True),
+        ([], True),
+    ],
+)
+def test_daemon_runs_only_commands_without_a_terminal(commands, argv, declined):
+    # pylint: disable=protected-access
+    assert (commands._daemon_declines(argv) is not None) == declined
+
+
+def test_prompting_release_notes_are_declined_before_running(commands):
+    # pylint: disable=protected-access
+    assert commands._daemon_declines(["release-notes", "--head-ref", "dev"]) == (
+        "release-notes would prompt for --base-ref, --head-version"
+    )
+
+
+def test_commands_run_in_the_daemon_start_from_fresh_caches(commands):
+    proj = commands.EsphomeProject
+    proj.pr_cache[1] = object()
+
+    commands._before_daemon_command()  # pylint: disable=protected-access
+
+    assert 1 not in proj.pr_cache
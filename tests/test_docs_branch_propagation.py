@@ -181,6 +181,7 @@ def _stub_cut_helpers(cutting, monkeypatch, order):
     from esphomerelease.model import Version
 
     for name in (
+        "_warm_up_github",
         "_check_open_milestone_prs",
         "_check_linked_docs_prs",
         "_docs_insert_changelog",
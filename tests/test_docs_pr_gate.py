@@ -81,18 +81,54 @@ def _docs_body(code_number: int) -> str:
     )
 
 
-class FakeLabel:
-    def __init__(self, name: str):
-        self.name = name
-
+def _code_pr(
+    number: int,
+    *,
+    body: str = "",
+    title: str = "title",
+    merged_at: str = "2026-07-01T00:00:00Z",
+    labels: Optional[List[str]] = None,
+) -> dict:
+    """A merged code PR as GraphQL ``milestone.pullRequests`` lists it."""
+    return {
+        "number": number,
+        "title": title,
+        "body": body,
+        "url": f"https://github.com/esphome/esphome/pull/{number}",
+        "state": "MERGED",
+        "mergedAt": merged_at,
+        "updatedAt": merged_at,
+        "mergeCommit": {"oid": f"sha{number}"},
+        "author": None,
+        "labels": {"nodes": [{"name": name} for name in labels or []]},
+        "milestone": {"number": MILESTONE.number, "title": MILESTONE.title},
+    }
 
-class FakeIssue:
-    """A merged PR as it appears in the milestone issue listing."""
 
-    def __init__(self, number: int, labels: Optional[List[str]] = None):
-        self.number = number
-        self.original_labels = [FakeLabel(name) for name in labels or []]
-        self.pull_request_urls = {"merged_at": "2026-07-01T00:00:00Z"}
+class FakeGraphQLSession:
+    """Answers the milestone PR query with one page of ``nodes``."""
+
+    def __init__(self, nodes: List[dict]):
+        self.nodes = nodes
+        self.milestone_queries = 0
+
+    def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+        self.milestone_queries += 1
+        states = json["variables"]["states"]
+        nodes = [node for node in self.nodes if node["state"] in states]
+        payload = {
+            "data": {
+                "repository": {
+                    "milestone": {
+                        "pullRequests": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": None},
+                            "nodes": nodes,
+                        }
+                    }
+                }
+            }
+        }
+        return types.SimpleNamespace(status_code=200, json=lambda: payload)
 
 
 class FakePull:
@@ -109,7 +145,13 @@ class FakePull:
         self.title = title
         self.body = body
         self.merged_at = merged_at
+        self.merge_commit_sha = f"sha{number}" if merged_at else None
         self.html_url = f"https://github.com/esphome/{repo}/pull/{number}"
+        self.labels = []
+        self.milestone = None
+        self.user = types.SimpleNamespace(
+            login="bob", html_url="https://github.com/bob"
+        )
 
 
 class FakeRepo:
@@ -117,23 +159,18 @@ class FakeRepo:
         self,
         *,
         milestones: Optional[list] = None,
-        closed_issues: Optional[List[FakeIssue]] = None,
+        milestone_pulls: Optional[List[dict]] = None,
         pulls: Optional[dict] = None,
     ):
         self._milestones = milestones or []
-        self._closed_issues = closed_issues or []
+        self.session = FakeGraphQLSession(milestone_pulls or [])
         self._pulls = pulls or {}
         self.pull_request_calls: List[int] = []
-        self.issues_calls: List[tuple] = []
 
     def milestones(self, state: str) -> list:
         assert state == "open"
         return self._milestones
 
-    def issues(self, *, milestone: int, state: str) -> List[FakeIssue]:
-        self.issues_calls.append((milestone, state))
-        return self._closed_issues
-
     def pull_request(self, number: int) -> FakePull:
         self.pull_request_calls.append(number)
         return self._pulls[number]
@@ -163,7 +200,7 @@ def test_no_cycle_milestone_passes_without_touching_repos(modules, monkeypatch,
 
     cutting._check_linked_docs_prs(VERSION)
 
-    assert code_repo.issues_calls == []
+    assert code_repo.session.milestone_queries == 0
     assert docs_repo.pull_request_calls == []
 
 
@@ -175,14 +212,9 @@ def test_code_prs_without_docs_links_pass_without_docs_lookups(
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(100)],
-        pulls={
-            100: FakePull(
-                100,
-                merged_at=datetime(2026, 7, 1),
-                body="- esphome/esphome.io#<esphome.io PR number goes here>",
-            )
-        },
+        milestone_pulls=[
+            _code_pr(100, body="- esphome/esphome.io#<esphome.io PR number goes here>")
+        ],
     )
     docs_repo = FakeRepo()
     _wire(cutting, code_repo=code_repo, docs_repo=docs_repo)
@@ -190,7 +222,7 @@ def test_code_prs_without_docs_links_pass_without_docs_lookups(
 
     cutting._check_linked_docs_prs(VERSION)
 
-    assert code_repo.pull_request_calls == [100]
+    assert code_repo.pull_request_calls == []
     assert docs_repo.pull_request_calls == []
 
 
@@ -199,10 +231,7 @@ def test_merged_docs_pr_passes(modules, monkeypatch, capsys):
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(100)],
-        pulls={
-            100: FakePull(100, merged_at=datetime(2026, 7, 1), body=_back_link(7071))
-        },
+        milestone_pulls=[_code_pr(100, body=_back_link(7071))],
     )
     docs_repo = FakeRepo(
         pulls={
@@ -229,8 +258,9 @@ def test_cherry_picked_code_prs_are_not_rechecked(modules, monkeypatch, capsys):
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(100, labels=["cherry-picked"])],
-        pulls={100: FakePull(100, body=_back_link(7071))},
+        milestone_pulls=[
+            _code_pr(100, body=_back_link(7071), labels=["cherry-picked"])
+        ],
     )
     docs_repo = FakeRepo()
     _wire(cutting, code_repo=code_repo, docs_repo=docs_repo)
@@ -248,12 +278,7 @@ def test_one_way_reference_is_reported_but_does_not_block(modules, monkeypatch,
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(14255)],
-        pulls={
-            14255: FakePull(
-                14255, merged_at=datetime(2026, 7, 1), body=_back_link(6676)
-            )
-        },
+        milestone_pulls=[_code_pr(14255, body=_back_link(6676))],
     )
     docs_repo = FakeRepo(
         pulls={
@@ -278,19 +303,13 @@ def test_one_way_reference_is_reported_but_does_not_block(modules, monkeypatch,
 
 def test_unmerged_docs_pr_blocks_then_passes_on_recheck(modules, monkeypatch, capsys):
     """The gate blocks, the user merges the docs PR and answers "Check again?",
-    and the retry re-fetches (caches cleared) and clears."""
+    and the retry re-fetches the docs PR and clears."""
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(17797)],
-        pulls={
-            17797: FakePull(
-                17797,
-                title="Arbitrate the default route",
-                merged_at=datetime(2026, 7, 1),
-                body=_back_link(7071),
-            )
-        },
+        milestone_pulls=[
+            _code_pr(17797, title="Arbitrate the default route", body=_back_link(7071))
+        ],
     )
     docs_pull = FakePull(
         7071,
@@ -314,8 +333,8 @@ def test_unmerged_docs_pr_blocks_then_passes_on_recheck(modules, monkeypatch, ca
     cutting._check_linked_docs_prs(VERSION)
 
     assert len(prompts) == 1 and "Check again?" in prompts[0]
-    # Both passes re-fetched instead of reusing the stale cached payloads.
-    assert code_repo.pull_request_calls == [17797, 17797]
+    # Both passes asked GitHub instead of reusing the stale cached payloads.
+    assert code_repo.session.milestone_queries == 2
     assert docs_repo.pull_request_calls == [7071, 7071]
 
     out = capsys.readouterr().out
@@ -324,16 +343,115 @@ def test_unmerged_docs_pr_blocks_then_passes_on_recheck(modules, monkeypatch, ca
     assert "needs docs#7071: Document default-route arbitration" in out
 
 
-def test_unmerged_docs_pr_declining_recheck_aborts(modules, monkeypatch, capsys):
+def test_recheck_only_fetches_what_can_have_changed(modules, monkeypatch, capsys):
+    """The second pass lists the milestone's update stamps only, leaves the
+    unchanged code PRs and the already merged docs PR alone, and fetches
+    just the docs PR that was still open."""
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(17797)],
+        milestone_pulls=[
+            _code_pr(17797, body=_back_link(7071)),
+            _code_pr(14255, merged_at="2026-07-02T00:00:00Z", body=_back_link(6676)),
+        ],
+    )
+    open_docs = FakePull(7071, body=_docs_body(17797), repo="esphome.io")
+    docs_repo = FakeRepo(
         pulls={
-            17797: FakePull(
-                17797, merged_at=datetime(2026, 7, 1), body=_back_link(7071)
-            )
-        },
+            7071: open_docs,
+            6676: FakePull(
+                6676,
+                body=_docs_body(14255),
+                merged_at=datetime(2026, 7, 2),
+                repo="esphome.io",
+            ),
+        }
+    )
+    _wire(cutting, code_repo=code_repo, docs_repo=docs_repo)
+
+    def confirm(text, **kwargs):
+        open_docs.merged_at = datetime(2026, 7, 3)
+        return True
+
+    monkeypatch.setattr(click, "confirm", confirm)
+
+    cutting._check_linked_docs_prs(VERSION)
+
+    assert code_repo.session.milestone_queries == 2
+    assert code_repo.pull_request_calls == []
+    assert sorted(docs_repo.pull_request_calls[:2]) == [6676, 7071]
+    assert docs_repo.pull_request_calls[2:] == [7071]
+
+
+def test_webhooks_recheck_on_deliveries_instead_of_prompting(
+    modules, monkeypatch, capsys
+):
+    """With --webhook-port the gate waits for deliveries and rechecks from the
+    caches: no prompt, no second milestone listing, no docs PR refetch."""
+    from esphomerelease.webhooks import WebhookReceiver
+
+    cutting = modules
+    code_repo = FakeRepo(
+        milestones=[MILESTONE],
+        milestone_pulls=[_code_pr(17797, body=_back_link(7071))],
+    )
+    docs_repo = FakeRepo(
+        pulls={7071: FakePull(7071, body=_docs_body(17797), repo="esphome.io")}
+    )
+    _wire(cutting, code_repo=code_repo, docs_repo=docs_repo)
+    _no_confirm(monkeypatch)
+    merged_docs = {
+        "number": 7071,
+        "title": "title",
+        "html_url": "https://github.com/esphome/esphome.io/pull/7071",
+        "body": _docs_body(17797),
+        "state": "closed",
+        "labels": [],
+        "milestone": None,
+        "merged_at": "2026-07-03T00:00:00Z",
+        "merge_commit_sha": "sha7071",
+        "updated_at": "2026-07-03T00:00:00Z",
+        "user": {"login": "bob", "html_url": "https://github.com/bob"},
+    }
+    deliveries = [
+        # Wakes the gate without changing what it reports.
+        ("label", {"action": "created", "label": {"name": "x"}}),
+        ("pull_request", {"action": "closed", "pull_request": merged_docs}),
+    ]
+
+    class DeliveringReceiver(WebhookReceiver):
+        """Applies the next recorded delivery whenever the gate waits."""
+
+        waits = 0
+
+        def wait(self, applied, timeout=None):
+            self.waits += 1
+            event, payload = deliveries.pop(0)
+            repo = "esphome.io" if event == "pull_request" else "esphome"
+            payload = {"repository": {"full_name": f"esphome/{repo}"}, **payload}
+            self.apply(event, payload)
+            return super().wait(applied, timeout)
+
+    projects = [cutting.EsphomeProject, cutting.EsphomeDocsProject]
+    receiver = DeliveringReceiver(projects)
+    for proj in projects:
+        proj.follow_webhooks(receiver)
+
+    cutting._check_linked_docs_prs(VERSION)
+
+    assert receiver.waits == 2
+    assert code_repo.session.milestone_queries == 1
+    assert docs_repo.pull_request_calls == [7071]
+    out = capsys.readouterr().out
+    assert out.count("1 unmerged docs PR(s)") == 1
+    assert out.count("Waiting for GitHub webhook deliveries") == 1
+
+
+def test_unmerged_docs_pr_declining_recheck_aborts(modules, monkeypatch, capsys):
+    cutting = modules
+    code_repo = FakeRepo(
+        milestones=[MILESTONE],
+        milestone_pulls=[_code_pr(17797, body=_back_link(7071))],
     )
     docs_repo = FakeRepo(
         pulls={7071: FakePull(7071, body=_docs_body(17797), repo="esphome.io")}
@@ -350,15 +468,10 @@ def test_blocking_and_unconfirmed_reported_together(modules, monkeypatch, capsys
     cutting = modules
     code_repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(17797), FakeIssue(14255)],
-        pulls={
-            17797: FakePull(
-                17797, merged_at=datetime(2026, 7, 1), body=_back_link(7071)
-            ),
-            14255: FakePull(
-                14255, merged_at=datetime(2026, 7, 2), body=_back_link(6676)
-            ),
-        },
+        milestone_pulls=[
+            _code_pr(17797, body=_back_link(7071)),
+            _code_pr(14255, merged_at="2026-07-02T00:00:00Z", body=_back_link(6676)),
+        ],
     )
     docs_repo = FakeRepo(
         pulls={
@@ -380,6 +493,7 @@ def test_blocking_and_unconfirmed_reported_together(modules, monkeypatch, capsys
 def _stub_cut(cutting, monkeypatch, order: list) -> None:
     """Neutralise every heavy cut helper, recording the pre-flight ordering."""
     for name in (
+        "_warm_up_github",
         "_check_open_milestone_prs",
         "_docs_insert_changelog",
         "_docs_update_supporters",
@@ -388,11 +502,16 @@ def _stub_cut(cutting, monkeypatch, order: list) -> None:
         "_ensure_cycle_milestone",
         "_close_cycle_milestone",
         "_mark_cherry_picked",
-        "_strategy_cherry_pick",
         "propagate_docs_current_branch",
     ):
         monkeypatch.setattr(cutting, name, lambda *a, **k: [])
 
+    def strategy(*args, **kwargs):
+        order.append(("cut", None))
+        return []
+
+    monkeypatch.setattr(cutting, "_strategy_cherry_pick", strategy)
+
     monkeypatch.setattr(
         cutting, "_prompt_base_version", lambda *a, **k: Version.parse("2026.6.0")
     )
@@ -411,10 +530,9 @@ def _stub_cut(cutting, monkeypatch, order: list) -> None:
         ("cut_release", "2026.7.1"),
     ],
 )
-def test_cut_checks_docs_prs_before_touching_local_copies(
-    modules, monkeypatch, cut, version_str
-):
-    """Both entry points gate on docs PRs before any local repo is touched."""
+def test_cut_checks_docs_prs_before_cutting(modules, monkeypatch, cut, version_str):
+    """Both entry points gate on docs PRs once the local copies are synced
+    (while GitHub warms up), before anything is cut."""
     cutting = modules
     order = []
     _stub_cut(cutting, monkeypatch, order)
@@ -422,4 +540,4 @@ def test_cut_checks_docs_prs_before_touching_local_copies(
     version = Version.parse(version_str)
     getattr(cutting, cut)(version)
 
-    assert order == [("check", version), ("update", None)]
+    assert order == [("update", None), ("check", version), ("cut", None), ("cut", None)]
@@ -7,13 +7,18 @@ modules are importable, mirroring the import-safe reload pattern used
 elsewhere in this repo.
 """
 
+import functools
 import importlib
 import json
+import sys
 import types
 
 import pytest
+import requests
 from github3.exceptions import NotFoundError
 
+from esphomerelease.retry import MAX_ATTEMPTS, RetryBudget, RetryPolicy
+
 
 @pytest.fixture
 def docs_mod(tmp_path, monkeypatch):
@@ -60,15 +65,17 @@ class FakeContributor:
 
 
 class FakeRepo:
-    def __init__(self, contributors: list[FakeContributor], *, fail: bool = False):
+    def __init__(
+        self, contributors: list[FakeContributor], *, fail: Exception = None
+    ):
         self._contributors = contributors
         self._fail = fail
         self.contributor_calls = 0
 
     def contributors(self):
         self.contributor_calls += 1
-        if self._fail:
-            raise RuntimeError("boom")
+        if self._fail is not None:
+            raise self._fail
         return list(self._contributors)
 
 
@@ -131,7 +138,7 @@ def test_gen_supporters_end_to_end(docs_mod, tmp_path, capsys):
         },
         users={"alice": "Alice A", "bob": None},
     )
-    docs_mod.get_session = lambda: session
+    docs_mod.get_app_session = lambda: session
 
     docs_mod.gen_supporters()
 
@@ -172,7 +179,7 @@ def test_gen_supporters_missing_cache_file_starts_empty(docs_mod, tmp_path):
         repos={"esphome": FakeRepo([FakeContributor("alice", 1)])},
         users={"alice": "Alice A"},
     )
-    docs_mod.get_session = lambda: session
+    docs_mod.get_app_session = lambda: session
 
     docs_mod.gen_supporters()
 
@@ -180,15 +187,49 @@ def test_gen_supporters_missing_cache_file_starts_empty(docs_mod, tmp_path):
     assert cache == {"1": {"login": "alice", "name": "Alice A"}}
 
 
-def test_get_repo_contribs_retries_then_reports(docs_mod, capsys):
-    """A repo that keeps failing is retried MAX_RETRIES times, reported, and
-    contributes nothing."""
-    failing = FakeRepo([], fail=True)
-    session = FakeSession(repos={"esphome": failing}, users={})
+def test_gen_supporters_retries_a_failing_repo_then_fails(
+    docs_mod, tmp_path, monkeypatch
+):
+    """A repo that keeps failing transiently is retried with backoff by the
+    job list, then fails the run before anything is written."""
+    (tmp_path / "supporters.template.md").write_text("TEMPLATE_CONTRIBUTIONS\n")
+    sleeps = []
+    monkeypatch.setattr(
+        sys.modules["esphomerelease.util"],
+        "RetryPolicy",
+        functools.partial(
+            RetryPolicy,
+            budget=RetryBudget(),
+            sleep=sleeps.append,
+            jitter=lambda: 1.0,
+        ),
+    )
+    failing = FakeRepo([], fail=requests.ConnectionError("boom"))
+    docs_mod.get_app_session = lambda: FakeSession(repos={"esphome": failing}, users={})
+
+    with pytest.raises(requests.ConnectionError, match="boom"):
+        docs_mod.gen_supporters()
+    assert failing.contributor_calls == MAX_ATTEMPTS
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert not (tmp_path / docs_mod.USERS_CACHE_FILE).exists()
+
 
-    assert docs_mod.get_repo_contribs(session, "esphome") == []
-    assert failing.contributor_calls == docs_mod.MAX_RETRIES
-    assert "Error getting contributors from esphome: boom" in capsys.readouterr().out
+def test_permanent_errors_are_reported_and_the_run_goes_on(
+    docs_mod, tmp_path, capsys
+):
+    (tmp_path / "supporters.template.md").write_text("TEMPLATE_CONTRIBUTIONS\n")
+    failing = FakeRepo([], fail=RuntimeError("boom"))
+    working = FakeRepo([FakeContributor("alice", 1)])
+    docs_mod.get_app_session = lambda: FakeSession(
+        repos={"broken": failing, "esphome": working}, users={"alice": "Alice A"}
+    )
+
+    docs_mod.gen_supporters()
+
+    assert failing.contributor_calls == 1
+    assert "Error getting contributors from broken: boom" in capsys.readouterr().out
+    cache = json.loads((tmp_path / docs_mod.USERS_CACHE_FILE).read_text())
+    assert cache == {"1": {"login": "alice", "name": "Alice A"}}
 
 
 def test_get_repo_contribs_filters_bots(docs_mod):
@@ -9,6 +9,8 @@ Only the ``subprocess`` boundary is faked here: the resolution helpers
 themselves run for real, including every failure path.
 """
 
+import importlib
+import json
 import subprocess
 
 import pytest
@@ -29,6 +31,7 @@ def reset_globals(monkeypatch):
     """Clear the process-lifetime caches so each test resolves afresh."""
     monkeypatch.setattr(github_mod, "GITHUB_TOKEN", None)
     monkeypatch.setattr(github_mod, "GITHUB_SESSION", None)
+    monkeypatch.setattr(github_mod, "_UNANNOUNCED", None)
     monkeypatch.delitem(github_mod.CONFIG, "github_token", raising=False)
 
 
@@ -173,6 +176,9 @@ class FakeGitHub:
     def rate_limit(self):
         return {"rate": {"limit": 5000, "remaining": 4999, "reset": 0}}
 
+    def repository(self, owner, name):
+        return (owner, name)
+
 
 def test_get_session_uses_gh_token(gh_calls, monkeypatch, capsys):
     """The session is built with the resolved token and then cached."""
@@ -189,3 +195,84 @@ def test_get_session_uses_gh_token(gh_calls, monkeypatch, capsys):
     assert github_mod.get_session() is session
     assert len(FakeGitHub.instances) == 1
     assert len(calls) == 1
+
+
+@pytest.fixture
+def fake_project(tmp_path, monkeypatch):
+    """A ``Project`` whose listings only load its ``repo`` and record the call.
+
+    ``project`` instantiates every ``Project`` at import time, so it is
+    imported against a temp ``config.json`` (the reload pattern used
+    elsewhere in this repo).
+    """
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(tmp_path),
+        "esphome_io_path": str(tmp_path),
+        "esphome_hassio_path": str(tmp_path),
+        "esphome_issues_path": str(tmp_path),
+        "esphome_feature_requests_path": str(tmp_path),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project_mod
+
+    importlib.reload(project_mod)
+
+    class FakeProject(project_mod.Project):
+        def __init__(self):
+            super().__init__(path=str(tmp_path), shortname="esphome", repo_name="esphome")
+            self.calls = []
+
+        def get_open_milestones(self):
+            assert self.repo == ("esphome", "esphome")
+            self.calls.append("milestones")
+
+        def latest_release(self, *, include_prereleases=True):
+            assert self.repo == ("esphome", "esphome")
+            self.calls.append("latest_release")
+
+    return FakeProject
+
+
+def test_warm_up_prepares_session_and_listings_in_background(
+    gh_calls, fake_project, monkeypatch, capsys
+):
+    """The foreground finds the warmed session and announces its rate limit once."""
+    _, results = gh_calls
+    results.append(FakeCompletedProcess(stdout="gho_fromcli\n"))
+    FakeGitHub.instances = []
+    monkeypatch.setattr(github_mod, "GitHub", FakeGitHub)
+    projects = [fake_project(), fake_project()]
+
+    calls = []
+    github_mod.warm_up(projects, [lambda: calls.append(len(projects[0].calls))]).join()
+
+    # The foreground's first call is made before the listings.
+    assert calls == [0]
+    assert [proj.calls for proj in projects] == [["milestones", "latest_release"]] * 2
+    assert capsys.readouterr().out == ""
+
+    session = github_mod.get_session()
+    assert session is FakeGitHub.instances[0]
+    assert "4999/5000 rate limit remaining" in capsys.readouterr().out
+    github_mod.get_session()
+    assert capsys.readouterr().out == ""
+    assert len(FakeGitHub.instances) == 1
+
+
+def test_warm_up_failure_is_reported_by_the_foreground(gh_calls, fake_project):
+    _, results = gh_calls
+    results.append(FakeCompletedProcess(returncode=1, stderr="not logged in"))
+    results.append(FakeCompletedProcess(returncode=1, stderr="not logged in"))
+    project = fake_project()
+
+    github_mod.warm_up([project]).join()
+
+    assert project.calls == []
+    with pytest.raises(EsphomeReleaseError, match="not logged in"):
+        github_mod.get_session()
@@ -0,0 +1,139 @@
+"""Tests for the adaptive GitHub concurrency governor.
+
+``governor`` is import-clean and duck-types responses, so hand-rolled response
+objects and a fake clock drive it directly. The session-level retry is
+exercised through the real ``ReleaseSession`` with a fake ``requests`` adapter,
+as in ``test_transport``.
+"""
+
+import requests
+from github3.exceptions import error_for
+from requests.adapters import BaseAdapter
+
+from esphomerelease.governor import ConcurrencyGovernor, secondary_rate_limit_delay
+from esphomerelease.retry import transient_delay
+from esphomerelease.transport import ReleaseSession
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fast_responses_grow_the_limit_additively():
+    governor = ConcurrencyGovernor(initial=2, maximum=4, clock=FakeClock())
+
+    for _ in range(2):
+        governor.observe(FakeResponse(), 0.1)
+    assert governor.limit == 3
+    for _ in range(3):
+        governor.observe(FakeResponse(), 0.1)
+    assert governor.limit == 4
+    for _ in range(10):
+        governor.observe(FakeResponse(), 0.1)
+    assert governor.limit == governor.peak == 4
+
+
+def test_slow_response_gives_a_slot_back():
+    governor = ConcurrencyGovernor(initial=5, clock=FakeClock())
+    governor.observe(FakeResponse(), 0.1)
+
+    governor.observe(FakeResponse(), 1.0)
+
+    assert governor.limit == 4
+
+
+def test_secondary_rate_limit_halves_and_pauses():
+    clock = FakeClock()
+    governor = ConcurrencyGovernor(initial=8, clock=clock)
+
+    delay = governor.observe(FakeResponse(403, {"Retry-After": "30"}), 0.1)
+
+    assert delay == 30
+    assert governor.limit == 4
+    assert governor.backoffs == 1
+    assert governor._paused_until == clock.now + 30
+    assert "1 rate limit back-off(s)" in governor.summary()
+
+
+def test_low_primary_quota_runs_one_at_a_time():
+    governor = ConcurrencyGovernor(initial=8, reserve=100, clock=FakeClock())
+
+    governor.observe(FakeResponse(headers={"X-RateLimit-Remaining": "99"}), 0.1)
+
+    assert governor.limit == 1
+
+
+def test_permission_403_is_not_a_rate_limit():
+    assert secondary_rate_limit_delay(FakeResponse(403, text="Resource not accessible")) is None
+    assert secondary_rate_limit_delay(FakeResponse(404)) is None
+    assert secondary_rate_limit_delay(FakeResponse(429)) == 60
+    assert (
+        secondary_rate_limit_delay(
+            FakeResponse(403, text="You have exceeded a secondary rate limit.")
+        )
+        == 60
+    )
+
+
+class RateLimitedAdapter(BaseAdapter):
+    """Refuses the first ``refusals`` requests with a secondary rate limit."""
+
+    def __init__(self, refusals):
+        super().__init__()
+        self.refusals = refusals
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if self.sent <= self.refusals:
+            response.status_code = 403
+            response.headers["Retry-After"] = "0"
+            response._content = b'{"message": "secondary rate limit"}'
+        else:
+            response.status_code = 200
+            response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+def test_session_retries_after_secondary_rate_limit():
+    governor = ConcurrencyGovernor()
+    session = ReleaseSession(governor=governor)
+    adapter = RateLimitedAdapter(refusals=2)
+    session.mount("https://", adapter)
+
+    response = session.post("https://api.github.com/repos/esphome/esphome/labels")
+
+    assert response.status_code == 200
+    assert adapter.sent == 3
+    assert governor.requests == 3
+    assert governor.backoffs == 2
+
+
+def test_session_gives_up_after_max_retries():
+    session = ReleaseSession(governor=ConcurrencyGovernor())
+    adapter = RateLimitedAdapter(refusals=100)
+    session.mount("https://", adapter)
+
+    response = session.get("https://api.github.com/rate_limit")
+
+    assert response.status_code == 403
+    assert adapter.sent == 4
+    # Job-level retries leave a rate limit the session gave up on alone.
+    assert transient_delay(error_for(response)) is None
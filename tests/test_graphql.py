@@ -0,0 +1,250 @@
+"""Tests for the batched GraphQL PR hydration.
+
+``graphql`` is import-clean, so the query building and payload parsing run
+without a configured working copy. The ``project_mod`` fixture is only needed
+for the ``Project.get_prs`` wiring and uses the same temp ``config.json`` reload
+pattern as the other ``project`` tests. The session is a hand-rolled fake that
+records every document it is sent.
+"""
+
+import importlib
+import json
+import re
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from esphomerelease import graphql
+
+
+def _node(number: int, **overrides) -> dict:
+    node = {
+        "number": number,
+        "title": f"PR {number}",
+        "body": f"body {number}",
+        "url": f"https://github.com/esphome/esphome/pull/{number}",
+        "state": "MERGED",
+        "mergedAt": "2026-07-01T12:30:00Z",
+        "updatedAt": "2026-07-02T08:00:00Z",
+        "mergeCommit": {"oid": f"sha{number}"},
+        "author": {"__typename": "User", "login": "alice", "url": "https://github.com/alice"},
+        "labels": {"nodes": [{"name": "new-feature"}]},
+        "milestone": {"number": 5, "title": "2026.7.0"},
+    }
+    node.update(overrides)
+    return node
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class FakeSession:
+    """Answers each aliased ``prN`` lookup from ``nodes`` (missing -> null)."""
+
+    def __init__(self, nodes: dict):
+        self.nodes = nodes
+        self.queries = []
+
+    def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+        assert url == graphql.GRAPHQL_URL
+        self.queries.append(json)
+        numbers = [int(n) for n in re.findall(r"pullRequest\(number: (\d+)\)", json["query"])]
+        repository = {f"pr{n}": self.nodes.get(n) for n in numbers}
+        errors = [
+            {"type": "NOT_FOUND", "message": f"Could not resolve #{n}"}
+            for n in numbers
+            if n not in self.nodes
+        ]
+        payload = {"data": {"repository": repository}}
+        if errors:
+            payload["errors"] = errors
+        return FakeResponse(payload)
+
+
+def test_node_is_shaped_like_a_github3_pull():
+    pull = graphql.GraphQLPullRequest(_node(7))
+
+    assert pull.number == 7
+    assert pull.labels == [{"name": "new-feature"}]
+    assert pull.milestone["title"] == "2026.7.0"
+    assert pull.merged_at == datetime(2026, 7, 1, 12, 30, tzinfo=timezone.utc)
+    assert pull.merge_commit_sha == "sha7"
+    assert pull.user.login == "alice"
+    assert pull.user.html_url == "https://github.com/alice"
+    assert pull.state == "closed"
+
+
+def test_unmerged_pr_without_milestone_or_author():
+    pull = graphql.GraphQLPullRequest(
+        _node(8, state="OPEN", mergedAt=None, mergeCommit=None, milestone=None, author=None)
+    )
+
+    assert pull.merged_at is None
+    assert pull.merge_commit_sha is None
+    assert pull.milestone is None
+    assert pull.user.login == "ghost"
+    assert pull.state == "open"
+
+
+def test_bot_author_keeps_rest_login_suffix():
+    pull = graphql.GraphQLPullRequest(
+        _node(
+            9,
+            author={
+                "__typename": "Bot",
+                "login": "dependabot",
+                "url": "https://github.com/apps/dependabot",
+            },
+        )
+    )
+    assert pull.user.login == "dependabot[bot]"
+
+
+def test_batch_skips_numbers_that_are_not_prs():
+    session = FakeSession({1: _node(1), 3: _node(3)})
+
+    result = graphql.fetch_pull_request_batch(session, "esphome", "esphome", [1, 2, 3])
+
+    assert sorted(result) == [1, 3]
+    assert len(session.queries) == 1
+    assert session.queries[0]["variables"] == {"owner": "esphome", "name": "esphome"}
+
+
+def test_batch_size_is_capped():
+    with pytest.raises(ValueError):
+        graphql.fetch_pull_request_batch(
+            FakeSession({}), "esphome", "esphome", list(range(101))
+        )
+
+
+def test_other_errors_fail_the_request():
+    class ErrorSession:
+        def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+            return FakeResponse({"errors": [{"type": "RATE_LIMITED", "message": "slow down"}]})
+
+    with pytest.raises(graphql.GraphQLError, match="slow down"):
+        graphql.execute(ErrorSession(), "query { viewer { login } }")
+
+
+def test_http_error_fails_the_request():
+    class ErrorSession:
+        def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+            return FakeResponse({"message": "Bad credentials"}, status_code=401)
+
+    with pytest.raises(graphql.GraphQLError, match="HTTP 401"):
+        graphql.execute(ErrorSession(), "query { viewer { login } }")
+
+
+def test_chunked_preserves_order():
+    assert graphql.chunked(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+
+
+@pytest.fixture
+def project_mod(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(repo_dir),
+        "esphome_io_path": str(repo_dir),
+        "esphome_hassio_path": str(repo_dir),
+        "esphome_issues_path": str(repo_dir),
+        "esphome_feature_requests_path": str(repo_dir),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project
+
+    importlib.reload(project)
+    return project
+
+
+class FakeRepo:
+    def __init__(self, session):
+        self.session = session
+        self.pull_request_calls = []
+
+    def pull_request(self, number):
+        self.pull_request_calls.append(number)
+        raise AssertionError(f"#{number} should have come from GraphQL")
+
+
+def test_get_prs_hydrates_cycle_sized_sets_in_batches(project_mod, tmp_path):
+    """250 PRs take three GraphQL requests and no REST requests."""
+    numbers = list(range(1, 251))
+    session = FakeSession({n: _node(n) for n in numbers})
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    proj._repo = FakeRepo(session)
+
+    pulls = proj.get_prs(numbers)
+
+    assert [pull.number for pull in pulls] == numbers
+    assert len(session.queries) == 3
+    assert proj._repo.pull_request_calls == []
+    assert set(proj.pr_cache) == set(numbers)
+
+    # Served from pr_cache afterwards.
+    proj.get_prs(numbers[:50])
+    assert len(session.queries) == 3
+
+
+def test_iter_prs_hands_out_batches_while_later_ones_download(project_mod, tmp_path):
+    """The first PRs arrive while the batch holding the last ones is held back."""
+    numbers = list(range(1, 251))
+    first_read = threading.Event()
+
+    class SlowLastBatch(FakeSession):
+        def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+            if "pullRequest(number: 250)" in json["query"]:
+                assert first_read.wait(timeout=5)
+            return super().post(url, json=json)
+
+    session = SlowLastBatch({n: _node(n) for n in numbers})
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    proj._repo = FakeRepo(session)
+
+    pulls = proj.iter_prs(numbers)
+    assert next(pulls).number == 1
+    first_read.set()
+
+    assert [pull.number for pull in pulls] == numbers[1:]
+    assert len(session.queries) == 3
+
+
+def test_get_prs_small_sets_stay_on_rest(project_mod, tmp_path):
+    session = FakeSession({})
+
+    class RestRepo(FakeRepo):
+        def pull_request(self, number):
+            self.pull_request_calls.append(number)
+            return graphql.GraphQLPullRequest(_node(number))
+
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    proj._repo = RestRepo(session)
+
+    proj.get_prs([1, 2])
+
+    assert session.queries == []
+    assert sorted(proj._repo.pull_request_calls) == [1, 2]
+
+
+def test_missing_milestone_fails_the_listing():
+    class EmptySession:
+        def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+            return FakeResponse({"data": {"repository": {"milestone": None}}})
+
+    with pytest.raises(graphql.GraphQLError, match="Milestone 5 not found"):
+        graphql.fetch_milestone_pull_requests(EmptySession(), "esphome", "esphome", 5)
@@ -12,6 +12,7 @@ import json
 
 import pytest
 from click.testing import CliRunner
+from github3.exceptions import error_for
 
 
 @pytest.fixture
@@ -95,7 +96,7 @@ def test_labels_updates_creates_and_renames(commands, monkeypatch):
         (),
         {"repository": lambda self, owner, name: repos[name]},
     )()
-    monkeypatch.setattr(commands, "get_session", lambda: session)
+    monkeypatch.setattr(commands, "get_app_session", lambda: session)
 
     result = CliRunner().invoke(commands.cli, ["labels"])
 
@@ -108,10 +109,65 @@ def test_labels_updates_creates_and_renames(commands, monkeypatch):
     assert esphome_repo.created == ["component: gamma"]
     # Repos without labels create everything.
     for repo in other_repos.values():
-        assert repo.created == [
+        assert sorted(repo.created) == [
             "component: alpha",
             "component: beta",
             "component: gamma",
         ]
         assert repo.labels_calls == 1
     assert esphome_repo.labels_calls == 1
+
+
+class FakeErrorResponse:
+    def __init__(self, status_code: int, message: str, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = message.encode()
+
+    def json(self):
+        return {"message": self.content.decode()}
+
+
+class FlakyLabelRepo(FakeLabelRepo):
+    """Rate limits its first write and refuses ``component: beta``."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.attempts = 0
+
+    def create_label(self, *, name: str, color: str) -> None:
+        self.attempts += 1
+        if self.attempts == 1:
+            raise error_for(
+                FakeErrorResponse(
+                    403,
+                    "You have exceeded a secondary rate limit",
+                    {"Retry-After": "0"},
+                )
+            )
+        if name == "component: beta":
+            raise error_for(FakeErrorResponse(422, "Validation Failed"))
+        super().create_label(name=name, color=color)
+
+
+def test_labels_retries_rate_limits_and_reports_failed_writes(commands, monkeypatch):
+    repos = {
+        name: FakeLabelRepo(name) for name in ("issues", "feature-requests", "esphome")
+    }
+    flaky = repos["esphome.io"] = FlakyLabelRepo("esphome.io")
+    session = type(
+        "FakeSession",
+        (),
+        {"repository": lambda self, owner, name: repos[name]},
+    )()
+    monkeypatch.setattr(commands, "get_app_session", lambda: session)
+
+    result = CliRunner().invoke(commands.cli, ["labels"])
+
+    assert result.exit_code == 1
+    assert sorted(flaky.created) == ["component: alpha", "component: gamma"]
+    assert "esphome.io: create 'component: beta': 422 Validation Failed" in (
+        result.output
+    )
+    assert "Retried 1 rate limited write(s)" in result.output
+    assert "1 label write(s) failed" in result.output
@@ -250,3 +250,79 @@ def test_close_cycle_milestone_patch_release(cutting, monkeypatch):
         ("esphome", "2026.7.2", None),
         ("docs", "2026.7.2", None),
     ]
+
+
+class RegistryMilestone(FakeMilestone):
+    """A milestone whose ``update`` edits it in place, like github3's does."""
+
+    def __init__(self, number: int, title: str):
+        super().__init__(title)
+        self.number = number
+
+    def update(self, **kwargs):
+        super().update(**kwargs)
+        self.title = kwargs.get("title", self.title)
+        return True
+
+
+class MilestoneRepo:
+    def __init__(self, milestones):
+        self._milestones = milestones
+        self.listings = 0
+
+    def milestones(self, state):
+        assert state == "open"
+        self.listings += 1
+        return iter(self._milestones)
+
+    def create_milestone(self, title, due_on=None):
+        milestone = RegistryMilestone(100 + len(self._milestones), title)
+        self._milestones.append(milestone)
+        return milestone
+
+
+def _registry_project(cutting, milestones):
+    proj = cutting.EsphomeProject
+    proj._repo = MilestoneRepo(milestones)
+    return proj
+
+
+def test_milestones_are_listed_once_per_project(cutting):
+    current = RegistryMilestone(5, "2026.7.0")
+    proj = _registry_project(cutting, [current, RegistryMilestone(6, "2026.8.0")])
+
+    assert proj.get_milestone_by_title("2026.7.0") is current
+    assert proj.get_milestone(5) is current
+    assert proj.get_milestone_by_title("2026.9.0") is None
+    assert [ms.title for ms in proj.get_open_milestones()] == ["2026.7.0", "2026.8.0"]
+    assert proj.repo.listings == 1
+
+
+def test_milestone_writes_keep_the_registry_current(cutting):
+    old = RegistryMilestone(5, "2026.7.0")
+    proj = _registry_project(cutting, [old])
+
+    created = proj.ensure_milestone("2026.7.1")
+    proj.update_milestone(old, state="closed")
+
+    assert proj.get_milestone_by_title("2026.7.1") is created
+    assert proj.get_milestone_by_title("2026.7.0") is None
+    assert proj.get_milestone(5) is None
+    assert proj.repo.listings == 1
+
+    proj.update_milestone(created, title="2026.7.2")
+    assert proj.get_milestone_by_title("2026.7.1") is None
+    assert proj.get_milestone_by_title("2026.7.2") is created
+
+
+def test_refresh_milestones_lists_again(cutting):
+    proj = _registry_project(cutting, [RegistryMilestone(5, "2026.7.0")])
+    proj.get_milestone_by_title("2026.7.0")
+
+    # Someone creates a milestone on GitHub while the tool waits.
+    proj.repo._milestones.append(RegistryMilestone(6, "2026.7.1"))
+    assert proj.get_milestone_by_title("2026.7.1") is None
+
+    proj.refresh_milestones()
+    assert proj.get_milestone_by_title("2026.7.1") is not None
+    assert proj.repo.listings == 2
@@ -0,0 +1,169 @@
+"""Tests for batching PR writes into aliased GraphQL mutations.
+
+``mutations`` and ``graphql`` are import-clean; the session is a hand-rolled
+fake answering the GraphQL endpoint, and the pacing clock is faked.
+"""
+
+import re
+import types
+
+import pytest
+
+from esphomerelease.mutations import MutationBatcher, MutationFailure
+from esphomerelease.writes import WritePacer, WriteQueue
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeGraphQLSession:
+    """Resolves ids and applies mutations; ``fail`` maps node ids to errors."""
+
+    def __init__(self, *, fail=None, down_documents=()):
+        self.fail = fail or {}
+        self.down_documents = set(down_documents)
+        self.documents = []
+        self.id_lookups = []
+
+    def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+        query = json["query"]
+        if "label(name:" in query:
+            names = re.findall(r'label(\d+): label\(name: "([^"]+)"\)', query)
+            return FakeResponse(
+                {"data": {"repository": {f"label{i}": {"id": f"LA_{n}"} for i, n in names}}}
+            )
+        if query.startswith("query"):
+            numbers = [int(n) for n in re.findall(r"pullRequest\(number: (\d+)\)", query)]
+            self.id_lookups.append(numbers)
+            # Numbers above 1000 are issues, not PRs.
+            nodes = {f"pr{n}": {"id": f"PR_{n}"} if n < 1000 else None for n in numbers}
+            return FakeResponse({"data": {"repository": nodes}})
+
+        self.documents.append(query)
+        if len(self.documents) in self.down_documents:
+            return FakeResponse({"message": "Bad gateway"}, status_code=502)
+        data, errors = {}, []
+        for alias, node_id in re.findall(r'(m\d+): \w+\(input: \{\w+: "([^"]+)"', query):
+            if node_id in self.fail:
+                data[alias] = None
+                errors.append({"path": [alias], "message": self.fail[node_id]})
+            else:
+                data[alias] = {"clientMutationId": None}
+        return FakeResponse({"data": data, "errors": errors})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _pull(number: int, node_id=True):
+    return types.SimpleNamespace(
+        number=number, node_id=f"PR_{number}" if node_id else None
+    )
+
+
+def _batcher(session, per_minute=80, **kwargs):
+    clock = FakeClock()
+    pacer = WritePacer(per_minute, clock=clock, sleep=clock.sleep)
+    batcher = MutationBatcher(session, "esphome", "esphome", pacer=pacer, **kwargs)
+    return batcher, clock
+
+
+def test_labels_are_added_in_aliased_documents():
+    session = FakeGraphQLSession()
+    batcher, _ = _batcher(session, per_document=2)
+
+    failures = batcher.add_labels([_pull(n) for n in (1, 2, 3)], "cherry-picked")
+
+    assert failures == []
+    assert len(session.documents) == 2
+    assert session.documents[0].count("addLabelsToLabelable") == 2
+    assert 'labelIds: ["LA_cherry-picked"]' in session.documents[0]
+    assert session.id_lookups == []
+
+
+def test_failed_items_are_reported_and_the_rest_written():
+    session = FakeGraphQLSession(fail={"PR_2": "Pull request is locked"})
+    batcher, _ = _batcher(session)
+
+    failures = batcher.clear_milestones([_pull(n) for n in (1, 2, 3)])
+
+    assert failures == [MutationFailure(2, "Pull request is locked")]
+    assert session.documents[0].count("milestoneId: null") == 3
+
+
+def test_failed_document_does_not_stop_the_next_one():
+    session = FakeGraphQLSession(down_documents={1})
+    batcher, _ = _batcher(session, per_document=2)
+
+    failures = batcher.clear_milestones([_pull(n) for n in (1, 2, 3)])
+
+    assert [failure.number for failure in failures] == [1, 2]
+    assert "HTTP 502" in failures[0].message
+    assert len(session.documents) == 2
+
+
+def test_unknown_node_ids_are_looked_up_in_one_request():
+    session = FakeGraphQLSession()
+    batcher, _ = _batcher(session)
+
+    failures = batcher.clear_milestones(
+        [_pull(1), _pull(2, node_id=False), _pull(1001, node_id=False)]
+    )
+
+    assert session.id_lookups == [[2, 1001]]
+    assert failures == [MutationFailure(1001, "not a pull request in the repository")]
+    assert '"PR_2"' in session.documents[0]
+
+
+def test_documents_are_paced_to_the_content_write_limits():
+    session = FakeGraphQLSession()
+    batcher, clock = _batcher(session, per_document=10, per_minute=20)
+
+    batcher.clear_milestones([_pull(n) for n in range(1, 26)])
+
+    # Each mutation is one content write: two documents fill the minute.
+    assert clock.sleeps == pytest.approx([60.0])
+    assert batcher.documents == 3
+
+
+def test_mutations_and_rest_writes_share_one_pace():
+    session = FakeGraphQLSession()
+    batcher, clock = _batcher(session, per_document=10, per_minute=20)
+    queue = WriteQueue(workers=1, pacer=batcher.pacer)
+    started = []
+    for number in range(2):
+        queue.add(f"write {number}", lambda: started.append(clock.now))
+
+    batcher.clear_milestones([_pull(n) for n in range(1, 19)])
+    assert queue.run() == []
+
+    # 18 mutations leave room for two more writes in the first minute only.
+    assert started == [0.0, 0.0]
+    queue.add("write 2", lambda: started.append(clock.now))
+    assert queue.run() == []
+    assert started == [0.0, 0.0, 60.0]
+
+
+def test_nothing_to_write_sends_nothing():
+    session = FakeGraphQLSession()
+    batcher, _ = _batcher(session)
+
+    assert batcher.add_labels([], "cherry-picked") == []
+    assert session.documents == [] and session.id_lookups == []
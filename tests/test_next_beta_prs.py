@@ -2,6 +2,8 @@
 
 The command lists the PRs on the cycle milestone that the next beta cut would
 cherry-pick: merged PRs without the ``cherry-picked`` label, in merge order.
+Milestone contents come from GraphQL ``milestone.pullRequests``; the fake
+repository's session answers those queries from a list of PR nodes.
 
 ``commands`` imports ``.project``, which instantiates every ``Project`` at
 import time and asserts each configured path is a directory. The ``commands``
@@ -12,14 +14,17 @@ elsewhere in this repo.
 
 import importlib
 import json
+import re
 import types
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
 import pytest
 from click.testing import CliRunner
 from github3.exceptions import NotFoundError
 
+from esphomerelease.model import PullRecord
+
 
 @pytest.fixture
 def modules(tmp_path, monkeypatch):
@@ -62,41 +67,90 @@ def _not_found_error() -> NotFoundError:
     return NotFoundError(resp)
 
 
-class FakeLabel:
-    def __init__(self, name: str):
-        self.name = name
-
-
-class FakeIssue:
-    """Issue as it appears in a milestone listing.
+def _node(
+    number: int,
+    *,
+    state: str = "MERGED",
+    merged_at: Optional[str] = "2026-07-01T00:00:00Z",
+    labels: Optional[List[str]] = None,
+    title: str = "title",
+    login: str = "alice",
+) -> dict:
+    """A PR as ``milestone.pullRequests`` returns it."""
+    merged = state == "MERGED"
+    return {
+        "id": f"PR_{number}",
+        "number": number,
+        "title": title,
+        "body": "",
+        "url": f"https://github.com/esphome/esphome/pull/{number}",
+        "state": state,
+        "mergedAt": merged_at if merged else None,
+        "updatedAt": "2026-07-02T00:00:00Z",
+        "mergeCommit": {"oid": f"sha{number}"} if merged else None,
+        "author": {"__typename": "User", "login": login, "url": ""},
+        "labels": {"nodes": [{"name": name} for name in labels or []]},
+        "milestone": {"number": 5, "title": "2026.7.0"},
+    }
 
-    ``pr=True`` gives it the ``pull_request`` payload block github3 exposes as
-    ``pull_request_urls`` (with ``merged_at`` set for merged PRs); plain issues
-    keep it ``None``. Labels are payload labels (``original_labels``).
-    """
 
-    def __init__(
-        self,
-        number: int,
-        labels: Optional[List[str]] = None,
-        *,
-        pr: bool = False,
-        merged_at: Optional[str] = None,
-        title: str = "title",
-    ):
-        self.number = number
-        self.title = title
-        self.original_labels = [FakeLabel(name) for name in labels or []]
-        self.pull_request_urls: Optional[dict] = None
-        if pr:
-            self.pull_request_urls = {
-                "html_url": f"https://github.com/esphome/esphome/pull/{number}",
-                "merged_at": merged_at,
+class FakeResponse:
+    def __init__(self, payload, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers milestone GraphQL queries (two PRs per page) and label
+    lookups, and records the mutations sent."""
+
+    PAGE_SIZE = 2
+
+    def __init__(self, nodes: List[dict]):
+        self.nodes = nodes
+        self.queries: List[dict] = []
+        self.writes: List[tuple] = []
+
+    def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+        query = json["query"]
+        if query.startswith("mutation"):
+            self.writes.extend(re.findall(r"m\d+: (.*)", query))
+            aliases = re.findall(r"(m\d+):", query)
+            return FakeResponse({"data": {alias: {} for alias in aliases}})
+        if "label(name:" in query:
+            return FakeResponse(
+                {"data": {"repository": {"label0": {"id": "LA_cherry"}}}}
+            )
+        assert "milestone(number: $milestone)" in json["query"]
+        self.last_query = json["query"]
+        self.queries.append(json["variables"])
+        states = json["variables"]["states"]
+        matching = [n for n in self.nodes if states is None or n["state"] in states]
+        start = int(json["variables"].get("after") or 0)
+        stop = start + self.PAGE_SIZE
+        page = matching[start:stop]
+        end = start + len(page)
+        return FakeResponse(
+            {
+                "data": {
+                    "repository": {
+                        "milestone": {
+                            "pullRequests": {
+                                "pageInfo": {
+                                    "hasNextPage": end < len(matching),
+                                    "endCursor": str(end),
+                                },
+                                "nodes": page,
+                            }
+                        }
+                    }
+                }
             }
-        self.milestone_edits: List[int] = []
-
-    def edit(self, *, milestone: int) -> None:
-        self.milestone_edits.append(milestone)
+        )
 
 
 class FakePull:
@@ -112,22 +166,14 @@ class FakePull:
         self.number = number
         self.title = title
         self.html_url = f"https://github.com/esphome/esphome/pull/{number}"
-        self.user = types.SimpleNamespace(login=login)
+        self.user = types.SimpleNamespace(
+            login=login, html_url=f"https://github.com/{login}"
+        )
         self.merged_at = merged_at or datetime(2026, 7, 1)
         self.merge_commit_sha = merge_commit_sha or f"sha{number}"
-
-
-class FakeShortPull:
-    """A closed PR as it appears in the repo-wide ``pull_requests`` listing the
-    drift-recovery scan walks: a number plus the PR's own milestone (or None)."""
-
-    def __init__(self, number: int, milestone_number: Optional[int] = None):
-        self.number = number
-        self.milestone = (
-            types.SimpleNamespace(number=milestone_number)
-            if milestone_number is not None
-            else None
-        )
+        self.labels = []
+        self.milestone = None
+        self.body = ""
 
 
 class FakeRepo:
@@ -135,30 +181,18 @@ class FakeRepo:
         self,
         *,
         milestones: Optional[list] = None,
-        closed_issues: Optional[List[FakeIssue]] = None,
-        open_issues: Optional[List[FakeIssue]] = None,
+        milestone_pulls: Optional[List[dict]] = None,
         pulls: Optional[dict] = None,
-        pull_listing: Optional[List[FakeShortPull]] = None,
-        issues_by_number: Optional[dict] = None,
     ):
         self._milestones = milestones or []
-        self._issues = {
-            "closed": closed_issues or [],
-            "open": open_issues or [],
-        }
+        self.session = FakeSession(milestone_pulls or [])
         self._pulls = pulls or {}
-        self._pull_listing = pull_listing or []
-        self._issues_by_number = issues_by_number or {}
         self.pull_request_calls: List[int] = []
-        self.pull_requests_calls: List[tuple] = []
 
     def milestones(self, state: str) -> list:
         assert state == "open"
         return self._milestones
 
-    def issues(self, *, milestone: int, state: str) -> List[FakeIssue]:
-        return self._issues[state]
-
     def pull_request(self, number: int) -> FakePull:
         self.pull_request_calls.append(number)
         pull = self._pulls.get(number)
@@ -166,19 +200,16 @@ class FakeRepo:
             raise _not_found_error()
         return pull
 
-    def pull_requests(self, *, state=None, sort=None, direction=None) -> list:
-        self.pull_requests_calls.append((state, sort, direction))
-        return list(self._pull_listing)
-
-    def issue(self, number: int) -> FakeIssue:
-        return self._issues_by_number[number]
-
 
 MILESTONE = types.SimpleNamespace(
     title="2026.7.0", number=5, closed_issues=5, open_issues=0
 )
 
 
+def _numbers(pulls) -> List[int]:
+    return [pull.number for pull in pulls]
+
+
 def test_get_next_beta_prs_no_milestone(modules, tmp_path):
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
@@ -186,35 +217,30 @@ def test_get_next_beta_prs_no_milestone(modules, tmp_path):
 
 
 def test_get_next_beta_prs_filters_and_sorts(modules, tmp_path):
-    """Plain issues, unmerged PRs and cherry-picked PRs are skipped;
-    remaining PRs come back sorted by merge time. Only surviving PRs are
-    fetched from the API — everything else is filtered from the issue
-    listing payload."""
+    """Cherry-picked PRs are skipped; the rest come back sorted by merge time,
+    straight from the milestone listing without any per-PR request."""
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
 
-    later = FakePull(4, merged_at=datetime(2026, 7, 2))
-    earlier = FakePull(5, merged_at=datetime(2026, 7, 1))
     repo = FakeRepo(
-        closed_issues=[
-            FakeIssue(1),  # plain issue, not a PR
-            FakeIssue(2, pr=True),  # closed but unmerged PR
-            FakeIssue(
-                3, labels=["cherry-picked"], pr=True, merged_at="2026-07-01T00:00:00Z"
-            ),  # already picked
-            FakeIssue(4, pr=True, merged_at="2026-07-02T00:00:00Z"),
-            FakeIssue(5, pr=True, merged_at="2026-07-01T00:00:00Z"),
+        milestone_pulls=[
+            _node(2, state="CLOSED"),  # closed but unmerged PR
+            _node(3, labels=["cherry-picked"]),  # already picked
+            _node(4, merged_at="2026-07-02T00:00:00Z"),
+            _node(5, merged_at="2026-07-01T00:00:00Z"),
+            _node(6, state="OPEN"),
         ],
-        pulls={
-            4: later,
-            5: earlier,
-        },
     )
     proj._repo = repo
 
-    assert proj.get_next_beta_prs_for_milestone(MILESTONE) == [earlier, later]
-    # No per-issue probing: only the PRs in the result were fetched.
-    assert sorted(repo.pull_request_calls) == [4, 5]
+    result = proj.get_next_beta_prs_for_milestone(MILESTONE)
+
+    assert _numbers(result) == [5, 4]
+    assert result[0].merged_at == datetime(2026, 7, 1, tzinfo=timezone.utc)
+    assert repo.pull_request_calls == []
+    assert [query["states"] for query in repo.session.queries] == [["MERGED"]] * 2
+    # The listing also warms the PR cache.
+    assert proj.get_pr(4) is result[1]
 
 
 def test_next_beta_prs_command_lists_prs(modules):
@@ -223,13 +249,10 @@ def test_next_beta_prs_command_lists_prs(modules):
 
     commands.EsphomeProject._repo = FakeRepo(
         milestones=[MILESTONE],
-        closed_issues=[FakeIssue(10, pr=True, merged_at="2026-07-01T00:00:00Z")],
-        open_issues=[FakeIssue(11, pr=True), FakeIssue(12)],
-        pulls={
-            10: FakePull(10, title="Merged fix", login="alice"),
-            11: FakePull(11, title="Open fix"),
-            # 12 is a plain open issue, not a PR
-        },
+        milestone_pulls=[
+            _node(10, title="Merged fix", login="alice"),
+            _node(11, state="OPEN", title="Open fix"),
+        ],
     )
     # Docs project has no matching milestone.
     commands.EsphomeDocsProject._repo = FakeRepo(milestones=[])
@@ -244,6 +267,25 @@ def test_next_beta_prs_command_lists_prs(modules):
     assert "Couldn't find milestone 2026.7.0 for project esphome.io" in result.output
 
 
+def test_pr_cache_stats_are_reported_per_command(modules, capsys):
+    _, commands = modules
+    cache = commands.EsphomeProject.pr_cache
+    cache.get_or_fetch(1, str)
+    cache.get_or_fetch(1, str)
+
+    commands._print_request_report()
+    assert "esphome PR cache: 1 hit(s), 1 miss(es), 0 coalesced" in (
+        capsys.readouterr().out
+    )
+
+    # The next command counts from zero.
+    for proj in (commands.EsphomeProject, commands.EsphomeDocsProject):
+        proj._repo = FakeRepo(milestones=[MILESTONE])
+    result = CliRunner().invoke(commands.cli, ["next-beta-prs", "2026.7.0"])
+    assert result.exit_code == 0
+    assert "1 hit(s)" not in result.output
+
+
 def test_next_beta_prs_command_no_open_prs(modules):
     """Without open milestone PRs the warning block is skipped."""
     _, commands = modules
@@ -281,18 +323,118 @@ def test_get_prs_fetches_missing_once_and_uses_cache(modules, tmp_path):
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
 
-    cached = FakePull(1)
-    fetched = FakePull(2)
-    repo = FakeRepo(pulls={2: fetched})
+    cached = PullRecord.from_pull(FakePull(1))
+    repo = FakeRepo(pulls={2: FakePull(2)})
     proj._repo = repo
     proj.pr_cache[1] = cached
 
-    assert proj.get_prs([1, 2, 2, 1]) == [cached, fetched, fetched, cached]
+    pulls = proj.get_prs([1, 2, 2, 1])
+    assert _numbers(pulls) == [1, 2, 2, 1]
+    assert pulls[0] is cached
+    assert pulls[1] == PullRecord.from_pull(FakePull(2))
     assert repo.pull_request_calls == [2]
 
     # Second call is served entirely from the cache.
-    assert proj.get_prs([1, 2]) == [cached, fetched]
+    assert proj.get_prs([1, 2]) == pulls[:2]
+    assert repo.pull_request_calls == [2]
+
+
+def test_overlapping_get_prs_from_threads_fetch_each_pr_once(modules, tmp_path):
+    """Concurrent callers asking for overlapping numbers share the fetches."""
+    import threading
+
+    project_mod, _ = modules
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    repo = FakeRepo(pulls={n: FakePull(n) for n in range(1, 7)})
+    proj._repo = repo
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda k=k, ns=ns: results.update({k: proj.get_prs(ns)}))
+        for k, ns in (("code", [1, 2, 3, 4]), ("docs", [3, 4, 5, 6]))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(repo.pull_request_calls) == [1, 2, 3, 4, 5, 6]
+    assert results["code"][2] is results["docs"][0]
+
+
+def test_milestone_poller_fetches_only_changed_prs(modules, tmp_path):
+    """Later polls list update stamps and hydrate only new or changed PRs;
+    PRs that left the milestone drop out."""
+    project_mod, _ = modules
+    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
+    nodes = [_node(1), _node(2), _node(3)]
+    repo = FakeRepo(milestone_pulls=nodes, pulls={2: FakePull(2, title="renamed")})
+    proj._repo = repo
+
+    poller = proj.poll_milestone(MILESTONE, "MERGED")
+    assert _numbers(poller.poll()) == [1, 2, 3]
+    assert repo.pull_request_calls == []
+
+    nodes[1]["updatedAt"] = "2026-07-05T00:00:00Z"
+    del nodes[2]
+    pulls = poller.poll()
+
+    assert _numbers(pulls) == [1, 2]
+    assert pulls[1].title == "renamed"
+    assert poller.changed == [2]
     assert repo.pull_request_calls == [2]
+    assert "updatedAt" in repo.session.last_query and "body" not in repo.session.last_query
+
+
+def _pull_payload(number: int, *, state: str, milestone: bool = True) -> dict:
+    """A PR as ``pull_request`` webhook deliveries carry it."""
+    return {
+        "number": number,
+        "title": "title",
+        "html_url": f"https://github.com/esphome/esphome/pull/{number}",
+        "body": "",
+        "state": "open" if state == "OPEN" else "closed",
+        "labels": [],
+        "milestone": {"number": 5, "title": "2026.7.0"} if milestone else None,
+        "merged_at": "2026-07-03T00:00:00Z" if state == "MERGED" else None,
+        "merge_commit_sha": f"sha{number}",
+        "updated_at": "2026-07-03T00:00:00Z",
+        "user": {"login": "alice", "html_url": ""},
+    }
+
+
+def test_milestone_poller_reads_the_webhook_maintained_cache(modules, tmp_path):
+    """While a webhook receiver is followed, only the first poll asks GitHub;
+    deliveries move PRs into and out of the listing."""
+    from esphomerelease.webhooks import WebhookReceiver
+
+    project_mod, _ = modules
+    proj = project_mod.Project(
+        path=str(tmp_path / "repo"), shortname="esphome", repo_name="esphome"
+    )
+    repo = FakeRepo(milestone_pulls=[_node(1), _node(2, state="OPEN")])
+    proj._repo = repo
+    receiver = WebhookReceiver([proj])
+    proj.follow_webhooks(receiver)
+
+    poller = proj.poll_milestone(MILESTONE, "MERGED")
+    assert _numbers(poller.poll()) == [1]
+
+    for payload in (
+        _pull_payload(2, state="MERGED"),
+        _pull_payload(1, state="MERGED", milestone=False),
+    ):
+        receiver.apply(
+            "pull_request",
+            {"repository": {"full_name": "esphome/esphome"}, "pull_request": payload},
+        )
+
+    assert _numbers(poller.poll()) == [2]
+    assert poller.changed == [2]
+    assert len(repo.session.queries) == 1
+    # Cached PRs are current, so a refresh does not fetch them again.
+    assert proj.refresh_prs([2])[0].merged_at is not None
+    assert repo.pull_request_calls == []
 
 
 def test_get_open_prs_no_milestone(modules, tmp_path):
@@ -310,29 +452,21 @@ def test_cherry_pick_from_milestone_no_milestone(modules, tmp_path):
 def test_cherry_pick_from_milestone_filters_prompts_and_picks_in_order(
     modules, tmp_path, monkeypatch, capsys
 ):
-    """Plain issues are skipped, unmerged PRs prompt, cherry-picked PRs are
-    dropped silently, and the rest are picked sorted by merge time."""
+    """Unmerged PRs prompt, cherry-picked PRs are dropped silently, and the
+    rest are picked sorted by merge time."""
     import click
 
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
 
-    unmerged = FakeIssue(2, pr=True, title="Unmerged PR")
-    picked = FakeIssue(
-        3,
-        labels=["cherry-picked"],
-        pr=True,
-        merged_at="2026-07-01T00:00:00Z",
-        title="Already picked PR",
-    )
-    second = FakeIssue(4, pr=True, merged_at="2026-07-02T00:00:00Z")
-    first = FakeIssue(5, pr=True, merged_at="2026-07-01T00:00:00Z")
     repo = FakeRepo(
-        closed_issues=[FakeIssue(1), unmerged, picked, second, first],
-        pulls={
-            4: FakePull(4, merged_at=datetime(2026, 7, 2)),
-            5: FakePull(5, merged_at=datetime(2026, 7, 1)),
-        },
+        milestone_pulls=[
+            _node(2, state="CLOSED", title="Unmerged PR"),
+            _node(3, labels=["cherry-picked"], title="Already picked PR"),
+            _node(4, merged_at="2026-07-02T00:00:00Z"),
+            _node(5, merged_at="2026-07-01T00:00:00Z"),
+            _node(6, state="OPEN", title="Still open PR"),
+        ],
     )
     proj._repo = repo
 
@@ -349,182 +483,48 @@ def test_cherry_pick_from_milestone_filters_prompts_and_picks_in_order(
 
     result = proj.cherry_pick_from_milestone(MILESTONE)
 
-    assert result == [first, second]
+    assert _numbers(result) == [5, 4]
     assert picked_shas == ["sha5", "sha4"]
-    # Only the actually-picked PRs were fetched from the API.
-    assert sorted(repo.pull_request_calls) == [4, 5]
+    # Merge commits came with the listing; no PR was fetched on its own.
+    assert repo.pull_request_calls == []
     assert len(prompts) == 2 and "Unmerged PR" in prompts[0]
     # The already-picked PR produces no output at all.
     out = capsys.readouterr().out
-    assert picked.title not in out
+    assert "Already picked PR" not in out
+    assert "Still open PR" not in out
     assert "cherry picked" not in out
 
 
-def _milestone(*, closed_issues: int, open_issues: int = 0) -> types.SimpleNamespace:
-    return types.SimpleNamespace(
-        title="2026.7.1", number=7, closed_issues=closed_issues, open_issues=open_issues
-    )
-
-
-def _capture_subshell(proj, monkeypatch) -> list:
-    """Replace the interactive subshell with a recorder of its kwargs."""
-    calls = []
-    monkeypatch.setattr(proj, "_spawn_subshell", lambda **kw: calls.append(kw))
-    return calls
-
-
-def test_resolve_drift_no_shortfall(modules, tmp_path, monkeypatch):
-    """When the listing already matches the counter, no shell is spawned."""
-    project_mod, _ = modules
-    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-    proj._repo = FakeRepo(closed_issues=[FakeIssue(1, pr=True), FakeIssue(2)])
-    calls = _capture_subshell(proj, monkeypatch)
-
-    assert proj._resolve_milestone_index_drift(_milestone(closed_issues=2)) == []
-    assert calls == []
-    assert proj._repo.pull_requests_calls == []
-
-
-def test_find_drifted_milestone_prs_skips_and_stops(modules, tmp_path):
-    """The scan skips already-known, milestone-less and other-milestone PRs and
-    stops once the shortfall is met."""
-    project_mod, _ = modules
-    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-
-    dropped = FakeIssue(11, pr=True, title="Dropped")
-    proj._repo = FakeRepo(
-        pull_listing=[
-            FakeShortPull(10, milestone_number=7),  # already known -> skip
-            FakeShortPull(98, milestone_number=None),  # no milestone -> skip
-            FakeShortPull(99, milestone_number=8),  # other milestone -> skip
-            FakeShortPull(11, milestone_number=7),  # the dropped PR -> found
-            FakeShortPull(12, milestone_number=7),  # never reached: shortfall met
-        ],
-        issues_by_number={11: dropped},
-    )
-
-    # Counter says 2, one already known (#10) -> one missing.
-    found = proj._find_drifted_milestone_prs(_milestone(closed_issues=2), {10})
-    assert found == [dropped]
-    assert proj._repo.pull_requests_calls == [("closed", "updated", "desc")]
-
-
-def test_find_drifted_milestone_prs_no_shortfall(modules, tmp_path):
-    """No shortfall -> empty result and no closed-PR scan at all."""
+def test_mark_pulls_cherry_picked_labels_by_number(modules, tmp_path):
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-    proj._repo = FakeRepo()
-
-    assert proj._find_drifted_milestone_prs(_milestone(closed_issues=1), {10}) == []
-    assert proj._repo.pull_requests_calls == []
-
-
-def test_resolve_drift_spawns_shell_with_cherry_pick_commands(
-    modules, tmp_path, monkeypatch
-):
-    """A shortfall prints the missing PR with a ready cherry-pick command and
-    drops into the manual-fix subshell; the identified PR is returned so the
-    caller still labels it cherry-picked."""
-    project_mod, _ = modules
-    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-
-    dropped = FakeIssue(11, pr=True, merged_at="2026-07-01T00:00:00Z", title="Dropped")
-    proj._repo = FakeRepo(
-        closed_issues=[FakeIssue(10, pr=True, merged_at="2026-07-02T00:00:00Z")],
-        pull_listing=[FakeShortPull(11, milestone_number=7)],
-        issues_by_number={11: dropped},
-        pulls={11: FakePull(11, title="Dropped fix", merge_commit_sha="deadbeef")},
-    )
-    calls = _capture_subshell(proj, monkeypatch)
-
-    result = proj._resolve_milestone_index_drift(_milestone(closed_issues=2))
-
-    assert result == [dropped]
-    assert len(calls) == 1
-    body = "\n".join(calls[0]["print_lines"])
-    assert "1 PR(s) are missing" in body
-    assert "git cherry-pick deadbeef" in body
-    assert "#11 Dropped fix" in body
-    assert "WARNING" not in body  # fully identified
-
-
-def test_resolve_drift_partial_identification_warns(modules, tmp_path, monkeypatch):
-    """If the bounded scan can only find some of the missing PRs, it still drops
-    into the shell (never aborts) and warns the operator to find the rest."""
-    project_mod, _ = modules
-    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-    monkeypatch.setattr(proj, "MILESTONE_SCAN_LIMIT", 2)
-
-    dropped = FakeIssue(11, pr=True, title="Dropped")
-    proj._repo = FakeRepo(
-        closed_issues=[FakeIssue(10, pr=True, merged_at="2026-07-02T00:00:00Z")],
-        # Two missing, but the cap trips after finding only one.
-        pull_listing=[
-            FakeShortPull(11, milestone_number=7),  # found
-            FakeShortPull(91, milestone_number=8),  # skipped, but counts toward cap
-            FakeShortPull(92, milestone_number=7),  # never reached: cap hit
-        ],
-        issues_by_number={11: dropped},
-        pulls={11: FakePull(11, title="Dropped fix")},
-    )
-    calls = _capture_subshell(proj, monkeypatch)
-
-    result = proj._resolve_milestone_index_drift(_milestone(closed_issues=3))
-
-    assert result == [dropped]
-    body = "\n".join(calls[0]["print_lines"])
-    assert "only identified 1 of 2" in body
-
-
-def test_cherry_pick_from_milestone_hands_drift_to_shell(
-    modules, tmp_path, monkeypatch
-):
-    """End to end: index-listed PRs are auto-picked; a dropped PR is left for the
-    user in the subshell (not auto-picked) but still returned for labeling."""
-    project_mod, _ = modules
-    proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
-
-    dropped = FakeIssue(11, pr=True, merged_at="2026-07-01T00:00:00Z", title="Dropped")
-    proj._repo = FakeRepo(
-        closed_issues=[FakeIssue(10, pr=True, merged_at="2026-07-02T00:00:00Z")],
-        pull_listing=[FakeShortPull(11, milestone_number=7)],
-        issues_by_number={11: dropped},
-        pulls={
-            10: FakePull(10, merged_at=datetime(2026, 7, 2)),
-            11: FakePull(11, merged_at=datetime(2026, 7, 1), title="Dropped"),
-        },
-    )
-    calls = _capture_subshell(proj, monkeypatch)
-
-    picked_shas = []
-    monkeypatch.setattr(proj, "cherry_pick", picked_shas.append)
+    repo = FakeRepo(milestone_pulls=[_node(4)])
+    proj._repo = repo
 
-    result = proj.cherry_pick_from_milestone(_milestone(closed_issues=2))
+    proj.mark_pulls_cherry_picked(proj.get_next_beta_prs_for_milestone(MILESTONE))
 
-    # Only the index-listed #10 is auto-picked; #11 is handed to the shell.
-    assert picked_shas == ["sha10"]
-    assert len(calls) == 1
-    # Both are returned so both get the cherry-picked label.
-    assert [issue.number for issue in result] == [10, 11]
+    assert repo.session.writes == [
+        'addLabelsToLabelable(input: {labelableId: "PR_4", '
+        'labelIds: ["LA_cherry"]}) { clientMutationId }'
+    ]
 
 
 def test_remove_merged_prs_from_milestone(modules, tmp_path):
-    """Merged PRs get their milestone cleared without any PR fetches; plain
-    issues and unmerged PRs are left alone."""
+    """Merged PRs get their milestone cleared without any PR fetches; open and
+    unmerged PRs are not even listed."""
     project_mod, _ = modules
     proj = project_mod.Project(path=str(tmp_path / "repo"), shortname="esphome")
 
     assert proj.remove_merged_prs_from_milestone(None) == []
 
-    plain = FakeIssue(1)
-    unmerged = FakeIssue(2, pr=True)
-    merged = FakeIssue(3, pr=True, merged_at="2026-07-01T00:00:00Z")
-    repo = FakeRepo(closed_issues=[plain, unmerged, merged])
+    repo = FakeRepo(milestone_pulls=[_node(2, state="CLOSED"), _node(3)])
     proj._repo = repo
 
-    assert proj.remove_merged_prs_from_milestone(MILESTONE) == [merged]
-    assert merged.milestone_edits == [0]
-    assert plain.milestone_edits == [] and unmerged.milestone_edits == []
+    assert _numbers(proj.remove_merged_prs_from_milestone(MILESTONE)) == [3]
+    assert repo.session.writes == [
+        'updatePullRequest(input: {pullRequestId: "PR_3", milestoneId: null}) '
+        "{ clientMutationId }"
+    ]
     assert repo.pull_request_calls == []
 
 
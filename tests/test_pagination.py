@@ -0,0 +1,110 @@
+"""Tests for the concurrent github3 listing paginator.
+
+``pagination`` does not import ``.config``. Listings are real github3
+``GitHubIterator`` objects over a ``ReleaseSession`` whose network edge is a
+hand-rolled ``requests`` adapter serving numbered pages, as in
+``test_transport``.
+"""
+
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from github3.structs import GitHubIterator
+from requests.adapters import BaseAdapter
+
+from esphomerelease.governor import ConcurrencyGovernor
+from esphomerelease.pagination import paginate
+from esphomerelease.transport import ReleaseSession
+
+URL = "https://api.github.com/repos/esphome/esphome/labels"
+
+
+class PagedAdapter(BaseAdapter):
+    """Serves ``pages`` (lists of items) with GitHub-style Link headers."""
+
+    def __init__(self, pages: list, *, last_link: bool = True):
+        super().__init__()
+        self.pages = pages
+        self.last_link = last_link
+        self.requested = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        query = parse_qs(urlparse(request.url).query)
+        page = int(query.get("page", ["1"])[0])
+        with self._lock:
+            self.requested.append((page, query["per_page"][0]))
+            self.threads.add(threading.current_thread().name)
+        links = []
+        if page < len(self.pages):
+            links.append(f'<{URL}?per_page=100&page={page + 1}>; rel="next"')
+            if self.last_link:
+                links.append(f'<{URL}?per_page=100&page={len(self.pages)}>; rel="last"')
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        if links:
+            response.headers["Link"] = ", ".join(links)
+        response._content = json.dumps(self.pages[page - 1]).encode()
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+def _listing(adapter, count: int = -1) -> GitHubIterator:
+    session = ReleaseSession(governor=ConcurrencyGovernor())
+    session.mount("https://", adapter)
+    return GitHubIterator(count, URL, dict, session)
+
+
+def _pages(count: int) -> list:
+    return [[{"name": f"label {page}.{i}"} for i in range(3)] for page in range(count)]
+
+
+def test_remaining_pages_are_fetched_from_the_last_link():
+    pages = _pages(5)
+    adapter = PagedAdapter(pages)
+
+    items = list(paginate(_listing(adapter)))
+
+    assert items == [item for page in pages for item in page]
+    assert sorted(adapter.requested) == [(page, "100") for page in range(1, 6)]
+
+
+def test_pages_are_fetched_on_the_shared_job_pool():
+    adapter = PagedAdapter(_pages(4))
+
+    assert len(list(paginate(_listing(adapter)))) == 12
+
+    # Page 1 is fetched by the caller, the rest by the pool's workers.
+    assert threading.current_thread().name in adapter.threads
+    assert {name for name in adapter.threads if name.startswith("job-pool-")}
+
+
+def test_without_a_last_link_next_links_are_followed():
+    pages = _pages(4)
+    adapter = PagedAdapter(pages, last_link=False)
+
+    items = list(paginate(_listing(adapter)))
+
+    assert items == [item for page in pages for item in page]
+    assert [page for page, _ in adapter.requested] == [1, 2, 3, 4]
+
+
+def test_single_page_listing():
+    adapter = PagedAdapter(_pages(1))
+    assert len(list(paginate(_listing(adapter)))) == 3
+    assert len(adapter.requested) == 1
+
+
+def test_bounded_listings_and_plain_iterables_pass_through():
+    assert list(paginate([1, 2, 3])) == [1, 2, 3]
+
+    adapter = PagedAdapter(_pages(3))
+    assert len(list(paginate(_listing(adapter, count=4)))) == 4
@@ -0,0 +1,161 @@
+"""Tests for ``prefetch``, which loads what a cut will read ahead of time.
+
+``cutting`` imports ``.project``, which instantiates every ``Project`` at
+import time and asserts each configured path is a directory. The ``cutting``
+fixture writes a temp ``config.json`` whose paths point at real directories so
+the module is importable, mirroring the import-safe reload pattern used
+elsewhere in this repo. The two projects' GitHub and git methods are replaced
+by hand-rolled fakes that record what was asked for.
+"""
+
+import importlib
+import json
+import types
+
+import pytest
+
+from esphomerelease.exceptions import EsphomeReleaseError
+from esphomerelease.model import Branch, PullRecord, Version
+
+
+@pytest.fixture
+def cutting(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(repo_dir),
+        "esphome_io_path": str(repo_dir),
+        "esphome_hassio_path": str(repo_dir),
+        "esphome_issues_path": str(repo_dir),
+        "esphome_feature_requests_path": str(repo_dir),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project_mod
+
+    importlib.reload(project_mod)
+    import esphomerelease.cutting as cutting_mod
+
+    importlib.reload(cutting_mod)
+    return cutting_mod
+
+
+def _record(number: int, body: str = "") -> PullRecord:
+    return PullRecord(
+        number=number,
+        title=f"PR {number}",
+        labels=(),
+        milestone_title="2026.8.0",
+        merged_at=None,
+        merge_commit_sha=None,
+        author_login="alice",
+        author_url="https://github.com/alice",
+        html_url=f"https://github.com/esphome/esphome/pull/{number}",
+        body=body,
+    )
+
+
+class FakeProject:
+    """Records the git commands, ranges and PR numbers a project is asked for."""
+
+    def __init__(self, proj, monkeypatch, *, milestone_prs=(), range_prs=()):
+        self.git = []
+        self.ranges = []
+        self.fetched = []
+        self.polled = []
+        milestone = types.SimpleNamespace(number=7, title="2026.8.0")
+        poller = types.SimpleNamespace(poll=lambda: list(milestone_prs))
+
+        def poll_milestone(ms, *states):
+            self.polled.append((ms.title, states))
+            return poller
+
+        def prs_between(base, head):
+            self.ranges.append((base, head))
+            return list(range_prs)
+
+        def get_prs(numbers):
+            self.fetched.append(list(numbers))
+            return [_record(number) for number in numbers]
+
+        def latest_release(*, include_prereleases=True):
+            return Version.parse("2026.8.0b1" if include_prereleases else "2026.7.2")
+
+        for name, fake in {
+            "run_git": lambda *args, **kwargs: self.git.append(args),
+            "get_milestone_by_title": lambda title: milestone,
+            "poll_milestone": poll_milestone,
+            "prs_between": prs_between,
+            "get_prs": get_prs,
+            "latest_release": latest_release,
+        }.items():
+            monkeypatch.setattr(proj, name, fake)
+
+
+@pytest.fixture
+def projects(cutting, monkeypatch):
+    monkeypatch.setattr(cutting, "get_store", lambda: object())
+    linking = _record(1, body="- esphome/esphome.io#501\n- esphome/esphome.io#502")
+    code = FakeProject(
+        cutting.EsphomeProject,
+        monkeypatch,
+        milestone_prs=[linking, _record(2)],
+        range_prs=[1, 2, 3],
+    )
+    docs = FakeProject(cutting.EsphomeDocsProject, monkeypatch, range_prs=[400])
+    return code, docs
+
+
+def test_first_beta_loads_the_dev_range_milestone_and_linked_docs(cutting, projects):
+    code, docs = projects
+
+    cutting.prefetch(Version.parse("2026.8.0b1"))
+
+    for proj in (code, docs):
+        assert proj.git == [("fetch", "--tags", "origin")]
+        # Every state: the cut checks open PRs and cherry-picks merged ones.
+        assert proj.polled == [("2026.8.0", ())]
+    # The first beta merges dev; its base is the latest stable release.
+    assert code.ranges == [("2026.7.2", "origin/dev")]
+    assert docs.ranges == [("2026.7.2", "origin/next")]
+    assert code.fetched == [[1, 2, 3]]
+    assert docs.fetched == [[400], [501, 502]]
+
+
+def test_later_cuts_load_the_branch_they_release_from(cutting, projects):
+    code, _ = projects
+
+    cutting.prefetch(Version.parse("2026.8.0b3"))
+    cutting.prefetch(Version.parse("2026.8.2"))
+
+    assert code.ranges == [
+        ("2026.8.0b2", "origin/beta"),
+        ("2026.8.1", "origin/release"),
+    ]
+
+
+def test_prefetch_needs_the_local_store(cutting, monkeypatch):
+    monkeypatch.setattr(cutting, "get_store", lambda: None)
+
+    with pytest.raises(EsphomeReleaseError, match="cache_dir"):
+        cutting.prefetch(Version.parse("2026.8.0b1"))
+
+
+@pytest.mark.parametrize(
+    "version, head",
+    [
+        ("2026.8.0b1", Branch.DEV),
+        ("2026.8.0b2", Branch.BETA),
+        ("2026.8.0", Branch.BETA),
+        ("2026.8.1", Branch.STABLE),
+    ],
+)
+def test_changelog_head(cutting, version, head):
+    # pylint: disable=protected-access
+    assert cutting._changelog_head(Version.parse(version)) == head
@@ -12,9 +12,13 @@ used elsewhere in this repo).
 """
 
 import importlib
+import threading
+import time
 
 import pytest
 
+from esphomerelease.jobs import JobPool
+
 
 @pytest.fixture
 def util(tmp_path, monkeypatch):
@@ -53,4 +57,193 @@ def test_first_failing_job_wins_when_several_fail(util):
 
     jobs = [lambda: 0, lambda: fail("first"), lambda: fail("second")]
     with pytest.raises(RuntimeError, match="first"):
-        util.process_asynchronously(jobs, "test")
+        util.process_asynchronously(jobs, "test", fail_fast=False)
+
+
+def test_pool_is_not_larger_than_the_job_list(util, monkeypatch):
+    monkeypatch.setattr(util, "JOB_POOL", JobPool(8))
+    started = []
+    real_thread = threading.Thread
+
+    def counting_thread(*args, **kwargs):
+        started.append(1)
+        return real_thread(*args, **kwargs)
+
+    monkeypatch.setattr(threading, "Thread", counting_thread)
+    # Both jobs have to run at once to get past the barrier.
+    both = threading.Barrier(2, timeout=5)
+
+    def job(value):
+        both.wait()
+        return value
+
+    jobs = [lambda: job(1), lambda: job(2)]
+    assert util.process_asynchronously(jobs, "test") == [1, 2]
+    assert len(started) == 2
+
+    # The workers are kept for the next job list.
+    assert util.process_asynchronously([lambda: 3], "test") == [3]
+    assert len(started) == 2
+
+
+def test_nested_job_lists_share_the_pool_without_deadlock(util, monkeypatch):
+    monkeypatch.setattr(util, "JOB_POOL", JobPool(2))
+    lock = threading.Lock()
+    running, peak, threads = [0], [0], set()
+
+    def leaf(value):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return value
+
+    def fan_out(base):
+        jobs = [lambda i=i: leaf(base + i) for i in range(4)]
+        return sum(util.process_asynchronously(jobs, "inner"))
+
+    # Every worker is busy with an outer job that waits for inner ones.
+    assert util.process_asynchronously(
+        [lambda: fan_out(0), lambda: fan_out(10)], "outer"
+    ) == [6, 46]
+    assert peak[0] <= 2
+    assert threads <= {"job-pool-0", "job-pool-1"}
+
+
+def test_only_the_outermost_job_list_on_the_main_thread_prints(
+    util, monkeypatch, capsys
+):
+    from esphomerelease.retry import RetryBudget, RetryPolicy
+
+    class Governor:
+        requests = 0
+
+        def summary(self):
+            return f"{self.requests} requests"
+
+    monkeypatch.setattr(util, "GOVERNOR", Governor())
+    attempts = []
+
+    def request():
+        util.GOVERNOR.requests += 1
+        attempts.append(threading.current_thread().name)
+        if len(attempts) == 1:
+            raise ConnectionResetError("Connection reset by peer")
+
+    def policy():
+        return RetryPolicy(budget=RetryBudget(), sleep=lambda _: None)
+
+    def fan_out():
+        util.process_asynchronously([request, request], "inner", retry=policy())
+
+    def in_background():
+        thread = threading.Thread(
+            target=util.process_asynchronously, args=([request], "fetcher")
+        )
+        thread.start()
+        thread.join()
+
+    util.process_asynchronously([fan_out, in_background], "outer", retry=policy())
+
+    out = capsys.readouterr().out
+    assert "inner" not in out and "fetcher" not in out
+    assert out.count("Retried 1 failed job(s)") == 1
+    assert out.count("4 requests") == 1
+
+
+def test_iter_yields_results_before_the_slowest_job_is_done(util):
+    slow_may_finish = threading.Event()
+
+    def slow():
+        assert slow_may_finish.wait(timeout=5)
+        return "slow"
+
+    results = util.iter_asynchronously(
+        [lambda: "fast", slow, lambda: "quick"], "test", ordered=False
+    )
+    assert sorted([next(results), next(results)]) == ["fast", "quick"]
+    slow_may_finish.set()
+    assert list(results) == ["slow"]
+
+
+def test_iter_ordered_yields_each_prefix_as_soon_as_it_is_done(util):
+    last_may_finish = threading.Event()
+
+    def last():
+        assert last_may_finish.wait(timeout=5)
+        return 3
+
+    results = util.iter_asynchronously([lambda: 1, lambda: 2, last], "test")
+    assert [next(results), next(results)] == [1, 2]
+    last_may_finish.set()
+    assert list(results) == [3]
+
+
+def test_iter_raises_the_first_failing_job_after_the_results_before_it(util):
+    def fail(msg):
+        raise RuntimeError(msg)
+
+    seen = []
+    jobs = [lambda: 0, lambda: fail("first"), lambda: 2, lambda: fail("second")]
+    with pytest.raises(RuntimeError, match="first"):
+        for value in util.iter_asynchronously(jobs, "test"):
+            seen.append(value)
+    assert seen == [0]
+
+
+def test_transient_job_failures_are_retried(util):
+    from esphomerelease.retry import RetryBudget, RetryPolicy
+
+    sleeps = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionResetError("Connection reset by peer")
+        return "ok"
+
+    policy = RetryPolicy(
+        budget=RetryBudget(), sleep=sleeps.append, jitter=lambda: 1.0
+    )
+    assert util.process_asynchronously([flaky, lambda: 2], "test", retry=policy) == [
+        "ok",
+        2,
+    ]
+    assert len(attempts) == 2 and sleeps == [1.0]
+
+
+def test_fail_fast_drops_queued_jobs_and_does_not_wait_for_running_ones(util):
+    slow_may_finish = threading.Event()
+    ran = []
+
+    def slow():
+        assert slow_may_finish.wait(timeout=5)
+
+    def unauthorized():
+        raise PermissionError("401 Bad credentials")
+
+    jobs = [slow, unauthorized] + [lambda i=i: ran.append(i) for i in range(50)]
+    try:
+        with pytest.raises(PermissionError, match="401"):
+            util.process_asynchronously(jobs, "test", num_threads=2)
+        # Raised while the slow job still runs, and nothing else was started.
+        assert not slow_may_finish.is_set()
+        assert ran == []
+    finally:
+        slow_may_finish.set()
+
+
+def test_without_fail_fast_every_job_runs(util):
+    ran = []
+
+    def unauthorized():
+        raise PermissionError("401 Bad credentials")
+
+    jobs = [unauthorized] + [lambda i=i: ran.append(i) for i in range(5)]
+    with pytest.raises(PermissionError):
+        util.process_asynchronously(jobs, "test", num_threads=1, fail_fast=False)
+    assert ran == list(range(5))
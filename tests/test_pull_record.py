@@ -0,0 +1,74 @@
+"""Tests for the slim ``PullRecord`` kept in ``Project.pr_cache``.
+
+``model`` and ``graphql`` are import-clean, so no ``config.json`` is needed.
+"""
+
+import dataclasses
+import sys
+import tracemalloc
+
+import pytest
+
+from esphomerelease.graphql import GraphQLPullRequest
+from esphomerelease.model import PullRecord
+
+
+def _node(number: int) -> dict:
+    return {
+        "number": number,
+        "title": f"Add sensor {number}",
+        "body": "Some description of the change.\n" * 20,
+        "url": f"https://github.com/esphome/esphome/pull/{number}",
+        "state": "MERGED",
+        "mergedAt": "2026-07-01T00:00:00Z",
+        "updatedAt": "2026-07-01T00:00:00Z",
+        "mergeCommit": {"oid": f"{number:040x}"},
+        "author": {
+            "__typename": "Bot",
+            "login": "dependabot",
+            "url": "https://github.com/apps/dependabot",
+        },
+        "labels": {"nodes": [{"name": "dependencies"}, {"name": "cherry-picked"}]},
+        "milestone": {"number": 5, "title": "2026.7.0"},
+    }
+
+
+def test_from_pull_keeps_what_the_changelog_reads():
+    record = PullRecord.from_pull(GraphQLPullRequest(_node(1)))
+
+    assert record.number == 1
+    assert record.labels == ("dependencies", "cherry-picked")
+    assert record.milestone_title == "2026.7.0"
+    assert record.merge_commit_sha == f"{1:040x}"
+    assert record.author_login == "dependabot[bot]"
+    assert record.author_url == "https://github.com/apps/dependabot"
+    assert record.merged_at.year == 2026
+
+
+def test_records_are_slotted_frozen_and_share_strings():
+    first, second = (
+        PullRecord.from_pull(GraphQLPullRequest(_node(n))) for n in (1, 2)
+    )
+
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.title = "changed"
+    assert first.labels[0] is second.labels[0]
+    assert first.author_login is second.author_login is sys.intern("dependabot[bot]")
+
+
+def test_records_take_less_memory_than_the_pulls_they_replace():
+    def allocated(build) -> int:
+        tracemalloc.start()
+        try:
+            kept = [build(n) for n in range(1000)]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del kept
+        return size
+
+    pulls = allocated(lambda n: GraphQLPullRequest(_node(n)))
+    records = allocated(lambda n: PullRecord.from_pull(GraphQLPullRequest(_node(n))))
+
+    assert records < pulls / 2
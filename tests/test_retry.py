@@ -0,0 +1,107 @@
+"""Tests for retrying transient job failures with jittered backoff.
+
+``retry`` is import-clean; errors are built from github3's own exception
+types around hand-rolled responses, and sleeping is recorded, not done.
+"""
+
+import pytest
+import requests
+from github3.exceptions import error_for
+
+from esphomerelease.graphql import GraphQLError
+from esphomerelease.retry import RetryBudget, RetryPolicy, transient_delay
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, message: str = "", headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = message
+        self.content = message.encode()
+
+    def json(self):
+        return {"message": self.text}
+
+
+@pytest.mark.parametrize(
+    "exc, delay",
+    [
+        (error_for(FakeResponse(502, "Bad Gateway")), 0.0),
+        (GraphQLError("GraphQL request failed with HTTP 503", 503), 0.0),
+        (requests.ConnectionError("Connection reset by peer"), 0.0),
+        (requests.ReadTimeout("Read timed out"), 0.0),
+        (error_for(FakeResponse(403, "limited", {"Retry-After": "7"})), 7.0),
+        (error_for(FakeResponse(401, "Bad credentials")), None),
+        (error_for(FakeResponse(404, "Not Found")), None),
+        (GraphQLError("Could not resolve to a User"), None),
+        (ValueError("bug"), None),
+    ],
+)
+def test_transient_errors(exc, delay):
+    assert transient_delay(exc) == delay
+
+
+def _policy(sleeps, **kwargs):
+    kwargs.setdefault("budget", RetryBudget())
+    return RetryPolicy(sleep=sleeps.append, jitter=lambda: 0.5, **kwargs)
+
+
+def test_backoff_doubles_up_to_the_cap_and_honours_retry_after():
+    sleeps = []
+    failures = [
+        requests.ConnectionError("reset"),
+        error_for(FakeResponse(502, "Bad Gateway")),
+        error_for(FakeResponse(429, "slow down", {"Retry-After": "10"})),
+    ]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    policy = _policy(sleeps, max_attempts=4, max_delay=1.5)
+
+    assert policy.call(flaky) == "ok"
+    # Half of 1, 2 (capped to 1.5), and Retry-After over the 0.75 backoff.
+    assert sleeps == [0.5, 0.75, 10.0]
+    assert policy.retries == 3
+
+
+def test_attempts_and_budget_bound_the_retries():
+    sleeps = []
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise error_for(FakeResponse(503, "Service Unavailable"))
+
+    budget = RetryBudget(4)
+    policy = _policy(sleeps, max_attempts=3, budget=budget)
+    for expected_calls in (3, 6, 7):
+        with pytest.raises(Exception, match="503"):
+            policy.call(down)
+        assert len(calls) == expected_calls
+    assert policy.retries == 4
+
+    # Another policy of the same command (a nested job list) finds it spent.
+    with pytest.raises(Exception, match="503"):
+        _policy(sleeps, budget=budget).call(down)
+    assert len(calls) == 8
+
+
+def test_rate_limits_the_session_gave_up_on_are_not_retried_again():
+    response = FakeResponse(403, "limited", {"Retry-After": "60"})
+    response.rate_limit_retried = True
+
+    assert transient_delay(error_for(response)) is None
+
+
+def test_permanent_errors_are_raised_at_once():
+    sleeps = []
+
+    def unauthorized():
+        raise error_for(FakeResponse(401, "Bad credentials"))
+
+    with pytest.raises(Exception, match="401"):
+        _policy(sleeps).call(unauthorized)
+    assert sleeps == []
@@ -0,0 +1,94 @@
+"""Tests for the single-flight PR cache.
+
+``singleflight`` is import-clean. Concurrency is made deterministic with
+``threading.Event``: the first fetch blocks until every other thread has
+registered its interest.
+"""
+
+import threading
+
+import pytest
+
+from esphomerelease.singleflight import SingleFlightCache
+
+
+def _wait_until(predicate):
+    for _ in range(1000):
+        if predicate():
+            return
+        threading.Event().wait(0.005)
+    raise AssertionError("condition never became true")
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = SingleFlightCache()
+    release = threading.Event()
+    fetches = []
+
+    def fetch(key):
+        fetches.append(key)
+        release.wait(5)
+        return f"PR {key}"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(1, fetch)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: cache.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert fetches == [1]
+    assert results == ["PR 1"] * 5
+    assert cache.get_or_fetch(1, fetch) == "PR 1"
+    assert str(cache.stats) == "1 hit(s), 1 miss(es), 4 coalesced"
+
+
+def test_claim_hands_out_each_missing_key_once():
+    cache = SingleFlightCache()
+    cache[1] = "cached"
+
+    assert cache.claim([1, 2, 3, 2]) == [2, 3]
+    assert cache.claim([2, 3, 4]) == [4]
+    cache.update({2: "two", 3: "three"})
+
+    assert cache.wait(2) == "two"
+    assert set(cache) == {1, 2, 3}
+    assert cache.stats == (1, 3, 2)
+
+
+def test_failed_fetch_wakes_waiters_and_is_not_cached():
+    cache = SingleFlightCache()
+    assert cache.claim([7]) == [7]
+
+    waiter_error = []
+
+    def waiter():
+        try:
+            cache.wait(7)
+        except LookupError as err:
+            waiter_error.append(err)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    cache.abandon([7], LookupError("not a PR"))
+    thread.join()
+
+    assert [str(err) for err in waiter_error] == ["not a PR"]
+    assert 7 not in cache
+    with pytest.raises(KeyError):
+        cache.wait(7)
+    # The next caller fetches again.
+    assert cache.claim([7]) == [7]
+
+
+def test_clear_keeps_the_dict_surface():
+    cache = SingleFlightCache()
+    cache[1] = "one"
+    cache.clear()
+
+    assert 1 not in cache and len(cache) == 0
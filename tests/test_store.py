@@ -0,0 +1,459 @@
+"""Tests for the persistent on-disk PR cache.
+
+``store`` is import-clean, so the SQLite layer is exercised directly against a
+file in ``tmp_path``. The read-through wiring in ``Project`` uses the temp
+``config.json`` reload pattern shared with the other ``project`` tests, with
+hand-rolled fakes for the repository and its HTTP session.
+"""
+
+import importlib
+import json
+import re
+import sqlite3
+import types
+
+import pytest
+
+from esphomerelease.store import CachedPull, Store
+
+
+def _entry(number: int, *, repo: str = "esphome", etag: str = '"e1"') -> CachedPull:
+    return CachedPull(
+        repo, number, "rest", {"number": number}, etag, "2026-07-01T00:00:00Z"
+    )
+
+
+def test_round_trip_survives_reopening(tmp_path):
+    path = tmp_path / "cache" / "github.sqlite"
+    store = Store(path)
+    store.put_pull(_entry(1))
+    store.close()
+
+    reopened = Store(path)
+    assert reopened.get_pull("esphome", 1) == _entry(1)
+    assert reopened.get_pull("esphome.io", 1) is None
+
+
+def test_put_replaces_existing_entry(tmp_path):
+    store = Store(tmp_path / "github.sqlite")
+    store.put_pull(_entry(1, etag='"old"'))
+    store.put_pull(_entry(1, etag='"new"'))
+
+    assert store.get_pull("esphome", 1).etag == '"new"'
+    assert len(store) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("esphomerelease.store.time.time", lambda: next(clock))
+    store = Store(tmp_path / "github.sqlite", max_entries=2)
+
+    store.put_pull(_entry(1))
+    store.put_pull(_entry(2))
+    store.get_pull("esphome", 1)  # 1 is now more recent than 2
+    store.put_pull(_entry(3))
+
+    assert sorted(store.get_pulls("esphome", [1, 2, 3])) == [1, 3]
+
+
+@pytest.fixture
+def project_mod(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    config = {
+        "github_token": "x",
+        "step": False,
+        "esphome_path": str(repo_dir),
+        "esphome_io_path": str(repo_dir),
+        "esphome_hassio_path": str(repo_dir),
+        "esphome_issues_path": str(repo_dir),
+        "esphome_feature_requests_path": str(repo_dir),
+    }
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    import esphomerelease.config as config_mod
+
+    importlib.reload(config_mod)
+    import esphomerelease.project as project
+
+    importlib.reload(project)
+    store = Store(tmp_path / "cache" / "github.sqlite")
+    monkeypatch.setattr(project, "get_store", lambda: store)
+    monkeypatch.setattr(project, "PullRequest", FakePull)
+    return project, store
+
+
+class FakePull:
+    """Stands in for github3's PullRequest: built from a payload, keeps it."""
+
+    def __init__(self, payload: dict, session=None):
+        self.etag = payload.pop("ETag", None)
+        self._payload = payload
+        self.number = payload["number"]
+        self.title = payload["title"]
+        self.body = ""
+        self.labels = []
+        self.milestone = None
+        self.merged_at = None
+        self.merge_commit_sha = None
+        self.html_url = f"https://github.com/esphome/esphome/pull/{self.number}"
+        self.user = types.SimpleNamespace(
+            login="alice", html_url="https://github.com/alice"
+        )
+
+    def as_dict(self) -> dict:
+        return self._payload
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, payload=None, etag=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+
+class FakeSession:
+    """Answers conditional GETs from ``current`` (number -> (etag, payload))."""
+
+    def __init__(self, current: dict):
+        self.current = current
+        self.gets = []
+
+    def get(self, url, *, headers):
+        number = int(re.search(r"/pulls/(\d+)$", url).group(1))
+        self.gets.append((number, headers["If-None-Match"]))
+        etag, payload = self.current[number]
+        if headers["If-None-Match"] == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, dict(payload), etag)
+
+
+class FakeRepo:
+    url = "https://api.github.com/repos/esphome/esphome"
+
+    def __init__(self, session, pulls: dict):
+        self.session = session
+        self._pulls = pulls
+        self.pull_request_calls = []
+
+    def pull_request(self, number):
+        self.pull_request_calls.append(number)
+        etag, payload = self._pulls[number]
+        return FakePull({**payload, "ETag": etag})
+
+    def _json(self, response, expected):
+        assert response.status_code == expected
+        return {**response._payload, "ETag": response.headers["ETag"]}
+
+
+def _payload(number: int, title: str = "title") -> dict:
+    return {"number": number, "title": title, "updated_at": "2026-07-01T00:00:00Z"}
+
+
+def _project(project, tmp_path, repo):
+    proj = project.Project(
+        path=str(tmp_path / "repo"), shortname="esphome", repo_name="esphome"
+    )
+    proj._repo = repo
+    return proj
+
+
+def test_second_run_revalidates_instead_of_downloading(project_mod, tmp_path):
+    """A fresh process finds the PR on disk and only sends a conditional GET."""
+    project, store = project_mod
+    pulls = {1: ('"e1"', _payload(1)), 2: ('"e2"', _payload(2))}
+
+    first = _project(project, tmp_path, FakeRepo(FakeSession(pulls), pulls))
+    first.get_prs([1, 2])
+    assert sorted(first.repo.pull_request_calls) == [1, 2]
+    assert len(store) == 2
+
+    session = FakeSession(pulls)
+    second = _project(project, tmp_path, FakeRepo(session, pulls))
+    assert [pull.title for pull in second.get_prs([1, 2])] == ["title", "title"]
+    assert second.repo.pull_request_calls == []
+    assert sorted(session.gets) == [(1, '"e1"'), (2, '"e2"')]
+
+
+def test_changed_pr_is_replaced_from_the_revalidation_response(
+    project_mod, tmp_path
+):
+    project, store = project_mod
+    store.put_pull(CachedPull("esphome", 1, "rest", _payload(1), '"old"', None))
+    current = {1: ('"new"', _payload(1, title="renamed"))}
+
+    session = FakeSession(current)
+    proj = _project(project, tmp_path, FakeRepo(session, current))
+
+    assert proj.get_pr(1).title == "renamed"
+    assert proj.repo.pull_request_calls == []
+    assert store.get_pull("esphome", 1).etag == '"new"'
+
+
+def test_bulk_sets_revalidate_with_an_updated_at_probe(project_mod, tmp_path):
+    """Cached PRs whose ``updatedAt`` is unchanged are not hydrated again."""
+    from esphomerelease.model import PullRecord
+
+    project, store = project_mod
+    numbers = list(range(1, 13))
+
+    def node(number, updated="2026-07-01T00:00:00Z"):
+        return {
+            "number": number,
+            "title": f"PR {number}",
+            "body": "",
+            "url": f"https://github.com/esphome/esphome/pull/{number}",
+            "state": "MERGED",
+            "mergedAt": "2026-07-01T00:00:00Z",
+            "updatedAt": updated,
+            "mergeCommit": {"oid": f"sha{number}"},
+            "author": None,
+            "labels": {"nodes": []},
+            "milestone": None,
+        }
+
+    store.put_pulls(
+        [
+            CachedPull("esphome", n, "graphql", node(n), None, "2026-07-01T00:00:00Z")
+            for n in numbers
+        ]
+    )
+    # PR 12 picked up a label since it was cached.
+    nodes = {n: node(n) for n in numbers}
+    nodes[12] = node(12, updated="2026-07-05T00:00:00Z")
+    documents = []
+
+    class GraphQLSession:
+        def post(self, url, *, json):  # pylint: disable=redefined-outer-name
+            documents.append(json["query"])
+            requested = [
+                int(n) for n in re.findall(r"pullRequest\(number: (\d+)\)", json["query"])
+            ]
+            return type(
+                "Response",
+                (),
+                {
+                    "status_code": 200,
+                    "json": lambda self: {
+                        "data": {"repository": {f"pr{n}": nodes[n] for n in requested}}
+                    },
+                },
+            )()
+
+    proj = _project(project, tmp_path, FakeRepo(GraphQLSession(), {}))
+    pulls = proj.get_prs(numbers)
+
+    assert [pull.number for pull in pulls] == numbers
+    assert isinstance(pulls[0], PullRecord)
+    # One probe for all twelve, then one hydration for the changed PR only.
+    assert len(documents) == 2
+    assert "PullFields" not in documents[0]
+    assert re.findall(r"pullRequest\(number: (\d+)\)", documents[1]) == ["12"]
+    assert store.get_pull("esphome", 12).updated_at == "2026-07-05T00:00:00Z"
+
+
+def _node(number: int, *, state="MERGED", milestone="2026.8.0", labels=()) -> dict:
+    return {
+        "id": f"PR_{number}",
+        "number": number,
+        "title": f"PR {number}",
+        "body": "",
+        "url": f"https://github.com/esphome/esphome/pull/{number}",
+        "state": state,
+        "mergedAt": f"2026-07-{number:02d}T00:00:00Z" if state == "MERGED" else None,
+        "updatedAt": "2026-07-01T00:00:00Z",
+        "mergeCommit": {"oid": f"sha{number}"} if state == "MERGED" else None,
+        "author": {"__typename": "User", "login": "alice", "url": "https://x"},
+        "labels": {"nodes": [{"name": name} for name in labels]},
+        "milestone": {"number": 7, "title": milestone} if milestone else None,
+    }
+
+
+def _milestone_payload(number: int, title: str) -> dict:
+    """Everything github3's ``Milestone`` reads."""
+    return {
+        "id": number,
+        "node_id": f"MI_{number}",
+        "number": number,
+        "title": title,
+        "state": "open",
+        "description": None,
+        "creator": None,
+        "open_issues": 1,
+        "closed_issues": 0,
+        "due_on": None,
+        "created_at": "2026-07-01T00:00:00Z",
+        "updated_at": "2026-07-01T00:00:00Z",
+        "url": f"https://api.github.com/repos/esphome/esphome/milestones/{number}",
+        "html_url": f"https://github.com/esphome/esphome/milestone/{number}",
+        "labels_url": "https://api.github.com/labels",
+    }
+
+
+def test_pulls_are_indexed_by_milestone_and_state(tmp_path):
+    store = Store(tmp_path / "github.sqlite")
+    store.put_pulls(
+        [
+            CachedPull("esphome", 1, "graphql", _node(1), None, None),
+            CachedPull("esphome", 2, "graphql", _node(2, state="OPEN"), None, None),
+            CachedPull("esphome", 3, "graphql", _node(3, milestone=None), None, None),
+            CachedPull(
+                "esphome",
+                4,
+                "rest",
+                {
+                    "number": 4,
+                    "state": "closed",
+                    "merged_at": "2026-07-04T00:00:00Z",
+                    "milestone": {"title": "2026.8.0"},
+                },
+                '"e4"',
+                None,
+            ),
+        ]
+    )
+
+    store.put_milestone_listing("esphome", "2026.8.0", None, [1, 2, 4])
+    store.put_milestone_listing("esphome.io", "2026.8.0", None, [])
+
+    merged = store.get_milestone_pulls("esphome", "2026.8.0", ["MERGED"])
+    assert [entry.number for entry in merged] == [1, 4]
+    assert len(store.get_milestone_pulls("esphome", "2026.8.0")) == 3
+    assert store.get_milestone_pulls("esphome.io", "2026.8.0") == []
+
+
+def test_milestone_pulls_are_the_last_listing_and_kept_from_eviction(
+    tmp_path, monkeypatch
+):
+    """Offline listings come from what the milestone listed last, not from
+    whichever rows are left; listed rows outlive the LRU cap, and a listed
+    PR without a row is an error rather than a gap."""
+    from esphomerelease.store import OfflineError
+
+    clock = iter(range(100))
+    monkeypatch.setattr("esphomerelease.store.time.time", lambda: next(clock))
+    store = Store(tmp_path / "github.sqlite", max_entries=3)
+    store.put_open_milestones("esphome", [{"number": 7, "title": "2026.8.0"}])
+    with pytest.raises(OfflineError, match="never listed"):
+        store.get_milestone_pulls("esphome", "2026.8.0", ["MERGED"])
+
+    store.put_pulls(
+        [CachedPull("esphome", n, "graphql", _node(n), None, None) for n in (1, 2)]
+    )
+    store.put_milestone_listing("esphome", "2026.8.0", ["MERGED"], [1, 2])
+    # The listed 1 and 2 outlive 3 and 4, older rows that are not listed.
+    store.put_pull(_entry(3))
+    store.put_pull(_entry(4))
+    # Still carries the milestone, but the last listing did not have it.
+    store.put_pull(CachedPull("esphome", 6, "graphql", _node(6), None, None))
+
+    listed = store.get_milestone_pulls("esphome", "2026.8.0", ["MERGED"])
+    assert [entry.number for entry in listed] == [1, 2]
+    assert sorted(store.get_pulls("esphome", range(1, 7))) == [1, 2, 6]
+
+    store.put_milestone_listing("esphome", "2026.8.0", ["MERGED"], [1, 2, 3])
+    with pytest.raises(OfflineError, match="#3"):
+        store.get_milestone_pulls("esphome", "2026.8.0", ["MERGED"])
+
+    # Closing the milestone releases its PRs to the LRU again.
+    store.put_open_milestones("esphome", [])
+    store.put_pull(_entry(7))
+    assert len(store) == 3
+
+
+def test_stores_from_before_the_indexed_columns_are_migrated(tmp_path):
+    path = tmp_path / "github.sqlite"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        """
+        CREATE TABLE pulls (
+            repo TEXT NOT NULL, number INTEGER NOT NULL, kind TEXT NOT NULL,
+            payload TEXT NOT NULL, etag TEXT, updated_at TEXT,
+            last_used REAL NOT NULL, PRIMARY KEY (repo, number)
+        );
+        """
+    )
+    conn.execute(
+        "INSERT INTO pulls VALUES ('esphome', 1, 'graphql', ?, NULL, NULL, 0)",
+        (json.dumps(_node(1)),),
+    )
+    conn.commit()
+    conn.close()
+
+    store = Store(path)
+    store.put_milestone_listing("esphome", "2026.8.0", ["MERGED"], [1])
+
+    merged = store.get_milestone_pulls("esphome", "2026.8.0", ["MERGED"])
+    assert [entry.number for entry in merged] == [1]
+
+
+def test_milestones_and_releases_round_trip(tmp_path):
+    store = Store(tmp_path / "github.sqlite")
+    store.put_open_milestones("esphome", [{"number": 7, "title": "2026.8.0"}])
+    store.put_open_milestones("esphome", [{"number": 8, "title": "2026.9.0"}])
+    store.put_releases("esphome", [("2026.7.0", False), ("2026.8.0b1", True)])
+    store.put_releases("esphome", [("2026.8.0b1", True)])
+
+    assert store.get_open_milestones("esphome") == [{"number": 8, "title": "2026.9.0"}]
+    assert sorted(store.get_release_tags("esphome")) == ["2026.7.0", "2026.8.0b1"]
+    assert store.get_release_tags("esphome", include_prereleases=False) == ["2026.7.0"]
+
+
+def test_next_beta_prs_and_release_notes_answer_offline(
+    project_mod, tmp_path, monkeypatch
+):
+    """What one online run stored is enough to answer without GitHub."""
+    from esphomerelease.graphql import GraphQLPullRequest
+    from esphomerelease.store import OfflineError
+
+    project, store = project_mod
+    nodes = [
+        _node(1),
+        _node(2, labels=["cherry-picked"]),
+        _node(3, state="OPEN"),
+    ]
+    monkeypatch.setattr(
+        project.graphql,
+        "fetch_milestone_pull_requests",
+        lambda session, owner, name, number, states: [
+            GraphQLPullRequest(node)
+            for node in nodes
+            if states is None or node["state"] in states
+        ],
+    )
+
+    class Repo:
+        session = None
+
+        def milestones(self, state):
+            return [project.Milestone(_milestone_payload(7, "2026.8.0"), None)]
+
+        def releases(self, number):
+            return [
+                types.SimpleNamespace(tag_name="2026.7.0", prerelease=False),
+                types.SimpleNamespace(tag_name="2026.8.0b1", prerelease=True),
+            ]
+
+    # What next-beta-prs asks for.
+    online = _project(project, tmp_path, Repo())
+    online_milestone = online.get_milestone_by_title("2026.8.0")
+    online_prs = online.get_next_beta_prs_for_milestone(online_milestone)
+    online.get_open_prs_for_milestone(online_milestone)
+    assert online.latest_release() == project.Version.parse("2026.8.0b1")
+
+    monkeypatch.setitem(project.CONFIG, "offline", True)
+    offline = _project(project, tmp_path, None)
+    milestone = offline.get_milestone_by_title("2026.8.0")
+
+    assert offline.get_next_beta_prs_for_milestone(milestone) == online_prs
+    assert [pr.number for pr in online_prs] == [1]
+    assert [pr.number for pr in offline.get_open_prs_for_milestone(milestone)] == [3]
+    assert offline.latest_release(include_prereleases=False) == project.Version.parse(
+        "2026.7.0"
+    )
+    assert [pr.title for pr in offline.get_prs([1, 2])] == ["PR 1", "PR 2"]
+    with pytest.raises(OfflineError, match="#99"):
+        offline.get_prs([1, 99])
+    with pytest.raises(OfflineError, match="--offline"):
+        offline.repo  # pylint: disable=pointless-statement
@@ -0,0 +1,175 @@
+"""Tests for the conditional-request response cache under the github3 session.
+
+``transport`` does not import ``.config``, so no ``config.json`` is needed. The
+network edge is a hand-rolled ``requests`` adapter mounted on the real session,
+so the whole requests/github3 stack above it runs for real.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from esphomerelease.transport import (
+    ReleaseSession,
+    ResponseCache,
+    pool_stats,
+    pooled_session,
+)
+
+API = "https://api.github.com"
+
+
+class FakeAdapter(BaseAdapter):
+    """Serves ``resources`` (url -> (etag, payload)) honouring If-None-Match."""
+
+    def __init__(self, resources: dict):
+        super().__init__()
+        self.resources = resources
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        etag, payload = self.resources[request.url]
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.headers["X-RateLimit-Remaining"] = str(5000 - len(self.sent))
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response.headers["ETag"] = etag
+        response.headers["Link"] = f'<{request.url}&page=2>; rel="next"'
+        response._content = json.dumps(payload).encode()
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+def _session(resources: dict):
+    session = ReleaseSession()
+    adapter = FakeAdapter(resources)
+    session.mount("https://", adapter)
+    return session, adapter
+
+
+def test_repeat_get_is_revalidated_and_served_from_cache():
+    url = f"{API}/repos/esphome/esphome/milestones?state=open"
+    session, adapter = _session({url: ('"v1"', [{"title": "2026.7.0"}])})
+
+    first = session.get(f"{API}/repos/esphome/esphome/milestones", params={"state": "open"})
+    second = session.get(f"{API}/repos/esphome/esphome/milestones", params={"state": "open"})
+
+    assert first.json() == second.json() == [{"title": "2026.7.0"}]
+    assert second.status_code == 200
+    assert second.from_cache
+    # Pagination keeps working off the cached headers...
+    assert second.links["next"]["url"].endswith("page=2")
+    # ...while the rate limit reflects the revalidation.
+    assert second.headers["X-RateLimit-Remaining"] == "4998"
+    assert "If-None-Match" not in adapter.sent[0].headers
+    assert adapter.sent[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_changed_resource_replaces_the_cached_copy():
+    url = f"{API}/repos/esphome/esphome/releases"
+    resources = {url: ('"v1"', ["old"])}
+    session, _ = _session(resources)
+
+    session.get(url)
+    resources[url] = ('"v2"', ["new"])
+    assert session.get(url).json() == ["new"]
+    assert session.get(url).json() == ["new"]
+
+
+def test_query_parameters_are_part_of_the_key():
+    base = f"{API}/repos/esphome/esphome/issues"
+    session, adapter = _session(
+        {
+            f"{base}?state=open": ('"o"', ["open"]),
+            f"{base}?state=closed": ('"c"', ["closed"]),
+        }
+    )
+
+    assert session.get(base, params={"state": "open"}).json() == ["open"]
+    assert session.get(base, params={"state": "closed"}).json() == ["closed"]
+    assert all("If-None-Match" not in request.headers for request in adapter.sent)
+
+
+def test_caller_conditional_headers_pass_through():
+    """A caller revalidating on its own gets the raw 304, not a replay."""
+    url = f"{API}/repos/esphome/esphome/pulls/1"
+    session, _ = _session({url: ('"v1"', {"number": 1})})
+
+    session.get(url)
+    response = session.get(url, headers={"If-None-Match": '"v1"'})
+
+    assert response.status_code == 304
+
+
+def test_writes_are_not_cached():
+    url = f"{API}/repos/esphome/esphome/labels"
+    session, adapter = _session({url: ('"v1"', {"name": "x"})})
+
+    session.post(url, data="{}")
+    session.get(url)
+
+    assert "If-None-Match" not in adapter.sent[1].headers
+
+
+def test_cache_is_size_capped():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put((key, None), object())
+    assert len(cache) == 2
+    assert cache.get(("a", None)) is None
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pooled_session_is_sized_to_the_worker_pool():
+    session = pooled_session(ReleaseSession, pool_size=24)
+
+    adapter = session.get_adapter("https://api.github.com")
+    assert isinstance(session, ReleaseSession)
+    assert adapter._pool_maxsize == 24
+
+
+def test_pool_stats_count_reused_connections(local_server):
+    session = pooled_session(pool_size=4)
+    for _ in range(5):
+        assert session.get(f"{local_server}/version").text == "ok"
+
+    stats = pool_stats(session)
+    assert stats.requests == 5
+    assert stats.connections == 1
+    assert stats.reused == 4
+    assert str(stats) == "5 requests over 1 connections (4 reused)"
@@ -0,0 +1,217 @@
+"""Tests for applying GitHub webhook deliveries to the PR and milestone caches.
+
+``webhooks`` is import-clean; projects are hand-rolled fakes holding a real
+``SingleFlightCache`` and ``MilestoneRegistry``. Deliveries are replayed from
+a recorded JSON-lines file, or POSTed to a live listener on localhost.
+"""
+
+import hashlib
+import hmac
+import json
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+
+from esphomerelease.exceptions import EsphomeReleaseError
+from esphomerelease.milestones import MilestoneRegistry
+from esphomerelease.model import PullRecord
+from esphomerelease.singleflight import SingleFlightCache
+from esphomerelease.webhooks import WebhookReceiver, load_deliveries
+
+
+class FakeProject:
+    def __init__(self, name: str, milestones=()):
+        self.name = name
+        self.pr_cache = SingleFlightCache()
+        self.listings = 0
+        self._milestones = list(milestones)
+        self.milestones = MilestoneRegistry(self._list_milestones)
+
+    def _list_milestones(self):
+        self.listings += 1
+        return self._milestones
+
+
+def _milestone(number: int, title: str) -> dict:
+    return {"number": number, "title": title, "state": "open"}
+
+
+def _pull(number: int, *, labels=(), milestone=None, merged_at=None) -> dict:
+    return {
+        "number": number,
+        "node_id": f"PR_{number}",
+        "title": f"Add sensor {number}",
+        "html_url": f"https://github.com/esphome/esphome/pull/{number}",
+        "body": "Description",
+        "labels": [{"name": name} for name in labels],
+        "milestone": milestone,
+        "merged_at": merged_at,
+        "merge_commit_sha": f"{number:040x}" if merged_at else None,
+        "updated_at": "2026-07-01T12:00:00Z",
+        "user": {"login": "jesserockz", "html_url": "https://github.com/jesserockz"},
+    }
+
+
+def _delivery(event: str, repo: str = "esphome", **payload) -> dict:
+    return {
+        "event": event,
+        "payload": {"repository": {"full_name": f"esphome/{repo}"}, **payload},
+    }
+
+
+@pytest.fixture
+def esphome():
+    project = FakeProject(
+        "esphome",
+        [
+            types.SimpleNamespace(number=5, title="2026.7.0"),
+            types.SimpleNamespace(number=6, title="2026.8.0"),
+        ],
+    )
+    for number in (1, 2):
+        project.pr_cache[number] = PullRecord.from_payload(
+            _pull(number, labels=["new-feature"], milestone=_milestone(5, "2026.7.0"))
+        )
+    return project
+
+
+def test_recorded_deliveries_replay_into_the_caches(esphome, tmp_path):
+    docs = FakeProject("esphome.io")
+    recorded = [
+        _delivery(
+            "pull_request",
+            action="closed",
+            pull_request=_pull(
+                1,
+                labels=["new-feature"],
+                milestone=_milestone(5, "2026.7.0"),
+                merged_at="2026-07-02T08:00:00Z",
+            ),
+        ),
+        _delivery(
+            "issues",
+            action="labeled",
+            issue={
+                "number": 2,
+                "title": "Add sensor 2",
+                "pull_request": {},
+                "labels": [{"name": "new-feature"}, {"name": "cherry-picked"}],
+                "milestone": None,
+            },
+        ),
+        _delivery("milestone", action="closed", milestone=_milestone(5, "2026.7.0")),
+        _delivery("label", repo="esphome.io", action="created", label={"name": "x"}),
+        _delivery("push", ref="refs/heads/dev"),
+        _delivery("pull_request", repo="other", pull_request=_pull(9)),
+    ]
+    path = tmp_path / "deliveries.jsonl"
+    path.write_text("\n".join(json.dumps(delivery) for delivery in recorded) + "\n")
+    receiver = WebhookReceiver([esphome, docs])
+    esphome.milestones.open()
+
+    assert receiver.replay(load_deliveries(path)) == 4
+
+    merged = esphome.pr_cache[1]
+    assert merged.merged_at.isoformat() == "2026-07-02T08:00:00+00:00"
+    assert merged.merge_commit_sha == f"{1:040x}"
+    assert esphome.pr_cache[2].labels == ("new-feature", "cherry-picked")
+    assert esphome.pr_cache[2].milestone_title is None
+    assert esphome.milestones.by_title("2026.7.0") is None
+    assert esphome.milestones.by_number(6).title == "2026.8.0"
+    assert esphome.listings == 1
+    assert receiver.applied == 4
+
+
+def test_renames_reach_cached_prs_and_relist_milestones(esphome):
+    receiver = WebhookReceiver([esphome])
+    esphome.milestones.open()
+
+    receiver.apply(
+        "milestone",
+        {
+            "repository": {"full_name": "esphome/esphome"},
+            "action": "edited",
+            "milestone": _milestone(5, "2026.7.1"),
+            "changes": {"title": {"from": "2026.7.0"}},
+        },
+    )
+    receiver.apply(
+        "label",
+        {
+            "repository": {"full_name": "esphome/esphome"},
+            "action": "edited",
+            "label": {"name": "feature"},
+            "changes": {"name": {"from": "new-feature"}},
+        },
+    )
+
+    assert {esphome.pr_cache[n].milestone_title for n in (1, 2)} == {"2026.7.1"}
+    assert esphome.pr_cache[1].labels == ("feature",)
+    esphome.milestones.open()
+    assert esphome.listings == 2
+
+
+def test_issue_events_for_uncached_prs_are_left_to_the_next_fetch(esphome):
+    receiver = WebhookReceiver([esphome])
+
+    receiver.apply(
+        "issues",
+        {
+            "repository": {"full_name": "esphome/esphome"},
+            "action": "milestoned",
+            "issue": {"number": 3, "title": "x", "pull_request": {}, "labels": []},
+        },
+    )
+
+    assert 3 not in esphome.pr_cache
+
+
+def _signature(body: bytes) -> str:
+    return "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+
+
+def _post(url: str, event: str, body: bytes, signature=None) -> int:
+    headers = {"X-GitHub-Event": event, "Content-Type": "application/json"}
+    if signature:
+        headers["X-Hub-Signature-256"] = signature
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as err:
+        return err.code
+
+
+def test_listener_checks_signatures_and_applies_deliveries(esphome):
+    receiver = WebhookReceiver([esphome], secret="s3cret")
+    server = receiver.serve()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    body = json.dumps(
+        {
+            "repository": {"full_name": "esphome/esphome"},
+            "action": "labeled",
+            "pull_request": _pull(7, labels=["cherry-picked"]),
+        }
+    ).encode()
+    try:
+        assert _post(url, "pull_request", body, "sha256=" + "0" * 64) == 401
+        assert _post(url, "pull_request", body) == 401
+        assert 7 not in esphome.pr_cache
+
+        assert _post(url, "ping", b"{}", _signature(b"{}")) == 204
+        assert _post(url, "pull_request", body, _signature(body)) == 202
+        assert receiver.wait(0, timeout=5)
+        assert esphome.pr_cache[7].labels == ("cherry-picked",)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_without_a_secret_nothing_is_accepted(esphome):
+    receiver = WebhookReceiver([esphome])
+    assert not receiver.verify(b"{}", None)
+    assert not receiver.verify(b"{}", _signature(b"{}"))
+    with pytest.raises(EsphomeReleaseError, match="secret"):
+        receiver.serve()
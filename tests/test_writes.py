@@ -0,0 +1,157 @@
+"""Tests for pacing and retrying GitHub REST writes.
+
+``writes`` is import-clean; writes are plain callables raising the github3
+errors GitHub's responses turn into, and the pacing clock is faked.
+"""
+
+import threading
+
+import requests
+from github3.exceptions import error_for
+
+from esphomerelease.retry import RetryBudget
+from esphomerelease.writes import WriteFailure, WritePacer, WriteQueue
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, message: str, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = message
+        self.content = message.encode()
+
+    def json(self):
+        return {"message": self.text}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _queue(clock, per_minute=80, per_hour=500, **kwargs):
+    kwargs.setdefault("budget", RetryBudget())
+    pacer = WritePacer(per_minute, per_hour, clock=clock, sleep=clock.sleep)
+    return WriteQueue(workers=1, pacer=pacer, **kwargs)
+
+
+def test_writes_start_no_faster_than_the_content_limits():
+    clock = FakeClock()
+    queue = _queue(clock, per_minute=2, per_hour=5)
+    started = []
+    for number in range(6):
+        queue.add(f"write {number}", lambda: started.append(clock.now))
+
+    assert queue.minutes() == 60
+    assert queue.run() == []
+
+    # Two a minute, then the sixth waits for the first to leave the hour.
+    assert started == [0.0, 0.0, 60.0, 60.0, 120.0, 3600.0]
+
+
+def test_rate_limited_writes_are_retried_after_retry_after():
+    clock = FakeClock()
+    queue = _queue(clock)
+    attempts = []
+
+    def create():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise error_for(
+                FakeResponse(
+                    403,
+                    "You have exceeded a secondary rate limit.",
+                    {"Retry-After": "30"},
+                )
+            )
+
+    queue.add("esphome: create 'component: alpha'", create)
+    queue.add("esphome: create 'component: beta'", lambda: None)
+
+    assert queue.run() == []
+    assert attempts == [0.0, 30.0, 60.0]
+    assert queue.retries == 2
+
+
+def test_only_permanent_failures_are_reported():
+    clock = FakeClock()
+    queue = _queue(clock, max_attempts=2)
+
+    def invalid():
+        raise error_for(FakeResponse(422, "Validation Failed"))
+
+    def limited():
+        raise error_for(FakeResponse(429, "Too many requests", {"Retry-After": "1"}))
+
+    queue.add("esphome: create 'component: bad'", invalid)
+    queue.add("esphome: create 'component: late'", limited)
+
+    failures = queue.run()
+
+    assert failures == [
+        WriteFailure("esphome: create 'component: bad'", "422 Validation Failed"),
+        WriteFailure("esphome: create 'component: late'", "429 Too many requests"),
+    ]
+    assert queue.retries == 1
+    assert len(queue) == 0
+
+
+def test_transport_errors_are_retried_and_other_errors_reported():
+    """A dropped connection is retried after a backoff; anything else, and a
+    connection that stays down, ends up in the failure report instead of
+    escaping the worker."""
+    clock = FakeClock()
+    queue = _queue(clock, max_attempts=3, backoff=lambda attempt: 2.0 ** attempt)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise requests.ConnectionError("Connection reset by peer")
+
+    def down():
+        raise requests.ConnectionError("Connection refused")
+
+    def broken():
+        raise KeyError("name")
+
+    queue.add("esphome: create 'component: alpha'", flaky)
+    queue.add("esphome: create 'component: beta'", down)
+    queue.add("esphome: create 'component: gamma'", broken)
+
+    failures = queue.run()
+
+    assert attempts == [0.0, 2.0, 6.0]
+    assert failures == [
+        WriteFailure("esphome: create 'component: beta'", "Connection refused"),
+        WriteFailure("esphome: create 'component: gamma'", "'name'"),
+    ]
+
+
+def test_writes_overlap_up_to_the_worker_count():
+    queue = WriteQueue(workers=3)
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+    release = threading.Barrier(3, timeout=5)
+
+    def write():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        release.wait()
+        with lock:
+            in_flight[0] -= 1
+
+    for number in range(6):
+        queue.add(f"write {number}", write)
+
+    assert queue.run() == []
+    assert peak[0] == 3